@@ -1,17 +1,31 @@
+import time
+# Taken before the imports so the first run in a process can report its import time
+_script_started = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import numpy as np
 import os
-from datetime import datetime, timedelta
-import calendar 
-import plotly.express as px
 import warnings
-import math
+import functools
+import tempfile
+from urllib.parse import urlencode
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from dialer_core import aggregates, arrow_store, cache, kpis, loading, parallel, perf, precompute, prewarm
+from dialer_core.config import DIALER_COLUMN, MONTH_NAMES, YEARS
+from dialer_core.periods import get_days_in_period, get_weeks_in_month
 
 
+# Only counts on the first run in this process; later reruns find the modules already loaded
+perf.note_startup("import", time.perf_counter() - _script_started)
+
 # Page config MUST be called before any other Streamlit command
 st.set_page_config(layout="wide", page_title="Dialers Performance Dashboard")
 
+# Start timing this rerun (stages, cache hits/misses); closed at the end of the script
+_ctx = get_script_run_ctx()
+perf.begin_rerun(_ctx.session_id if _ctx is not None else None)
+
 # Suppress the Plotly deprecation banner Streamlit surfaces about keyword arguments
 warnings.filterwarnings("ignore", message="The keyword arguments have been deprecated and will be removed in a future release.*", category=Warning)
 warnings.filterwarnings("ignore", category=UserWarning)
@@ -33,62 +47,64 @@ logo_path = os.path.join(os.getcwd(), logo_filename)
 if not os.path.exists(logo_path):
     logo_path = logo_filename
 
+@st.cache_resource
+def logo_markup(path, mtime):
+    """Sidebar logo as an inline data-URI image, read and base64-encoded once per process (per file version)."""
+    import base64
+    with open(path, 'rb') as _f:
+        _b64 = base64.b64encode(_f.read()).decode()
+    # Use explicit CSS width + max-width to ensure the image scales in the sidebar
+    return F"<div style='display:flex;justify-content:center;align-items:center;padding:2px 0;margin:0;'><img src='data:image/png;base64,{_b64}' style='width:200px !important;height:auto !important;max-width:100%;border-radius:8px;margin:4px 0;'></div>"
+
+
 if os.path.exists(logo_path):
     try:
-        import base64
-        with open(logo_path, 'rb') as _f:
-            _b64 = base64.b64encode(_f.read()).decode()
-        # Use explicit CSS width + max-width to ensure the image scales in the sidebar
-        st.sidebar.markdown(
-            F"<div style='display:flex;justify-content:center;align-items:center;padding:2px 0;margin:0;'><img src='data:image/png;base64,{_b64}' style='width:200px !important;height:auto !important;max-width:100%;border-radius:8px;margin:4px 0;'></div>",
-            unsafe_allow_html=True
-        )
+        with perf.stage("shell.logo"):
+            st.sidebar.markdown(logo_markup(logo_path, os.path.getmtime(logo_path)), unsafe_allow_html=True)
     except Exception:
         # Fallback to Streamlit image if embedding fails
         st.sidebar.image(logo_path, width=200, use_column_width=False)
         
 
-# --- Configuration for Column Naming ---
-DATE_COLUMN_SALES = 'created time'
-DATE_COLUMN_SALES_VARIATIONS = ['created time', 'Created Time', 'Created time', 'Date', 'date', 'Timestamp']
-DIALER_COLUMN = 'dialer'
-# ADDED 'Other Leads Dialer' as requested for the Others page
-DIALER_COLUMN_VARIATIONS = ['dialer', 'Dialer', 'Agent', 'agent', 'sales_rep', 'Other Leads Dialer']
+# --- 2. DATA LOADING FUNCTION AND EXECUTION (Runs once) ---
 
+@cache.process_resource
+def get_result_cache():
+    """Loaded tables and KPI results shared by every session, within DIALERS_RESULT_CACHE_MB."""
+    return cache.LRUCache(max_bytes=cache.RESULT_CACHE_BYTES)
+
+
+@perf.track_cache("load_raw_data")
+@cache.shared_result(get_result_cache, loading.data_version)
+def load_frames():
+    """
+    Loads all files from the current directory (relative path), through the
+    memory-mapped Arrow copy shared by the server processes when pyarrow is installed.
+    Raises loading.DataLoadError; safe off the script thread (prewarm, KPI service).
+    """
+    perf.record_cache_miss("load_raw_data")
+    return arrow_store.load_shared()
 
-# --- 2. DATA LOADING FUNCTION AND EXECUTION (Runs once) ---
 
-@st.cache_data
 def load_raw_data():
-    """Loads all files from the current directory (relative path)."""
-    
-    # CHANGE: Use relative path './' for deployment compatibility
-    BASE_PATH = "./" 
-    
+    """load_frames for the script run: a load error is shown and stops the page."""
     try:
-        # XLSX Files (Attendance is the source for all dialer names)
-        df_attendance = pd.read_excel(F"{BASE_PATH}Dialers Attendance.xlsx")
-        df_sheet2 = pd.read_excel(F"{BASE_PATH}sheet2.xlsx") 
-        # CSV Files
-        df_sales = pd.read_csv(F"{BASE_PATH}sales.csv")
-        df_oplans = pd.read_csv(F"{BASE_PATH}O_Plan_Leads.csv")
-        df_others = pd.read_csv(F"{BASE_PATH}Other_Leads.csv") # Load the Others file
-        
-        return df_attendance, df_sales, df_oplans, df_others, df_sheet2
-        
-    except FileNotFoundError as E:
-        st.error(F"Error loading file: {E}. Please ensure all data files (xlsx/csv) are uploaded to the root directory of your repository.")
-        st.stop()
-    except Exception as E:
-        st.error(F"An error occurred during file loading: {E}. If reading Excel files, ensure you have 'openpyxl' installed in requirements.txt.")
+        return load_frames()
+    except loading.DataLoadError as E:
+        st.error(str(E))
         st.stop()
 
 # Load data once
 df_attendance, df_sales, df_oplans, df_others, df_sheet2 = load_raw_data()
+for _name, _df in [('attendance', df_attendance), ('sales', df_sales), ('oplans', df_oplans), ('others', df_others), ('sheet2', df_sheet2)]:
+    perf.note_frame(F"raw.{_name}", _df)
 
 # --- 3. CUSTOM STYLING (Dark Theme and Red KPI Cards) ---
 
-st.markdown("""
+@st.cache_resource
+def page_css():
+    """The dashboard's <style> block, built once per process."""
+    return """
 <style>
     /* Color variables for easy tuning */
     :root{
@@ -246,376 +262,572 @@ st.markdown("""
     }
 
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+with perf.stage("shell.css"):
+    st.markdown(page_css(), unsafe_allow_html=True)
 
 
 # --- 4. DATA PROCESSING AND KPI CALCULATION FUNCTIONS (Moved out of the main block) ---
 
-# Define the years and months for the filter (includes 2024 as per last feedback)
-YEARS = [2025, 2026] 
-MONTH_NAMES = list(calendar.month_name)[1:]
 
-# Helper function to find the weeks (Mon-Fri) in a selected month/year
-def get_weeks_in_month(year, month_name):
-    """Calculates weeks (Mon-Fri) for a given month/year, excluding Sat/Sun."""
-    try:
-        month_index = MONTH_NAMES.index(month_name) + 1
-    except ValueError:
-        return ["All Weeks"] 
+@cache.process_resource
+def get_precomputed_store(data_version):
+    """Opens the batch-precomputed KPI store (python -m dialer_core.precompute) if it matches the data files."""
+    return precompute.PrecomputedStore.open(version=data_version)
 
-    num_days = calendar.monthrange(year, month_index)[1]
-    
-    weeks = []
-    week_counter = 1
-    week_start_date = None
-    
-    for day in range(1, num_days + 1):
-        date = datetime(year, month_index, day).date()
-        day_of_week = date.weekday() # Monday is 0, Sunday is 6
-        
-        if day_of_week == 0:
-            week_start_date = date
-        
-        if day_of_week == 4 and week_start_date:
-            week_end_date = date
-            weeks.append(F"Week {week_counter} ({week_start_date.strftime('%Y-%m-%d')} to {week_end_date.strftime('%Y-%m-%d')})")
-            week_counter += 1
-            week_start_date = None
-            
-        elif day == num_days and week_start_date and day_of_week in [0, 1, 2, 3]: 
-            weeks.append(F"Week {week_counter} ({week_start_date.strftime('%Y-%m-%d')} to {date.strftime('%Y-%m-%d')})")
-            
-    return ["All Weeks"] + weeks
 
-# NEW HELPER: Get all working days in a selected month or week
-def get_days_in_period(year, month_name, week_str):
-    """Calculates all working days (Mon-Fri) for a given month or selected week."""
+def lookup_precomputed(page, year, month_index, dialer, week_str, day_str):
+    """Precomputed KPI tuple for a single-month selection, or None to compute it live."""
+    store = get_precomputed_store(loading.data_version())
+    if store is None:
+        return None
+    with perf.stage(F"{page}.precomputed_lookup"):
+        return store.lookup(page, year, month_index, dialer, week_str, day_str)
+
+
+@cache.process_resource
+def get_prepared_tables(data_version):
+    """
+    Raw tables standardized and date-parsed once per data version, for the month-partitioned
+    aggregation and exports; mapped from the Arrow files every server process shares.
+    """
+    from dialer_core import leads
     try:
-        month_index = MONTH_NAMES.index(month_name) + 1
+        return arrow_store.load_prepared(lambda: aggregates.prepare_tables(*load_frames()), data_version, leads.LEAD_KEY)
     except ValueError:
-        return ["All Days"] 
-        
-    days = []
-    
-    if week_str != "All Weeks":
-        # Specific Week selected: derive days from the week string
-        try:
-            start_date_str = week_str.split('(')[1].split(' to ')[0]
-            end_date_str = week_str.split(' to ')[1].replace(')', '')
-            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-            end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-            
-            current_date = start_date
-            while current_date <= end_date:
-                # Check if it's a working day (Monday=0 to Friday=4)
-                if current_date.weekday() < 5:
-                    days.append(current_date.strftime('%Y-%m-%d'))
-                current_date += timedelta(days=1)
-        except Exception:
-            # Fallback if parsing fails
-            return ["All Days"] 
+        return None
 
-    else:
-        # All Weeks selected: derive all working days for the whole month
-        num_days = calendar.monthrange(year, month_index)[1]
-        for day in range(1, num_days + 1):
-            date = datetime(year, month_index, day).date()
-            # Check if it's a working day (Monday=0 to Friday=4)
-            if date.weekday() < 5:
-                days.append(date.strftime('%Y-%m-%d'))
-                
-    return ["All Days"] + days
+
+@perf.track_cache("selection_kpis")
+@cache.shared_result(get_result_cache, loading.data_version)
+def selection_kpis(year, months, dialer, week_str, day_str):
+    """
+    {page: KPI tuple or None} of all three pages for one filter state, from a single
+    aggregation pass over the prepared tables (month partitions in the process pool
+    for long ranges); None without prepared tables.
+    """
+    perf.record_cache_miss("selection_kpis")
+    tables = get_prepared_tables(loading.data_version())
+    if tables is None:
+        return None
+    with perf.stage("selection.aggregate"):
+        return parallel.selection_kpis(tables, year, list(months), dialer, week_str, day_str, pool=parallel.get_pool())
+
+
+def compute_shared_selection(page, year, month_index, dialer, week_str, day_str):
+    """The page's KPI tuple from the pass all pages share for this filter state, or None to compute it live."""
+    if not isinstance(dialer, str):
+        return None
+    months = tuple(sorted(set(month_index))) if isinstance(month_index, (list, tuple, set)) else (month_index,)
+    shared = selection_kpis(year, months, dialer, week_str, day_str)
+    return None if shared is None else shared[page]
 
 
 # Helper function: Get dialers who attended during the selected month/year
-@st.cache_data
+@perf.track_cache("get_attended_dialers")
+@cache.shared_result(get_result_cache, loading.data_version)
 def get_attended_dialers(df_attendance, selected_year, selected_month_index):
-    df_attendance_copy = df_attendance.copy()
-
-    # --- Standardize Dialer Column ---
-    found_dialer_col = None
-    for variation in DIALER_COLUMN_VARIATIONS:
-        if variation in df_attendance_copy.columns:
-            found_dialer_col = variation
-            break
-            
-    if found_dialer_col:
-        df_attendance_copy = df_attendance_copy.rename(columns={found_dialer_col: DIALER_COLUMN})
-
-    # --- Standardize Date Column (Must be named 'date' for filtering below) ---
-    found_date_col = None
-    for variation in DATE_COLUMN_SALES_VARIATIONS:
-        # Use lower() on column names for robust matching
-        if variation.lower() in [c.lower() for c in df_attendance_copy.columns]:
-            # Find the original name of the column that matched the variation
-            found_date_col = next((c for c in df_attendance_copy.columns if c.lower() == variation.lower()), None)
-            break
-            
-    if found_date_col and found_date_col != 'date':
-        df_attendance_copy = df_attendance_copy.rename(columns={found_date_col: 'date'})
-    # --- END Date FIX ---
-    
-    if DIALER_COLUMN not in df_attendance_copy.columns or 'date' not in df_attendance_copy.columns:
-        return ["All Dialers"]
-        
-    # --- CRITICAL FIX: Clean and standardize dialer names to ensure consistent grouping ---
-    df_attendance_copy[DIALER_COLUMN] = df_attendance_copy[DIALER_COLUMN].astype(str).str.strip().str.upper()
-    # --- END CRITICAL FIX ---
-    
-    df_attendance_copy['date'] = pd.to_datetime(df_attendance_copy['date'], errors='coerce')
-    df_filtered = df_attendance_copy.dropna(subset=['date'])
+    perf.record_cache_miss("get_attended_dialers")
+    return kpis.get_attended_dialers(df_attendance, selected_year, selected_month_index)
 
-    # selected_month_index may be an int or an iterable of ints
-    if isinstance(selected_month_index, (list, tuple, set)):
-        df_filtered = df_filtered[(df_filtered['date'].dt.year == selected_year) & (df_filtered['date'].dt.month.isin(selected_month_index))]
-    else:
-        df_filtered = df_filtered[(df_filtered['date'].dt.year == selected_year) & (df_filtered['date'].dt.month == selected_month_index)]
-    
-    dialers = sorted(df_filtered[DIALER_COLUMN].unique().astype(str).tolist())
-    
-    # Remove any empty or 'NAN' dialer names from the list of options
-    dialers = [d for d in dialers if d.strip() and d.upper() != 'NAN' and d.upper() != 'NONE']
-    
-    return ["All Dialers"] + dialers
+
+@perf.track_cache("has_attendance")
+@cache.shared_result(get_result_cache, loading.data_version)
+def has_attendance(df_attendance, year, month_index, dialer, week_str, day_str):
+    """Whether the selection has attendance rows (the Others page's live KPIs divide by them)."""
+    perf.record_cache_miss("has_attendance")
+    return kpis.has_attendance(df_attendance, year, month_index, dialer, week_str, day_str)
 
 
-@st.cache_data
+@perf.track_cache("process_and_calculate_data")
+@cache.shared_result(get_result_cache, loading.data_version)
 def process_and_calculate_data(year, month_index, dialer, week_str, day_str, df_sales, df_oplans, df_attendance): 
     """
     Core function for Sales Performance page data processing and KPI calculation.
     """
-    
-    # Standardize column names
-    df_sales = _standardize_df(df_sales, DATE_COLUMN_SALES, DIALER_COLUMN)
-    df_oplans = _standardize_df(df_oplans, DATE_COLUMN_SALES, DIALER_COLUMN)
-    df_attendance = _standardize_df(df_attendance, 'date', DIALER_COLUMN)
-
-    # 1. FILTER BY MONTH/YEAR
-    df_sales_filtered = _filter_by_date_local(df_sales, DATE_COLUMN_SALES, year, month_index)
-    df_oplans_filtered = _filter_by_date_local(df_oplans, DATE_COLUMN_SALES, year, month_index)
-    df_att_filtered = _filter_by_date_local(df_attendance, 'date', year, month_index)
-
-    # 2. WEEK FILTERING
-    df_sales_filtered = _apply_week_filter_local(df_sales_filtered, DATE_COLUMN_SALES, week_str)
-    df_oplans_filtered = _apply_week_filter_local(df_oplans_filtered, DATE_COLUMN_SALES, week_str)
-    df_att_filtered = _apply_week_filter_local(df_att_filtered, 'date', week_str)
-    
-    # 2b. DAY FILTERING 
-    df_sales_filtered = _apply_day_filter_local(df_sales_filtered, DATE_COLUMN_SALES, day_str)
-    df_oplans_filtered = _apply_day_filter_local(df_oplans_filtered, DATE_COLUMN_SALES, day_str)
-    df_att_filtered = _apply_day_filter_local(df_att_filtered, 'date', day_str)
-
-    # 3. DIALER FILTERING
-    df_sales_filtered = _apply_dialer_filter_local(df_sales_filtered, DIALER_COLUMN, dialer)
-    df_oplans_filtered = _apply_dialer_filter_local(df_oplans_filtered, DIALER_COLUMN, dialer)
-    df_att_filtered = _apply_dialer_filter_local(df_att_filtered, DIALER_COLUMN, dialer)
-
-
-    # --- 3a. EXCLUDE UNWANTED SALES ROWS (CLIENT / CLOSING STATUS) ---
-    if not df_sales_filtered.empty:
-        # find a reasonable Client column (case-insensitive match)
-        client_col = next((C for C in df_sales_filtered.columns if 'client' in C.lower()), None)
-        if client_col is not None:
-            df_sales_filtered = df_sales_filtered[~df_sales_filtered[client_col].astype(str).str.contains('PPO-Braces chasing', case=False, na=False)]
-
-        # find a Closing Status column (common variations)
-        closing_col = next((C for C in df_sales_filtered.columns if 'closing' in C.lower() and 'status' in C.lower()), None)
-        if closing_col is None:
-            closing_col = next((C for C in df_sales_filtered.columns if C.lower().strip() in ['closing status', 'closing_status', 'status', 'closingstatus']), None)
-
-        if closing_col is not None:
-            exclude_statuses = {S.lower() for S in ['Retransfer to client', 'Rejected by client']}
-            df_sales_filtered = df_sales_filtered[~df_sales_filtered[closing_col].astype(str).str.lower().isin(exclude_statuses)]
-    
-
-    # 4. KPI CALCULATION
-    total_sales_count = df_sales_filtered.shape[0]
-    total_transfers_count = df_oplans_filtered.shape[0]
-    
-    # Sales Percentage (Kept for calculation, even if not displayed)
-    sales_percentage = round((total_sales_count / total_transfers_count) * 100) if total_transfers_count > 0 else 0
-    
-    # Check if sales data is available and has date column
-    if not df_sales_filtered.empty and DATE_COLUMN_SALES in df_sales_filtered.columns:
-        # NOTE: Date column was converted to datetime inside filter_by_date (Line 315)
-        days_with_sales = df_sales_filtered[DATE_COLUMN_SALES].dt.date.nunique()
-        avg_sales_per_day = round(total_sales_count / days_with_sales) if days_with_sales > 0 else 0
-    else:
-        days_with_sales = 0
-        avg_sales_per_day = 0
-    
-    # Attendance KPIs
-    dialers_present = df_att_filtered[DIALER_COLUMN].nunique() if DIALER_COLUMN in df_att_filtered.columns else 0
-    # Average attendance per dialer (mean of the 'attendance' column)
-    avg_att_per_dialer = round(df_att_filtered['attendance'].mean()) if dialers_present > 0 and 'attendance' in df_att_filtered.columns else 0
-    
-    # Total attendance for the period
-    total_att_count = df_att_filtered['attendance'].sum() if 'attendance' in df_att_filtered.columns else 0
-    # Days with attendance
-    days_with_att = df_att_filtered['date'].dt.date.nunique() if 'date' in df_att_filtered.columns else 0
-    # Average attendance per day
-    avg_att_per_day = round(total_att_count / days_with_att) if days_with_att > 0 else 0
+    perf.record_cache_miss("process_and_calculate_data")
+    result = lookup_precomputed("sales", year, month_index, dialer, week_str, day_str)
+    if result is not None:
+        return result
+    result = compute_shared_selection("sales", year, month_index, dialer, week_str, day_str)
+    if result is not None:
+        return result
+    return kpis.process_and_calculate_data(year, month_index, dialer, week_str, day_str, df_sales, df_oplans, df_attendance)
+
+
+@perf.track_cache("calculate_oplans_data")
+@cache.shared_result(get_result_cache, loading.data_version)
+def calculate_oplans_data(year, month_index, dialer, week_str, day_str, df_oplans, df_attendance):
+    """
+    Core function for Oplans Performance page data processing and KPI calculation.
+    """
+    perf.record_cache_miss("calculate_oplans_data")
+    result = lookup_precomputed("oplans", year, month_index, dialer, week_str, day_str)
+    if result is not None:
+        return result
+    result = compute_shared_selection("oplans", year, month_index, dialer, week_str, day_str)
+    if result is not None:
+        return result
+    return kpis.calculate_oplans_data(year, month_index, dialer, week_str, day_str, df_oplans, df_attendance)
+
+
+@perf.track_cache("calculate_others_data")
+@cache.shared_result(get_result_cache, loading.data_version)
+def calculate_others_data(year, month_index, dialer, week_str, day_str, df_others, df_oplans, df_attendance, df_sheet2):
+    """
+    Core function for Others Performance page data processing and KPI calculation.
+    """
+    perf.record_cache_miss("calculate_others_data")
+    result = lookup_precomputed("others", year, month_index, dialer, week_str, day_str)
+    if result is not None:
+        return result
+    result = compute_shared_selection("others", year, month_index, dialer, week_str, day_str)
+    if result is not None:
+        return result
+    return kpis.calculate_others_data(year, month_index, dialer, week_str, day_str, df_others, df_oplans, df_attendance, df_sheet2)
 
-    
-    # 5. LINE CHART DATA PREPARATION
-    if not df_sales_filtered.empty and DATE_COLUMN_SALES in df_sales_filtered.columns and DIALER_COLUMN in df_sales_filtered.columns:
-        # Group by a normalized datetime Date (no time) and keep as datetime dtype for proper chronological plotting
-        df_sales_trend = df_sales_filtered.groupby([
-            df_sales_filtered[DATE_COLUMN_SALES].dt.normalize().rename('Date'), 
-            DIALER_COLUMN 
-        ]).size().reset_index(name='Sales_Count')
-        # Ensure the Date column is datetime and sort chronologically to avoid zig-zag lines when Plotly connects points
-        df_sales_trend['Date'] = pd.to_datetime(df_sales_trend['Date'])
-        df_sales_trend = df_sales_trend.sort_values(['Date', DIALER_COLUMN])
-    else:
-        df_sales_trend = pd.DataFrame(columns=['Date', DIALER_COLUMN, 'Sales_Count'])
-    
-    
-    return df_sales_trend, sales_percentage, avg_sales_per_day, avg_att_per_dialer, avg_att_per_day, total_sales_count
 
 # --- 5. PAGE FUNCTIONS ---
 
-# Helper function to standardize columns (used by multiple pages)
-def _standardize_df(df, date_col_name, dialer_col_name):
-    df_local = df.copy()
-    
-    # Standardize Date Column
-    found_date = next((c for c in df_local.columns if c.lower() in [v.lower() for v in DATE_COLUMN_SALES_VARIATIONS]), None)
-    if found_date and found_date != date_col_name:
-        df_local = df_local.rename(columns={found_date: date_col_name})
+def trend_charts():
+    """The shared chart builder (and plotly with it), imported when the first chart is drawn instead of at startup."""
+    started = time.perf_counter()
+    from dialer_core import charts
+    perf.note_startup("plotly_import", time.perf_counter() - started)
+    return charts
 
-    # Standardize Dialer Column
-    found_dialer = next((c for c in df_local.columns if c in DIALER_COLUMN_VARIATIONS), None) # Use direct match for Dialer Variations
-    
-    if found_dialer and found_dialer != dialer_col_name:
-        df_local = df_local.rename(columns={found_dialer: dialer_col_name})
-    
-    # CRITICAL FIX: Robust Data Cleaning (Strip/Uppercase)
-    if dialer_col_name in df_local.columns:
-        df_local[dialer_col_name] = df_local[dialer_col_name].astype(str).str.strip().str.upper().replace('NAN', np.nan)
-        
-    return df_local
-
-# Helper function to filter by date (used by multiple pages)
-def _filter_by_date_local(df, date_col, year, months):
-    if date_col not in df.columns:
-        return pd.DataFrame()
-    df_local = df.copy()
-    # Try parsing with dayfirst=True to handle European date formats (common in spreadsheets)
-    df_local[date_col] = pd.to_datetime(df_local[date_col], errors='coerce',dayfirst=True)
-    df_local = df_local.dropna(subset=[date_col])
-    try:
-        year = int(year)
-    except Exception:
-        pass
-    if isinstance(months, (list, tuple, set)):
-        months_list = [int(m) for m in months]
-        df_local = df_local[(df_local[date_col].dt.year == year) & (df_local[date_col].dt.month.isin(months_list))]
+
+@cache.process_resource
+def get_figure_cache():
+    """Built trend figures, shared by every session (bounded by DIALERS_FIGURE_CACHE_SIZE)."""
+    return cache.LRUCache(cache.FIGURE_CACHE_SIZE)
+
+
+# Per page: the trend's value column, its y-axis title and extra charts.trend_figure options
+TREND_CHARTS = {
+    'sales': ('Sales_Count', 'Sales Count', {}),
+    'oplans': ('Oplan_Count', 'Oplans Count', {'label_colors': True}),
+    'others': ('Others_Count', 'Others Count', {}),
+}
+
+
+@perf.track_cache("trend_figure")
+def trend_figure(page, filter_spec, df_trend, forecast=None, anomalies=None):
+    """
+    The page's trend chart for `filter_spec` (year, months, dialer, week, day,
+    resolution) from the shared figure cache, keyed by page, filter spec, forecast
+    overlay on/off, anomaly rings on/off and data version; built with
+    charts.trend_figure on a miss.
+    """
+    def build():
+        perf.record_cache_miss("trend_figure")
+        y_col, y_title, options = TREND_CHARTS[page]
+        return trend_charts().trend_figure(df_trend, y_col, y_title, granularity=filter_spec[-1],
+                                           forecast=forecast, anomalies=anomalies, **options)
+    key = (page, filter_spec, forecast is not None, anomalies is not None, loading.data_version())
+    return get_figure_cache().get_or_create(key, build)
+
+
+@cache.process_resource
+def get_forecast_models():
+    """Fitted forecast models (dialer_core.forecast), shared by every session and refitted only when new days arrive."""
+    from dialer_core import forecast
+    return forecast.ForecastModels()
+
+
+@perf.track_cache("trend_forecast")
+@cache.shared_result(get_result_cache, loading.data_version)
+def trend_forecast(page, year, month_index, dialer, week_str, day_str):
+    """Per-dialer forecast rows for the rest of the selection's days, or None when there is nothing to project."""
+    perf.record_cache_miss("trend_forecast")
+    from dialer_core import forecast
+    indexes = get_intraday_indexes(loading.data_version())
+    if indexes is None:
+        return None
+    table = aggregates.TREND_SOURCES[page][0]
+    frame = forecast.forecast_frame(indexes[table], table, TREND_CHARTS[page][0], year, month_index,
+                                    week_str, day_str, dialer, get_forecast_models())
+    return None if frame.empty else frame
+
+
+def forecast_overlay(page, resolution, year, months, dialer, week, day):
+    """The forecast to draw on the page's daily trend (with its on/off toggle), or None."""
+    if resolution != "Daily":
+        return None
+    frame = trend_forecast(page, year, months, dialer, week, day)
+    if frame is None or not st.toggle("Show forecast", value=True, key=F"forecast_{page}"):
+        return None
+    return frame
+
+
+def page_result(page, year, months, dialer, week, day):
+    """The page's KPI tuple for one selection through the cached page functions (any thread)."""
+    df_attendance, df_sales, df_oplans, df_others, df_sheet2 = load_frames()
+    months = list(months)
+    if page == "sales":
+        return process_and_calculate_data(year, months, dialer, week, day, df_sales, df_oplans, df_attendance)
+    if page == "oplans":
+        return calculate_oplans_data(year, months, dialer, week, day, df_oplans, df_attendance)
+    return calculate_others_data(year, months, dialer, week, day, df_others, df_oplans, df_attendance, df_sheet2)
+
+
+def warm_view(view):
+    """
+    Computes one (page, year, months, dialer, week, day) view into the shared caches:
+    dialer list, KPI tuple and the trend figure at its automatic resolution (with
+    the forecast overlay and anomaly rings on daily trends).
+    """
+    page, year, months, dialer, week, day = view
+    if dialer not in get_attended_dialers(load_frames()[0], year, list(months)):
+        return
+    df_trend = page_result(page, year, months, dialer, week, day)[0]
+    if not df_trend.empty:
+        resolution = trend_charts().resolve_granularity(df_trend, "Auto")
+        daily = resolution == "Daily"
+        forecast = trend_forecast(page, year, list(months), dialer, week, day) if daily else None
+        anomalies = trend_anomalies(page, year, list(months), dialer, week, day) if daily else None
+        trend_figure(page, (year, tuple(months), dialer, week, day, resolution), df_trend, forecast, anomalies)
+
+
+class DashboardSource:
+    """The cached page functions as the data source of the KPI service (dialer_core.service)."""
+
+    def version(self):
+        return loading.data_version()
+
+    def dialers(self, year, months):
+        return get_attended_dialers(load_frames()[0], year, list(months))
+
+    def page_kpis(self, page, year, months, dialer, week, day):
+        return page_result(page, year, months, dialer, week, day)
+
+    def tables(self):
+        return get_prepared_tables(loading.data_version())
+
+
+@cache.process_resource
+def get_kpi_service():
+    """
+    The KPI HTTP service on DIALERS_API_PORT, sharing this process's caches, or None
+    when another dashboard process already owns the port (service.claim_port).
+    """
+    from dialer_core import service
+    return service.start_in_thread(DashboardSource(), service.API_HOST, service.API_PORT)
+
+
+@cache.process_resource
+def get_prewarmer():
+    """The process's prewarm thread (started after the first complete run) and the view visit counts."""
+    return prewarm.Prewarmer(warm_view, loading.data_version, prewarm.VisitLog())
+
+
+def trend_resolution(page, df_trend):
+    """
+    Trend bucket override for `page` (Auto / Daily / Weekly / Monthly) and the
+    resolution it resolves to for `df_trend`.
+    """
+    if df_trend.empty:
+        return "Daily"
+    charts = trend_charts()
+    choice = st.radio("Trend resolution", options=charts.GRANULARITIES, index=0, key=F"granularity_{page}", horizontal=True)
+    return charts.resolve_granularity(df_trend, choice)
+
+
+# Datasets each page offers for export: label -> prepared table, or "kpis" for the per-dialer KPI table
+EXPORT_DATASETS = {
+    'sales': {"Sales rows": 'sales', "Attendance rows": 'attendance', "KPI table (all dialers)": 'kpis'},
+    'oplans': {"O-Plan rows": 'oplans', "Attendance rows": 'attendance', "KPI table (all dialers)": 'kpis'},
+    'others': {"Other lead rows": 'others', "O-Plan rows": 'oplans', "Attendance rows": 'attendance', "KPI table (all dialers)": 'kpis'},
+}
+# Largest row export the dashboard builds in memory for st.download_button
+EXPORT_DOWNLOAD_ROWS = int(os.environ.get("DIALERS_EXPORT_DOWNLOAD_ROWS", "200000"))
+
+
+def export_panel(page, year, months, dialer, week, day):
+    """
+    Export of the page's filtered rows or KPI table. The file is written in chunks
+    (dialer_core.export) to a temporary file when asked for, then offered for download.
+    `st.download_button` holds the whole file in memory, so row exports above
+    EXPORT_DOWNLOAD_ROWS rows are left to the KPI service's streaming /export.
+    """
+    with st.expander("Export data"):
+        from dialer_core import export
+
+        left, right = st.columns([2, 1])
+        label = left.selectbox("Data", options=list(EXPORT_DATASETS[page]), key=F"export_data_{page}")
+        fmt = right.radio("Format", options=list(export.FORMATS), key=F"export_format_{page}", horizontal=True)
+        dataset = EXPORT_DATASETS[page][label]
+        name = F"{page}_kpis" if dataset == 'kpis' else dataset
+
+        service_url = None
+        if os.environ.get("DIALERS_API_PORT"):
+            from dialer_core import service
+            route = F"kpis/{page}" if dataset == 'kpis' else dataset
+            query = urlencode({'year': year, 'months': ",".join(map(str, months)), 'dialer': dialer, 'week': week, 'day': day, 'format': fmt})
+            service_url = F"http://{service.API_HOST}:{service.API_PORT}/export/{route}?{query}"
+            st.caption(F"Streamed by the KPI service: {service_url}")
+
+        if not st.button("Prepare file", key=F"export_prepare_{page}"):
+            return
+        with perf.stage(F"{page}.export"):
+            if dataset == 'kpis':
+                chunks = iter([export.kpi_table(DashboardSource(), page, year, months, week, day)])
+            else:
+                tables = get_prepared_tables(loading.data_version())
+                if tables is None:
+                    st.warning("The data has no dated tables to export.")
+                    return
+                positions = export.selection_positions(tables, dataset, year, months, dialer, week, day)
+                if len(positions) > EXPORT_DOWNLOAD_ROWS:
+                    where = (F"Download it from the KPI service instead: {service_url}" if service_url
+                             else "Start the dashboard with DIALERS_API_PORT set to stream it from the KPI service's /export.")
+                    st.warning(F"The selection has {len(positions):,} rows, more than the {EXPORT_DOWNLOAD_ROWS:,} "
+                               F"the dashboard can offer for download. {where}")
+                    return
+                chunks = export.position_rows(tables, dataset, positions)
+            with tempfile.TemporaryFile() as sink:
+                export.write_export(fmt, chunks, sink, name)
+                sink.seek(0)
+                # download_button takes the finished file as bytes (capped above); the KPI service's /export streams instead
+                data = sink.read()
+        filename = export.export_filename(name, year, months, fmt)
+        st.download_button(F"Download {filename}", data=data, file_name=filename,
+                           mime=export.FORMATS[fmt][0], key=F"export_download_{page}")
+
+
+@cache.process_resource
+def get_conversion_index(data_version):
+    """O-Plan leads matched to their sales (dialer_core.leads), once per process and data version."""
+    from dialer_core import leads
+    tables = get_prepared_tables(data_version)
+    return None if tables is None else leads.ConversionIndex(tables['oplans'], tables['sales'])
+
+
+@perf.track_cache("lead_conversion")
+@cache.shared_result(get_result_cache, loading.data_version)
+def lead_conversion(year, month_index, dialer, week_str, day_str):
+    """The per-dialer conversion funnel of the leads first O-Planned in the selection, or None without a lead key."""
+    perf.record_cache_miss("lead_conversion")
+    index = get_conversion_index(loading.data_version())
+    if index is None or not index.available:
+        return None
+    return index.summary(year, month_index, week_str, day_str, dialer)
+
+
+def conversion_panel(year, months, dialer, week, day, period_label):
+    """Lead-level O-Plan -> sale conversion rate and time to close per dialer."""
+    from dialer_core import leads
+    with st.expander(F"Lead conversion (O-Plan → sale) in {period_label} {year}"):
+        with perf.stage("sales.conversion"):
+            funnel = lead_conversion(year, list(months), dialer, week, day)
+        if funnel is None:
+            st.info(F"O_Plan_Leads and sales need a '{leads.LEAD_KEY}' lead key column for the conversion funnel "
+                    F"(DIALERS_LEAD_KEY: {', '.join(leads.LEAD_KEYS)}).")
+            return
+        st.dataframe(funnel, hide_index=True, use_container_width=True)
+        st.caption(F"Leads are counted on the day of their first O-Plan, matched on {leads.LEAD_KEY}; "
+                   F"converted means a sale within {leads.CONVERSION_DAYS} days after it.")
+
+
+# --- RAW RECORD DRILL-DOWN ---
+
+@cache.process_resource
+def get_record_indexes(data_version):
+    """Day/dialer index of the rows behind each page's trend (dialer_core.records), once per process and data version."""
+    from dialer_core import records
+    tables = get_prepared_tables(data_version)
+    if tables is None:
+        return None
+    return {page: records.RecordIndex(tables[table]) for page, table in records.DRILLDOWN_TABLES.items()}
+
+
+def drilldown_periods(year, months, week_str, day_str, resolution):
+    """{bucket start day: day numbers} of the selection at the chart's resolution (one bucket per chart point)."""
+    from dialer_core import records
+    return records.bucket_days(aggregates.selection_days(year, months, week_str, day_str), resolution)
+
+
+@perf.track_cache("drilldown_positions")
+@cache.shared_result(get_result_cache, loading.data_version)
+def drilldown_positions(page, year, month_index, week_str, day_str, resolution, period, dialer, search, sort_by, descending):
+    """
+    Row positions of the page's table in the selection, or only in its chart point
+    `period` (a bucket start day), searched and sorted; None without prepared tables.
+    """
+    perf.record_cache_miss("drilldown_positions")
+    indexes = get_record_indexes(loading.data_version())
+    if indexes is None:
+        return None
+    index = indexes[page]
+    periods = drilldown_periods(year, month_index, week_str, day_str, resolution)
+    days = periods.get(period, []) if period is not None else aggregates.selection_days(year, month_index, week_str, day_str)
+    positions = index.search(index.positions(days, dialer), search)
+    return index.sort(positions, sort_by, ascending=not descending)
+
+
+def drilldown_period_label(days, resolution):
+    """Drill-down label of one chart point: its day, its week's first selected day or its month."""
+    first = pd.Timestamp(days[0], unit='D')
+    if resolution == "Weekly":
+        return F"Week of {first:%Y-%m-%d}"
+    if resolution == "Monthly":
+        return F"{first:%B %Y}"
+    return F"{first:%Y-%m-%d}"
+
+
+def drilldown_panel(page, year, months, dialer, week, day, resolution, chart_event):
+    """
+    The raw rows behind one point of the page's trend chart, a page at a time. A click
+    on the chart picks the point's period and dialer; the boxes pick them by hand.
+    Search and sort run on the server over the day/dialer index (dialer_core.records).
+    """
+    from dialer_core import records
+    indexes = get_record_indexes(loading.data_version())
+    if indexes is None:
+        return
+    periods = drilldown_periods(year, months, week, day, resolution)
+    period_options = [None] + list(periods)
+    if dialer == "All Dialers":
+        dialer_options = ["All Dialers"] + [d for d in indexes[page].dialers if d != aggregates.NO_DIALER]
     else:
-        df_local = df_local[(df_local[date_col].dt.year == year) & (df_local[date_col].dt.month == int(months))]
-    return df_local
-
-# Helper function to apply week filter (used by multiple pages)
-def _apply_week_filter_local(df, date_col, week_str):
-    if week_str != "All Weeks" and not df.empty and date_col in df.columns:
-        try:
-            start_date_str = week_str.split('(')[1].split(' to ')[0]
-            end_date_str = week_str.split(' to ')[1].replace(')', '')
-            start_date = pd.to_datetime(start_date_str).date()
-            end_date = pd.to_datetime(end_date_str).date()
-
-            # Must convert to date type for comparison
-            df['DateOnly'] = pd.to_datetime(df[date_col], errors='coerce', dayfirst=True).dt.date
-            # Filter for dates within the week range (Mon=0 to Fri=4)
-            df['Weekday'] = pd.to_datetime(df[date_col], errors='coerce', dayfirst=True).dt.weekday
-            df_out = df[(df['DateOnly'] >= start_date) & (df['DateOnly'] <= end_date) & (df['Weekday'] <= 4)].copy()
-            df_out.drop(columns=['DateOnly', 'Weekday'], inplace=True, errors='ignore')
-            return df_out
-        except Exception:
-            return df
-    return df
-
-# NEW HELPER: Helper function to apply day filter
-def _apply_day_filter_local(df, date_col, selected_day_str):
-    if selected_day_str != "All Days" and not df.empty and date_col in df.columns:
-        try:
-            target_date = pd.to_datetime(selected_day_str).date()
-            
-            # Ensure the date column is clean and converted to date part only
-            df['DateOnly'] = pd.to_datetime(df[date_col], errors='coerce', dayfirst=True).dt.date
-            df_out = df[df['DateOnly'] == target_date].copy()
-            df_out.drop(columns=['DateOnly'], inplace=True, errors='ignore')
-            return df_out
-        except Exception:
-            return df
-    return df
-
-# Helper function to apply dialer filter (used by multiple pages)
-def _apply_dialer_filter_local(df, dialer_col, selected_dialer):
-    if df.empty or dialer_col not in df.columns:
-        return df
-
-    if isinstance(selected_dialer, (list, tuple, set)):
-        if len(selected_dialer) == 0 or 'All Dialers' in selected_dialer:
-            pass
-        else:
-            cleaned_selected_dialers = [d.strip().upper() for d in selected_dialer if d != "All Dialers"]
-            df = df[df[dialer_col].isin(cleaned_selected_dialers)].copy()
-    elif selected_dialer != "All Dialers":
-        cleaned_dialer = selected_dialer.strip().upper()
-        df = df[df[dialer_col] == cleaned_dialer].copy()
-    
-    return df
+        dialer_options = [dialer]
+    period_key, dialer_key, page_key = F"drilldown_period_{page}", F"drilldown_dialer_{page}", F"drilldown_page_{page}"
+
+    # Drop choices left over from another selection before the boxes are created
+    if st.session_state.get(period_key) not in period_options:
+        st.session_state.pop(period_key, None)
+    if st.session_state.get(dialer_key) not in dialer_options:
+        st.session_state.pop(dialer_key, None)
+    # A new click selects its point once; the boxes can still be changed afterwards
+    points = chart_event.selection.points if chart_event else []
+    if points:
+        click = (str(points[0].get('x')), points[0].get('legendgroup'))
+        if st.session_state.get(F"drilldown_click_{page}") != click:
+            st.session_state[F"drilldown_click_{page}"] = click
+            clicked_day = pd.Timestamp(click[0]).to_datetime64().astype('datetime64[D]').astype('int64')
+            start = next((s for s, days in periods.items() if clicked_day in days), None)
+            if start is not None:
+                st.session_state[period_key] = start
+            if click[1] in dialer_options:
+                st.session_state[dialer_key] = click[1]
+            st.session_state[page_key] = 1
+
+    with st.expander("Raw records", expanded=bool(points)):
+        period_col, dialer_col, search_col, sort_col, order_col = st.columns([2, 2, 3, 2, 1])
+        period = period_col.selectbox(
+            "Chart point", options=period_options, key=period_key,
+            format_func=lambda s: "Whole selection" if s is None else drilldown_period_label(periods[s], resolution))
+        selected_dialer = dialer_col.selectbox("Dialer", options=dialer_options, key=dialer_key)
+        search = search_col.text_input("Search", key=F"drilldown_search_{page}", placeholder="Text in any column")
+        sort_by = sort_col.selectbox(
+            "Sort by", options=[None] + list(indexes[page].df.columns), key=F"drilldown_sort_{page}",
+            format_func=lambda c: "Time" if c is None else c)
+        descending = order_col.toggle("Desc", key=F"drilldown_desc_{page}")
+
+        with perf.stage(F"{page}.drilldown"):
+            positions = drilldown_positions(page, year, list(months), week, day, resolution, period,
+                                            selected_dialer, search.strip(), sort_by, descending)
+        if positions is None or not len(positions):
+            st.info("No rows match.")
+            return
+        pages = records.page_count(positions)
+        if st.session_state.get(page_key, 1) > pages:
+            st.session_state[page_key] = pages
+        number = st.number_input(F"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=page_key)
+        with perf.stage(F"{page}.drilldown_page"):
+            rows = indexes[page].page(positions, number)
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        first = (number - 1) * records.PAGE_ROWS
+        st.caption(F"Rows {first + 1:,}–{first + len(rows):,} of {len(positions):,}")
+
+
+def traced_fragment(page):
+    """
+    Full reruns are traced by the script itself; a fragment-only rerun skips the
+    script, so the decorated section opens and logs its own trace.
+    """
+    def decorator(section_fn):
+        @functools.wraps(section_fn)
+        def wrapper(*args, **kwargs):
+            ctx = get_script_run_ctx()
+            if ctx is None or not ctx.fragment_ids_this_run:
+                return section_fn(*args, **kwargs)
+            perf.begin_rerun(ctx.session_id)
+            perf.set_page(F"{page} (fragment)")
+            try:
+                return section_fn(*args, **kwargs)
+            finally:
+                perf.end_rerun()
+        return wrapper
+    return decorator
+
 
 def show_sales_dashboard(df_attendance, df_sales, df_oplans):
     """
     Renders the Sales Performance Dashboard (the original content).
     """
     # --- FILTER WIDGETS MOVED TO SIDEBAR ---
-    st.sidebar.markdown("---")
-    st.sidebar.subheader("Filter Sales Data")
-
-    # 4a. Year Selector
-    selected_year = st.sidebar.selectbox("Select Year", options=YEARS, index=YEARS.index(2025) if 2025 in YEARS else 0, key="year_sales")
-
-    # 4b. Month Selector (multi-select)
-    default_month_name = "November"
-    selected_month_names = st.sidebar.multiselect(
-        "Select Month (you may choose multiple)",
-        options=MONTH_NAMES,
-        default=[default_month_name],
-        key="month_sales"
-    )
-    # Ensure at least one month is selected
-    if not selected_month_names:
-        selected_month_names = [default_month_name]
-    # Convert month names to month indices (1-12)
-    selected_month_index = [MONTH_NAMES.index(M) + 1 for M in selected_month_names]
-
-    # 4c. Week Selector (Dynamic). Disabled when multiple months selected.
-    if len(selected_month_index) == 1:
-        single_month_name = selected_month_names[0]
-        weeks_list = get_weeks_in_month(selected_year, single_month_name)
-        selected_week = st.sidebar.selectbox("Select Week", options=weeks_list, key="week_sales")
+    with perf.stage("sales.widgets"):
+        st.sidebar.markdown("---")
+        st.sidebar.subheader("Filter Sales Data")
+
+        # 4a. Year Selector
+        selected_year = st.sidebar.selectbox("Select Year", options=YEARS, index=YEARS.index(2025) if 2025 in YEARS else 0, key="year_sales")
+
+        # 4b. Month Selector (multi-select)
+        default_month_name = "November"
+        selected_month_names = st.sidebar.multiselect(
+            "Select Month (you may choose multiple)",
+            options=MONTH_NAMES,
+            default=[default_month_name],
+            key="month_sales"
+        )
+        # Ensure at least one month is selected
+        if not selected_month_names:
+            selected_month_names = [default_month_name]
+        # Convert month names to month indices (1-12)
+        selected_month_index = [MONTH_NAMES.index(M) + 1 for M in selected_month_names]
+
+        # 4c. Week Selector (Dynamic). Disabled when multiple months selected.
+        if len(selected_month_index) == 1:
+            single_month_name = selected_month_names[0]
+            weeks_list = get_weeks_in_month(selected_year, single_month_name)
+            selected_week = st.sidebar.selectbox("Select Week", options=weeks_list, key="week_sales")
         
-        # 4d. Day Selector (Dynamic). Enabled only when a single month is selected.
-        days_list = get_days_in_period(selected_year, single_month_name, selected_week)
-        selected_day = st.sidebar.selectbox("Select Day", options=days_list, key="day_sales")
-    else:
-        selected_week = "All Weeks"
-        selected_day = "All Days"
-        st.sidebar.markdown("_Week and Day selection disabled for multiple months._")
+            # 4d. Day Selector (Dynamic). Enabled only when a single month is selected.
+            days_list = get_days_in_period(selected_year, single_month_name, selected_week)
+            selected_day = st.sidebar.selectbox("Select Day", options=days_list, key="day_sales")
+        else:
+            selected_week = "All Weeks"
+            selected_day = "All Days"
+            st.sidebar.markdown("_Week and Day selection disabled for multiple months._")
+
+    sales_section(df_attendance, df_sales, df_oplans, selected_year, selected_month_names, selected_month_index, selected_week, selected_day)
 
 
-    # 4e. Dialer Selector (NOW MULTI-SELECT - Dialers returned are already Uppercase/Cleaned)
-    dialers_list = get_attended_dialers(df_attendance, selected_year, selected_month_index)
-    selected_dialer = st.sidebar.radio("Select Dialer", options=dialers_list, index=0, key="dialer_sales")
+@st.experimental_fragment
+@traced_fragment("Sales Performance")
+def sales_section(df_attendance, df_sales, df_oplans, selected_year, selected_month_names, selected_month_index, selected_week, selected_day):
+    """
+    Dialer selector, trend chart and KPI cards of the Sales page. Runs as a
+    fragment, so changing the dialer reruns and re-sends only this section.
+    """
+    # Dialer Selector (Dialers returned are already Uppercase/Cleaned)
+    with perf.stage("sales.dialer_widget"):
+        dialers_list = get_attended_dialers(df_attendance, selected_year, selected_month_index)
+        selected_dialer = st.radio("Select Dialer", options=dialers_list, index=0, key="dialer_sales", horizontal=True)
+
     # --- EXECUTE CORE FUNCTION ---
-    df_sales_trend, sales_percentage, avg_sales_per_day, avg_att_per_dialer, avg_att_per_day, total_sales_count = \
-        process_and_calculate_data(
-            selected_year, selected_month_index, selected_dialer, selected_week, selected_day, 
-            df_sales.copy(), df_oplans.copy(), df_attendance.copy()
-        )
+    with perf.stage("sales.compute"):
+        df_sales_trend, sales_percentage, avg_sales_per_day, avg_att_per_dialer, avg_att_per_day, total_sales_count = \
+            process_and_calculate_data(
+                selected_year, selected_month_index, selected_dialer, selected_week, selected_day, 
+                df_sales, df_oplans, df_attendance
+            )
+    perf.note_frame("sales.trend", df_sales_trend)
+    get_prewarmer().visits.record("sales", selected_year, selected_month_index, selected_dialer, selected_week, selected_day)
 
     # --- DISPLAY DASHBOARD LAYOUT (KPI Cards and Chart) ---
     with st.container():
@@ -636,261 +848,116 @@ def show_sales_dashboard(df_attendance, df_sales, df_oplans):
         # --- Column 2: Main Content Area (Chart) ---
         with main_body_col2:
             # Row 2: Line Chart (Daily sales trend)
-            st.markdown(f'<p class="chart-title-p">Daily Sales Count Trend in {period_label} {selected_year}</p>', unsafe_allow_html=True)
+            with perf.stage("sales.resolution_widget"):
+                resolution = trend_resolution("sales", df_sales_trend)
+            st.markdown(f'<p class="chart-title-p">{resolution} Sales Count Trend in {period_label} {selected_year}</p>', unsafe_allow_html=True)
 
             if not df_sales_trend.empty:
-                # Color map for consistency
-                color_map_sales = {
-                    'SA2': '#8C1007',
-                    'SA3': '#EB5A3C',
-                    'SA4': '#DF9755',
-                    'HU1': "#83CBE7"
-                }
-                
-                # Determine if we should color by Dialer (if multiple selected or All)
-                if DIALER_COLUMN in df_sales_trend.columns:
-                    unique_dialers_in_chart = df_sales_trend[DIALER_COLUMN].unique()
-                    chart_color_col = DIALER_COLUMN
-                else:
-                    unique_dialers_in_chart = []
-                    chart_color_col = None
-
-                # Plot the line chart
-                fig = px.line(
-                    df_sales_trend, 
-                    x='Date', 
-                    y='Sales_Count', 
-                    color=chart_color_col,
-                    color_discrete_map=color_map_sales if chart_color_col else None,
-                    title='', 
-                    line_shape='spline'
-                )
-
-                # Style the traces
-                fig.update_traces(line=dict(smoothing=1.3, width=2.5), marker=dict(size=8))
-                
-                # Y-axis range logic
-                max_sales_val = df_sales_trend['Sales_Count'].max() if not df_sales_trend.empty else None
-                # Add a small buffer so the top of the chart is above the highest point
-                buffer = 3
-                top_range = (max_sales_val + buffer) if (max_sales_val is not None and max_sales_val > 0) else 1
-
-                # Customize the chart appearance for the dark theme
-                fig.update_layout(
-                    height=520, # make the chart taller so it fills the page
-                    plot_bgcolor='#1e1e1e',
-                    paper_bgcolor='#1e1e1e',
-                    font_color='white',
-                    legend_title_text='Dialer' if chart_color_col else None,
-                    xaxis_title='Date',
-                    yaxis_title='Sales Count',
-                    margin=dict(l=10, r=10, t=20, b=40),
-                    # Use a date x-axis so Plotly plots lines chronologically
-                    xaxis={'type': 'date'},
-                    # Expand the top of the y-axis by `buffer` and remove thousand separators
-                    yaxis={'range': [0, top_range], 'tickformat': '.0f'}
-                )
-                # Ensure x-axis is treated as dates
-                fig.update_xaxes(type='date')
-
-                # Add labels (numbers) to the data points
-                # Limit labels per series to avoid clutter: sample up to `max_labels` evenly
-                max_labels = 8
-                def add_labels_to_trace(df_to_label):
-                    n = len(df_to_label)
-                    if n == 0: return
-                    step = max(1, math.ceil(n / max_labels))
-                    sampled_idx = list(range(0, n, step))
-                    
-                    x_sample = df_to_label['Date'].iloc[sampled_idx]
-                    y_sample = df_to_label['Sales_Count'].iloc[sampled_idx]
-                    labels = y_sample.astype(int).astype(str)
-
-                    fig.add_scatter(
-                        x=x_sample, y=y_sample, 
-                        mode='text', 
-                        text=labels, 
-                        textposition="top center", 
-                        showlegend=False, 
-                        textfont=dict(color='white', size=11)
-                    )
-
-                if chart_color_col:
-                    for D in unique_dialers_in_chart:
-                        df_subset = df_sales_trend[df_sales_trend[DIALER_COLUMN] == D].sort_values('Date')
-                        add_labels_to_trace(df_subset)
-                else:
-                    add_labels_to_trace(df_sales_trend)
-
-
-                # Render the chart with an explicit height so Streamlit reserves vertical space
-                st.plotly_chart(fig, use_container_width=True, height=800, config={'displayModeBar': False})
+                with perf.stage("sales.forecast"):
+                    forecast = forecast_overlay("sales", resolution, selected_year, selected_month_index, selected_dialer, selected_week, selected_day)
+                with perf.stage("sales.anomalies"):
+                    anomalies = trend_anomalies("sales", selected_year, selected_month_index, selected_dialer, selected_week, selected_day) if resolution == "Daily" else None
+                with perf.stage("sales.figure"):
+                    fig = trend_figure(
+                        "sales", (selected_year, tuple(selected_month_index), selected_dialer, selected_week, selected_day, resolution),
+                        df_sales_trend, forecast, anomalies)
+
+                with perf.stage("sales.plotly_chart"):
+                    chart_event = st.plotly_chart(fig, use_container_width=True, height=800, config={'displayModeBar': False},
+                                                  on_select="rerun", selection_mode="points", key="trend_chart_sales")
+                drilldown_panel("sales", selected_year, selected_month_index, selected_dialer, selected_week, selected_day, resolution, chart_event)
             else:
                 st.info(f"No sales data found for the selected period ({period_label}).")
 
 
         # --- Column 3: KPI Cards (Right Side) ---
         with main_body_col3:
-            # --- Title for the KPI Cards ---
-            st.markdown(f'<p class="chart-title-p">KPI calculations in {period_label} {selected_year}</p>', unsafe_allow_html=True)
+            with perf.stage("sales.kpi_cards"):
+                # --- Title for the KPI Cards ---
+                st.markdown(f'<p class="chart-title-p">KPI calculations in {period_label} {selected_year}</p>', unsafe_allow_html=True)
             
-            # KPI 1: Sales Count
-            st.markdown(f'<div class="kpi-card-red"><h3>Total Sales Count</h3><p>{total_sales_count}</p></div>', unsafe_allow_html=True)
+                # KPI 1: Sales Count
+                st.markdown(f'<div class="kpi-card-red"><h3>Total Sales Count</h3><p>{total_sales_count}</p></div>', unsafe_allow_html=True)
             
-            # KPI 2: Sales % (Commented out as requested previously)
-            # st.markdown(f'<div class="kpi-card-red"><h3>Sales %</h3><p>{sales_percentage}%</p></div>', unsafe_allow_html=True)
+                # KPI 2: Sales % (Commented out as requested previously)
+                # st.markdown(f'<div class="kpi-card-red"><h3>Sales %</h3><p>{sales_percentage}%</p></div>', unsafe_allow_html=True)
             
-            # KPI 3: Average Sales per day
-            st.markdown(f'<div class="kpi-card-red"><h3>Average Sales per day</h3><p>{avg_sales_per_day}</p></div>', unsafe_allow_html=True)
+                # KPI 3: Average Sales per day
+                st.markdown(f'<div class="kpi-card-red"><h3>Average Sales per day</h3><p>{avg_sales_per_day}</p></div>', unsafe_allow_html=True)
 
-            # KPI 4: Average Attendance per Dialer
-            st.markdown(f'<div class="kpi-card-red"><h3>Avg Attendance per Dialer</h3><p>{avg_att_per_dialer}</p></div>', unsafe_allow_html=True)
+                # KPI 4: Average Attendance per Dialer
+                st.markdown(f'<div class="kpi-card-red"><h3>Avg Attendance per Dialer</h3><p>{avg_att_per_dialer}</p></div>', unsafe_allow_html=True)
 
-            # KPI 5: Average Attendance per day
-            st.markdown(f'<div class="kpi-card-red"><h3>Avg Attendance per day</h3><p>{avg_att_per_day}</p></div>', unsafe_allow_html=True)
+                # KPI 5: Average Attendance per day
+                st.markdown(f'<div class="kpi-card-red"><h3>Avg Attendance per day</h3><p>{avg_att_per_day}</p></div>', unsafe_allow_html=True)
             
         st.markdown('</div>', unsafe_allow_html=True)
 
+    conversion_panel(selected_year, selected_month_index, selected_dialer, selected_week, selected_day, period_label)
+    export_panel("sales", selected_year, selected_month_index, selected_dialer, selected_week, selected_day)
+
 
 def show_oplans_dashboard(df_attendance, df_oplans):
     """
     Renders the Oplans Performance Dashboard.
     """
-    st.sidebar.markdown("---")
-    st.sidebar.subheader("Filter Oplans Data")
+    with perf.stage("oplans.widgets"):
+        st.sidebar.markdown("---")
+        st.sidebar.subheader("Filter Oplans Data")
     
-    # Year selector
-    selected_year_op = st.sidebar.selectbox("Select Year (Oplans)", options=YEARS, index=YEARS.index(2025) if 2025 in YEARS else 0, key="year_oplans")
-
-    # Month multiselect
-    default_month_name = "November"
-    selected_month_names_op = st.sidebar.multiselect(
-        "Select Month (you may choose multiple)",
-        options=MONTH_NAMES,
-        default=[default_month_name],
-        key="month_oplans"
-    )
-    if not selected_month_names_op:
-        selected_month_names_op = [default_month_name]
-    selected_month_indices_op = [MONTH_NAMES.index(m) + 1 for m in selected_month_names_op]
-
-    # Week selection disabled for multi-month selection
-    if len(selected_month_indices_op) == 1:
-        single_month_name_op = selected_month_names_op[0]
-        weeks_list_op = get_weeks_in_month(selected_year_op, single_month_name_op)
-        selected_week_op = st.sidebar.selectbox("Select Week (Oplans)", options=weeks_list_op, key="week_oplans")
+        # Year selector
+        selected_year_op = st.sidebar.selectbox("Select Year (Oplans)", options=YEARS, index=YEARS.index(2025) if 2025 in YEARS else 0, key="year_oplans")
+
+        # Month multiselect
+        default_month_name = "November"
+        selected_month_names_op = st.sidebar.multiselect(
+            "Select Month (you may choose multiple)",
+            options=MONTH_NAMES,
+            default=[default_month_name],
+            key="month_oplans"
+        )
+        if not selected_month_names_op:
+            selected_month_names_op = [default_month_name]
+        selected_month_indices_op = [MONTH_NAMES.index(m) + 1 for m in selected_month_names_op]
+
+        # Week selection disabled for multi-month selection
+        if len(selected_month_indices_op) == 1:
+            single_month_name_op = selected_month_names_op[0]
+            weeks_list_op = get_weeks_in_month(selected_year_op, single_month_name_op)
+            selected_week_op = st.sidebar.selectbox("Select Week (Oplans)", options=weeks_list_op, key="week_oplans")
         
-        # Day Selector (Dynamic). Enabled only when a single month is selected.
-        days_list_op = get_days_in_period(selected_year_op, single_month_name_op, selected_week_op)
-        selected_day_op = st.sidebar.selectbox("Select Day (Oplans)", options=days_list_op, key="day_oplans")
-    else:
-        selected_week_op = "All Weeks"
-        selected_day_op = "All Days"
-        st.sidebar.markdown("_Week and Day selection disabled for multiple months._")
-
-    # Dialer selector for Oplans (multi-select - Dialers returned are already Uppercase/Cleaned)
-    dialers_list_op = get_attended_dialers(df_attendance, selected_year_op, selected_month_indices_op)
-    selected_dialer_op = st.sidebar.radio("Select Dialer (Oplans)", options=dialers_list_op, index=0, key="dialer_oplans")
-
-    # --- Normalize column names and CLEAN data ---
-    df_oplans_local = _standardize_df(df_oplans, DATE_COLUMN_SALES, DIALER_COLUMN)
-    df_attendance_local = _standardize_df(df_attendance, 'date', DIALER_COLUMN)
-
-    # Filter oplans by selected year/month(s)
-    df_oplans_filtered = _filter_by_date_local(df_oplans_local, DATE_COLUMN_SALES, selected_year_op, selected_month_indices_op)
-    # Apply week filter
-    df_oplans_filtered = _apply_week_filter_local(df_oplans_filtered, DATE_COLUMN_SALES, selected_week_op)
-    # Apply day filter (NEW)
-    df_oplans_filtered = _apply_day_filter_local(df_oplans_filtered, DATE_COLUMN_SALES, selected_day_op)
-    # Apply dialer filter from the Oplans sidebar selector
-    df_oplans_filtered = _apply_dialer_filter_local(df_oplans_filtered, DIALER_COLUMN, selected_dialer_op)
-    
-    # KPI calculations for Oplans
-    total_oplans_count = df_oplans_filtered.shape[0]
-
-    days_with_oplans_df = df_oplans_filtered[pd.to_datetime(df_oplans_filtered[DATE_COLUMN_SALES], errors='coerce').notna()]
-    if not days_with_oplans_df.empty:
-        unique_days = pd.to_datetime(days_with_oplans_df[DATE_COLUMN_SALES], errors='coerce').dt.date.nunique()
-    else:
-        unique_days = 0
-    avg_oplans_per_day = round(total_oplans_count / unique_days) if unique_days > 0 else 0
+            # Day Selector (Dynamic). Enabled only when a single month is selected.
+            days_list_op = get_days_in_period(selected_year_op, single_month_name_op, selected_week_op)
+            selected_day_op = st.sidebar.selectbox("Select Day (Oplans)", options=days_list_op, key="day_oplans")
+        else:
+            selected_week_op = "All Weeks"
+            selected_day_op = "All Days"
+            st.sidebar.markdown("_Week and Day selection disabled for multiple months._")
 
-    # Opener status ratio: try to find a sensible status column
-    status_col = next((c for c in df_oplans_filtered.columns if 'opener' in c.lower() and 'status' in c.lower()), None)
-    if status_col is None:
-        status_col = next((c for c in df_oplans_filtered.columns if 'opener' in c.lower()), None)
-    if status_col is None:
-        status_col = next((c for c in df_oplans_filtered.columns if 'status' in c.lower()), None)
+    oplans_section(df_attendance, df_oplans, selected_year_op, selected_month_names_op, selected_month_indices_op, selected_week_op, selected_day_op)
 
 
-    # MODIFIED LOGIC HERE: Calculate Transfer Ratio based on explicit status list
-    transfer_ratio_pct = 0
-    if not df_oplans_filtered.empty and status_col in df_oplans_filtered.columns:
-        df_oplans_filtered['_status_clean'] = df_oplans_filtered[status_col].astype(str).str.strip().str.upper()
-        
-        # Define the statuses that count as a 'transfer' (numerator) as requested by the user
-        # Values confirmed by user: 'Transferred', 'Green Flag', 'Red Flags' (must be uppercase to match cleaning)
-        transfer_statuses = {'TRANSFERRED', 'GREEN FLAG', 'RED FLAGS'} 
-        
-        # Count only the desired statuses
-        transfer_count = df_oplans_filtered[
-            df_oplans_filtered['_status_clean'].isin(transfer_statuses)
-        ].shape[0]
-        
-        # Denominator is total Oplans count (already calculated)
-        transfer_ratio_pct = round((transfer_count / total_oplans_count) * 100) if total_oplans_count > 0 else 0
-    
-    # Attendance KPIs for Oplans page
-    df_att_local_filtered = _filter_by_date_local(df_attendance_local, 'date', selected_year_op, selected_month_indices_op)
-    df_att_local_filtered = _apply_week_filter_local(df_att_local_filtered, 'date', selected_week_op)
-    df_att_local_filtered = _apply_day_filter_local(df_att_local_filtered, 'date', selected_day_op) # Apply day filter
-    df_att_local_filtered = _apply_dialer_filter_local(df_att_local_filtered, DIALER_COLUMN, selected_dialer_op)
-    total_att_count_op = df_att_local_filtered['attendance'].sum() if 'attendance' in df_att_local_filtered.columns and not df_att_local_filtered.empty else 0
-    days_with_att_op = df_att_local_filtered['date'].dt.date.nunique() if 'date' in df_att_local_filtered.columns and not df_att_local_filtered.empty else 0
-    avg_att_per_day_op = round(total_att_count_op / days_with_att_op) if days_with_att_op > 0 else 0
-    
-    # --- Oplans Trend Calculation Block ---
-    df_oplans_trend = pd.DataFrame(columns=['Date', DIALER_COLUMN, 'Oplan_Count'])
-    if not df_oplans_filtered.empty and DATE_COLUMN_SALES in df_oplans_filtered.columns:
-        df_temp = df_oplans_filtered.copy()
-        
-        # Use a temporary column for cleaned dialer names to handle multi-index reset later
-        if DIALER_COLUMN in df_temp.columns:
-            df_temp['_DialerClean'] = df_temp[DIALER_COLUMN]
-        else:
-            df_temp['_DialerClean'] = 'UNKNOWN'
+@st.experimental_fragment
+@traced_fragment("Oplans Performance")
+def oplans_section(df_attendance, df_oplans, selected_year_op, selected_month_names_op, selected_month_indices_op, selected_week_op, selected_day_op):
+    """
+    Dialer selector, trend chart and KPI cards of the Oplans page. Runs as a
+    fragment, so changing the dialer reruns and re-sends only this section.
+    """
+    # Dialer selector for Oplans (Dialers returned are already Uppercase/Cleaned)
+    with perf.stage("oplans.dialer_widget"):
+        dialers_list_op = get_attended_dialers(df_attendance, selected_year_op, selected_month_indices_op)
+        selected_dialer_op = st.radio("Select Dialer (Oplans)", options=dialers_list_op, index=0, key="dialer_oplans", horizontal=True)
 
-        df_temp['Date'] = pd.to_datetime(df_temp[DATE_COLUMN_SALES], errors='coerce').dt.normalize()
-        df_temp = df_temp.dropna(subset=['Date'])
-        
-        if DIALER_COLUMN in df_oplans_filtered.columns:
-            df_oplans_trend = (
-                df_temp
-                .groupby(['Date', '_DialerClean'])
-                .size()
-                .reset_index(name='Oplan_Count')
-                .rename(columns={'_DialerClean': DIALER_COLUMN})
-            )
-        else:
-            df_oplans_trend = (
-                df_temp
-                .groupby('Date')
-                .size()
-                .reset_index(name='Oplan_Count')
+    # --- EXECUTE CORE FUNCTION ---
+    with perf.stage("oplans.compute"):
+        df_oplans_trend, avg_oplans_per_day, transfer_ratio_pct, total_oplans_count, avg_att_per_day_op = \
+            calculate_oplans_data(
+                selected_year_op, selected_month_indices_op, selected_dialer_op, selected_week_op, selected_day_op,
+                df_oplans, df_attendance
             )
-            df_oplans_trend[DIALER_COLUMN] = 'TOTAL' # Use a single label when no dialer column is found
-
-        df_oplans_trend['Date'] = pd.to_datetime(df_oplans_trend['Date'])
-        df_oplans_trend = df_oplans_trend.sort_values(['Date', DIALER_COLUMN])
-        
-        # Remove the 'UNKNOWN' group if a specific dialer was selected
-        if isinstance(selected_dialer_op, (list, tuple, set)):
-            if 'All Dialers' not in selected_dialer_op:
-                df_oplans_trend = df_oplans_trend[df_oplans_trend[DIALER_COLUMN] != 'UNKNOWN']
-        elif selected_dialer_op != 'All Dialers':
-            df_oplans_trend = df_oplans_trend[df_oplans_trend[DIALER_COLUMN] != 'UNKNOWN']
-            
-    # --- END Oplans Trend Block ---
+    perf.note_frame("oplans.trend", df_oplans_trend)
+    get_prewarmer().visits.record("oplans", selected_year_op, selected_month_indices_op, selected_dialer_op, selected_week_op, selected_day_op)
 
     # --- Determine Period Label for Titles ---
     if selected_day_op != "All Days":
@@ -908,261 +975,111 @@ def show_oplans_dashboard(df_attendance, df_oplans):
 
         # --- Column 2: Main Content Area (Chart) ---
         with main_body_col2:
-            st.markdown(f'<p class="chart-title-p">Daily Oplans Count Trend in {period_label} {selected_year_op}</p>', unsafe_allow_html=True)
+            with perf.stage("oplans.resolution_widget"):
+                resolution = trend_resolution("oplans", df_oplans_trend)
+            st.markdown(f'<p class="chart-title-p">{resolution} Oplans Count Trend in {period_label} {selected_year_op}</p>', unsafe_allow_html=True)
             
             if not df_oplans_trend.empty:
-                # Color map can be reused or defined specifically for Oplans
-                color_map_oplans = {
-                    'SA2': '#8C1007',
-                    'SA3': '#EB5A3C',
-                    'SA4': '#DF9755',
-                    'HU1': "#83CBE7"
-                }
-
-                # CHECK MODIFIED: Use the DIALER_COLUMN for color if it exists, regardless of unique count
-                if DIALER_COLUMN in df_oplans_trend.columns:
-                    unique_dialers_in_chart = df_oplans_trend[DIALER_COLUMN].unique()
-                    chart_color_col = DIALER_COLUMN
-                else:
-                    unique_dialers_in_chart = []
-                    chart_color_col = None
-
-                fig = px.line(
-                    df_oplans_trend, 
-                    x='Date', 
-                    y='Oplan_Count', 
-                    color=chart_color_col,
-                    color_discrete_map=color_map_oplans if chart_color_col else None,
-                    title='', 
-                    line_shape='spline'
-                )
-
-                fig.update_traces(line=dict(smoothing=1.3, width=2.5), marker=dict(size=8))
-                
-                # Y-axis range logic
-                max_oplans_val = df_oplans_trend['Oplan_Count'].max() if not df_oplans_trend.empty else None
-                buffer = 3
-                top_range = (max_oplans_val + buffer) if (max_oplans_val is not None and max_oplans_val > 0) else 1
-                
-                fig.update_layout(
-                    height=520,
-                    plot_bgcolor='#1e1e1e',
-                    paper_bgcolor='#1e1e1e',
-                    font_color='white',
-                    legend_title_text='Dialer' if chart_color_col else None,
-                    xaxis_title='Date',
-                    yaxis_title='Oplans Count',
-                    margin=dict(l=10, r=10, t=20, b=40),
-                    xaxis={'type': 'date'},
-                    yaxis={'range': [0, top_range], 'tickformat': '.0f'}
-                )
-                fig.update_xaxes(type='date')
-
-                # Add labels (numbers) to the data points
-                max_labels = 8
-                def add_labels_to_trace(df_to_label, color='white'):
-                    n = len(df_to_label)
-                    if n == 0: return
-                    step = max(1, math.ceil(n / max_labels))
-                    sampled_idx = list(range(0, n, step))
-                    
-                    x_sample = df_to_label['Date'].iloc[sampled_idx]
-                    y_sample = df_to_label['Oplan_Count'].iloc[sampled_idx]
-                    labels = y_sample.astype(int).astype(str)
-
-                    fig.add_scatter(
-                        x=x_sample, y=y_sample, 
-                        mode='text', 
-                        text=labels, 
-                        textposition="top center", 
-                        showlegend=False, 
-                        textfont=dict(color=color, size=11)
-                    )
-
-                if chart_color_col:
-                    for D in unique_dialers_in_chart:
-                        df_subset = df_oplans_trend[df_oplans_trend[DIALER_COLUMN] == D].sort_values('Date')
-                        text_color = color_map_oplans.get(D, 'white')
-                        add_labels_to_trace(df_subset, text_color)
-                else:
-                    # Single line chart
-                    add_labels_to_trace(df_oplans_trend)
-                
-                st.plotly_chart(fig, use_container_width=True, height=800, config={'displayModeBar': False})
+                with perf.stage("oplans.forecast"):
+                    forecast = forecast_overlay("oplans", resolution, selected_year_op, selected_month_indices_op, selected_dialer_op, selected_week_op, selected_day_op)
+                with perf.stage("oplans.anomalies"):
+                    anomalies = trend_anomalies("oplans", selected_year_op, selected_month_indices_op, selected_dialer_op, selected_week_op, selected_day_op) if resolution == "Daily" else None
+                with perf.stage("oplans.figure"):
+                    fig = trend_figure(
+                        "oplans", (selected_year_op, tuple(selected_month_indices_op), selected_dialer_op, selected_week_op, selected_day_op, resolution),
+                        df_oplans_trend, forecast, anomalies)
+
+                with perf.stage("oplans.plotly_chart"):
+                    chart_event = st.plotly_chart(fig, use_container_width=True, height=800, config={'displayModeBar': False},
+                                                  on_select="rerun", selection_mode="points", key="trend_chart_oplans")
+                drilldown_panel("oplans", selected_year_op, selected_month_indices_op, selected_dialer_op, selected_week_op, selected_day_op, resolution, chart_event)
             else:
                 st.info(f"No Oplans data found for the selected period ({period_label}).")
 
         # --- Column 3: KPI Cards (Right Side) ---
         with main_body_col3:
-            st.markdown(f'<p class="chart-title-p">KPI calculations in {period_label} {selected_year_op}</p>', unsafe_allow_html=True)
+            with perf.stage("oplans.kpi_cards"):
+                st.markdown(f'<p class="chart-title-p">KPI calculations in {period_label} {selected_year_op}</p>', unsafe_allow_html=True)
             
-            # KPI 1: Average Oplans count per day
-            st.markdown(f'<div class="kpi-card-red"><h3>Average Oplans per day</h3><p>{avg_oplans_per_day}</p></div>', unsafe_allow_html=True)
+                # KPI 1: Average Oplans count per day
+                st.markdown(f'<div class="kpi-card-red"><h3>Average Oplans per day</h3><p>{avg_oplans_per_day}</p></div>', unsafe_allow_html=True)
 
-            # KPI 2: Transfer Ratio (%) (NOW CORRECTLY CALCULATED)
-            st.markdown(f'<div class="kpi-card-red"><h3>Transfer Ratio</h3><p>{transfer_ratio_pct}%</p></div>', unsafe_allow_html=True)
+                # KPI 2: Transfer Ratio (%) (NOW CORRECTLY CALCULATED)
+                st.markdown(f'<div class="kpi-card-red"><h3>Transfer Ratio</h3><p>{transfer_ratio_pct}%</p></div>', unsafe_allow_html=True)
 
-            # KPI 3: Total Oplans Count
-            st.markdown(f'<div class="kpi-card-red"><h3>Total Oplans Count</h3><p>{total_oplans_count}</p></div>', unsafe_allow_html=True)
+                # KPI 3: Total Oplans Count
+                st.markdown(f'<div class="kpi-card-red"><h3>Total Oplans Count</h3><p>{total_oplans_count}</p></div>', unsafe_allow_html=True)
 
-            # KPI 4: Average Attendance per day
-            st.markdown(f'<div class="kpi-card-red"><h3>Average Attendance per day</h3><p>{avg_att_per_day_op}</p></div>', unsafe_allow_html=True)
+                # KPI 4: Average Attendance per day
+                st.markdown(f'<div class="kpi-card-red"><h3>Average Attendance per day</h3><p>{avg_att_per_day_op}</p></div>', unsafe_allow_html=True)
             
         st.markdown('</div>', unsafe_allow_html=True)
 
+    export_panel("oplans", selected_year_op, selected_month_indices_op, selected_dialer_op, selected_week_op, selected_day_op)
+
 
 # --- NEW PAGE FUNCTION: OTHERS PERFORMANCE ---
 def show_others_page(df_others, df_oplans, df_attendance, df_sheet2):
     """
     Renders the Others page dashboard.
     """
-    st.sidebar.markdown("---")
-    st.sidebar.subheader("Filter Others Data")
-
-    # Year selector
-    selected_year_oth = st.sidebar.selectbox("Select Year (Others)", options=YEARS, index=YEARS.index(2025) if 2025 in YEARS else 0, key="year_others")
-
-    # Month multiselect
-    default_month_name = "November"
-    selected_month_names_oth = st.sidebar.multiselect(
-        "Select Month (you may choose multiple)",
-        options=MONTH_NAMES,
-        default=[default_month_name],
-        key="month_others"
-    )
-    if not selected_month_names_oth:
-        selected_month_names_oth = [default_month_name]
-    selected_month_indices_oth = [MONTH_NAMES.index(m) + 1 for m in selected_month_names_oth]
-
-    # Week selection disabled for multi-month selection
-    if len(selected_month_indices_oth) == 1:
-        single_month_name_oth = selected_month_names_oth[0]
-        weeks_list_oth = get_weeks_in_month(selected_year_oth, single_month_name_oth)
-        selected_week_oth = st.sidebar.selectbox("Select Week (Others)", options=weeks_list_oth, key="week_others")
-
-        # Day Selector (Dynamic). Enabled only when a single month is selected.
-        days_list_oth = get_days_in_period(selected_year_oth, single_month_name_oth, selected_week_oth)
-        selected_day_oth = st.sidebar.selectbox("Select Day (Others)", options=days_list_oth, key="day_others")
-    else:
-        selected_week_oth = "All Weeks"
-        selected_day_oth = "All Days"
-        st.sidebar.markdown("_Week and Day selection disabled for multiple months._")
-
-
-    # Dialer selector (multi-select)
-    dialers_list_oth = get_attended_dialers(df_attendance, selected_year_oth, selected_month_indices_oth)
-    selected_dialer_oth = st.sidebar.radio("Select Dialer (Others)", options=dialers_list_oth, index=0, key="dialer_others")
-
-    # --- Normalize column names and CLEAN data ---
-    df_others_local = _standardize_df(df_others, DATE_COLUMN_SALES, DIALER_COLUMN)
-    df_oplans_local = _standardize_df(df_oplans, DATE_COLUMN_SALES, DIALER_COLUMN)
-    df_attendance_local = _standardize_df(df_attendance, 'date', DIALER_COLUMN)
-    df_sheet2_local = _standardize_df(df_sheet2, DATE_COLUMN_SALES, DIALER_COLUMN) # STANDARDIZE df_sheet2
+    with perf.stage("others.widgets"):
+        st.sidebar.markdown("---")
+        st.sidebar.subheader("Filter Others Data")
+
+        # Year selector
+        selected_year_oth = st.sidebar.selectbox("Select Year (Others)", options=YEARS, index=YEARS.index(2025) if 2025 in YEARS else 0, key="year_others")
+
+        # Month multiselect
+        default_month_name = "November"
+        selected_month_names_oth = st.sidebar.multiselect(
+            "Select Month (you may choose multiple)",
+            options=MONTH_NAMES,
+            default=[default_month_name],
+            key="month_others"
+        )
+        if not selected_month_names_oth:
+            selected_month_names_oth = [default_month_name]
+        selected_month_indices_oth = [MONTH_NAMES.index(m) + 1 for m in selected_month_names_oth]
+
+        # Week selection disabled for multi-month selection
+        if len(selected_month_indices_oth) == 1:
+            single_month_name_oth = selected_month_names_oth[0]
+            weeks_list_oth = get_weeks_in_month(selected_year_oth, single_month_name_oth)
+            selected_week_oth = st.sidebar.selectbox("Select Week (Others)", options=weeks_list_oth, key="week_others")
+
+            # Day Selector (Dynamic). Enabled only when a single month is selected.
+            days_list_oth = get_days_in_period(selected_year_oth, single_month_name_oth, selected_week_oth)
+            selected_day_oth = st.sidebar.selectbox("Select Day (Others)", options=days_list_oth, key="day_others")
+        else:
+            selected_week_oth = "All Weeks"
+            selected_day_oth = "All Days"
+            st.sidebar.markdown("_Week and Day selection disabled for multiple months._")
 
+    others_section(df_others, df_oplans, df_attendance, df_sheet2, selected_year_oth, selected_month_names_oth, selected_month_indices_oth, selected_week_oth, selected_day_oth)
 
-    # Filter dataframes by selected year/month(s)/week/dialer
-    # NUMERATOR: Total Leads (Others + Oplans)
-    df_others_filtered = _filter_by_date_local(df_others_local, DATE_COLUMN_SALES, selected_year_oth, selected_month_indices_oth)
-    df_others_filtered = _apply_week_filter_local(df_others_filtered, DATE_COLUMN_SALES, selected_week_oth)
-    df_others_filtered = _apply_day_filter_local(df_others_filtered, DATE_COLUMN_SALES, selected_day_oth) # Apply day filter
-    df_others_filtered = _apply_dialer_filter_local(df_others_filtered, DIALER_COLUMN, selected_dialer_oth)
 
-    df_oplans_filtered = _filter_by_date_local(df_oplans_local, DATE_COLUMN_SALES, selected_year_oth, selected_month_indices_oth)
-    df_oplans_filtered = _apply_week_filter_local(df_oplans_filtered, DATE_COLUMN_SALES, selected_week_oth)
-    df_oplans_filtered = _apply_day_filter_local(df_oplans_filtered, DATE_COLUMN_SALES, selected_day_oth) # Apply day filter
-    df_oplans_filtered = _apply_dialer_filter_local(df_oplans_filtered, DIALER_COLUMN, selected_dialer_oth)
-    
-    # KPI calculations for Others page
-    total_others_count = df_others_filtered.shape[0]
-    total_oplans_count = df_oplans_filtered.shape[0]
-    total_combined_count = total_others_count + total_oplans_count # This is the NUMERATOR
-
-    # KPI 1: Others % (Others leads / Total Leads)
-    others_percentage = round((total_others_count / total_combined_count) * 100, 1) if total_combined_count > 0 else 0
-
-    # KPI 2: Average Others per day
-    days_with_others_df = df_others_filtered[pd.to_datetime(df_others_filtered[DATE_COLUMN_SALES], errors='coerce').notna()]
-    if not days_with_others_df.empty:
-        unique_days = pd.to_datetime(days_with_others_df[DATE_COLUMN_SALES], errors='coerce').dt.date.nunique()
-    else:
-        unique_days = 0
-    avg_others_per_day = round(total_others_count / unique_days) if unique_days > 0 else 0
-
-    # KPI 3: Average attendance per day (from attendance sheet)
-    df_att_local_filtered = _filter_by_date_local(df_attendance_local, 'date', selected_year_oth, selected_month_indices_oth)
-    df_att_local_filtered = _apply_week_filter_local(df_att_local_filtered, 'date', selected_week_oth)
-    df_att_local_filtered = _apply_day_filter_local(df_att_local_filtered, 'date', selected_day_oth) # Apply day filter
-    df_att_local_filtered = _apply_dialer_filter_local(df_att_local_filtered, DIALER_COLUMN, selected_dialer_oth)
-    total_att_count = df_att_local_filtered['attendance'].sum() if 'attendance' in df_att_local_filtered.columns and not df_att_local_filtered.empty else 0
-    days_with_att = df_att_local_filtered['date'].dt.date.nunique() if 'date' in df_att_local_filtered.columns and not df_att_local_filtered.empty else 0
-    avg_att_per_day_oth = round(total_att_count / days_with_att) if days_with_att > 0 else 0
-
-    # KPI 4: Average checks per agent (MUST BE DECIMAL)
-    df_sheet2_filtered = _filter_by_date_local(df_sheet2_local, DATE_COLUMN_SALES, selected_year_oth, selected_month_indices_oth)
-    df_sheet2_filtered = _apply_week_filter_local(df_sheet2_filtered, DATE_COLUMN_SALES, selected_week_oth)
-    df_sheet2_filtered = _apply_day_filter_local(df_sheet2_filtered, DATE_COLUMN_SALES, selected_day_oth) # Apply day filter
-    df_sheet2_filtered = _apply_dialer_filter_local(df_sheet2_filtered, DIALER_COLUMN, selected_dialer_oth)
-    
-
-    attendance_sum_sheet2 = 0
-    att_col = next((c for c in df_sheet2_filtered.columns if c.lower() == 'att'), None)
-    if att_col is None:
-        att_col = next((c for c in df_sheet2_filtered.columns if 'attendance' in c.lower()), None)
-        
-    if att_col is not None:
-        try:
-            numeric_vals = pd.to_numeric(df_sheet2_filtered[att_col], errors='coerce').dropna()
-            attendance_sum_sheet2 = numeric_vals.sum()
-        except Exception:
-            pass
-        
-    if attendance_sum_sheet2 > 0:
-        avg_checks_per_agent = total_combined_count / total_att_count
-        # Use f-string formatting to enforce two decimal places
-        avg_checks_per_agent_display = f"{avg_checks_per_agent:.2f}" 
-    else:
-        avg_checks_per_agent = 0 
-        avg_checks_per_agent_display = "0.00"
-    
-    # --- Others Trend Calculation Block (NO CHANGE) ---
-    df_others_trend = pd.DataFrame(columns=['Date', DIALER_COLUMN, 'Others_Count'])
-    if not df_others_filtered.empty and DATE_COLUMN_SALES in df_others_filtered.columns:
-        df_temp = df_others_filtered.copy()
-        
-        if DIALER_COLUMN in df_temp.columns:
-            df_temp['_DialerClean'] = df_temp[DIALER_COLUMN]
-        else:
-            df_temp['_DialerClean'] = 'UNKNOWN'
+@st.experimental_fragment
+@traced_fragment("Others Performance")
+def others_section(df_others, df_oplans, df_attendance, df_sheet2, selected_year_oth, selected_month_names_oth, selected_month_indices_oth, selected_week_oth, selected_day_oth):
+    """
+    Dialer selector, trend chart and KPI cards of the Others page. Runs as a
+    fragment, so changing the dialer reruns and re-sends only this section.
+    """
+    # Dialer selector (Dialers returned are already Uppercase/Cleaned)
+    with perf.stage("others.dialer_widget"):
+        dialers_list_oth = get_attended_dialers(df_attendance, selected_year_oth, selected_month_indices_oth)
+        selected_dialer_oth = st.radio("Select Dialer (Others)", options=dialers_list_oth, index=0, key="dialer_others", horizontal=True)
 
-        df_temp['Date'] = pd.to_datetime(df_temp[DATE_COLUMN_SALES], errors='coerce').dt.normalize()
-        df_temp = df_temp.dropna(subset=['Date'])
-        
-        if DIALER_COLUMN in df_others_filtered.columns:
-            df_others_trend = (
-                df_temp
-                .groupby(['Date', '_DialerClean'])
-                .size()
-                .reset_index(name='Others_Count')
-                .rename(columns={'_DialerClean': DIALER_COLUMN})
-            )
-        else:
-            df_others_trend = (
-                df_temp
-                .groupby('Date')
-                .size()
-                .reset_index(name='Others_Count')
+    # --- EXECUTE CORE FUNCTION ---
+    with perf.stage("others.compute"):
+        df_others_trend, others_percentage, avg_others_per_day, avg_checks_per_agent_display, avg_att_per_day_oth = \
+            calculate_others_data(
+                selected_year_oth, selected_month_indices_oth, selected_dialer_oth, selected_week_oth, selected_day_oth,
+                df_others, df_oplans, df_attendance, df_sheet2
             )
-            df_others_trend[DIALER_COLUMN] = 'TOTAL'
-
-        df_others_trend['Date'] = pd.to_datetime(df_others_trend['Date'])
-        df_others_trend = df_others_trend.sort_values(['Date', DIALER_COLUMN])
-        
-        if isinstance(selected_dialer_oth, (list, tuple, set)):
-            if 'All Dialers' not in selected_dialer_oth:
-                df_others_trend = df_others_trend[df_others_trend[DIALER_COLUMN] != 'UNKNOWN']
-        elif selected_dialer_oth != 'All Dialers':
-            df_others_trend = df_others_trend[df_others_trend[DIALER_COLUMN] != 'UNKNOWN']
-            
+    perf.note_frame("others.trend", df_others_trend)
+    get_prewarmer().visits.record("others", selected_year_oth, selected_month_indices_oth, selected_dialer_oth, selected_week_oth, selected_day_oth)
 
     # --- Determine Period Label for Titles ---
     if selected_day_oth != "All Days":
@@ -1181,124 +1098,411 @@ def show_others_page(df_others, df_oplans, df_attendance, df_sheet2):
 
         # --- Column 2: Main Content Area (Chart) ---
         with main_body_col2:
-            st.markdown(f'<p class="chart-title-p">Daily Others Count Trend in {period_label} {selected_year_oth}</p>', unsafe_allow_html=True)
+            with perf.stage("others.resolution_widget"):
+                resolution = trend_resolution("others", df_others_trend)
+            st.markdown(f'<p class="chart-title-p">{resolution} Others Count Trend in {period_label} {selected_year_oth}</p>', unsafe_allow_html=True)
             
             if not df_others_trend.empty:
-                # Color map can be reused or defined specifically for Others
-                color_map_others = {
-                    'SA2': '#8C1007',
-                    'SA3': '#EB5A3C',
-                    'SA4': '#DF9755',
-                    'HU1': "#83CBE7"
-                }
-
-                if DIALER_COLUMN in df_others_trend.columns:
-                    unique_dialers_in_chart = df_others_trend[DIALER_COLUMN].unique()
-                    chart_color_col = DIALER_COLUMN
-                else:
-                    unique_dialers_in_chart = []
-                    chart_color_col = None
-
-                fig = px.line(
-                    df_others_trend, 
-                    x='Date', 
-                    y='Others_Count', # Use the new count column
-                    color=chart_color_col,
-                    color_discrete_map=color_map_others if chart_color_col else None,
-                    title='', 
-                    line_shape='spline'
-                )
-
-                fig.update_traces(line=dict(smoothing=1.3, width=2.5), marker=dict(size=8))
-                
-                # Y-axis range logic
-                max_others_val = df_others_trend['Others_Count'].max() if not df_others_trend.empty else None
-                buffer = 3
-                top_range = (max_others_val + buffer) if (max_others_val is not None and max_others_val > 0) else 1
-                
-                fig.update_layout(
-                    height=520,
-                    plot_bgcolor='#1e1e1e',
-                    paper_bgcolor='#1e1e1e',
-                    font_color='white',
-                    legend_title_text='Dialer' if chart_color_col else None,
-                    xaxis_title='Date',
-                    yaxis_title='Others Count',
-                    margin=dict(l=10, r=10, t=20, b=40),
-                    xaxis={'type': 'date'},
-                    yaxis={'range': [0, top_range], 'tickformat': '.0f'}
-                )
-                fig.update_xaxes(type='date')
-                
-                # Add labels (numbers) to the data points
-                max_labels = 8
-                # Simplified trace function: forces the text color to white
-                def add_labels_to_trace(df_to_label): 
-                    n = len(df_to_label)
-                    if n == 0: return
-                    step = max(1, math.ceil(n / max_labels))
-                    sampled_idx = list(range(0, n, step))
-                    
-                    x_sample = df_to_label['Date'].iloc[sampled_idx]
-                    y_sample = df_to_label['Others_Count'].iloc[sampled_idx]
-                    labels = y_sample.astype(int).astype(str)
-
-                    fig.add_scatter(
-                        x=x_sample, y=y_sample, 
-                        mode='text', 
-                        text=labels, 
-                        textposition="top center", 
-                        showlegend=False, 
-                        textfont=dict(color='white', size=11) # <-- FORCED TO WHITE
-                    )
-
-                if chart_color_col:
-                    for D in unique_dialers_in_chart:
-                        df_subset = df_others_trend[df_others_trend[DIALER_COLUMN] == D].sort_values('Date')
-                        add_labels_to_trace(df_subset)
-                else:
-                    add_labels_to_trace(df_others_trend)
-
-                st.plotly_chart(fig, use_container_width=True, height=800, config={'displayModeBar': False})
+                with perf.stage("others.forecast"):
+                    forecast = forecast_overlay("others", resolution, selected_year_oth, selected_month_indices_oth, selected_dialer_oth, selected_week_oth, selected_day_oth)
+                with perf.stage("others.anomalies"):
+                    anomalies = trend_anomalies("others", selected_year_oth, selected_month_indices_oth, selected_dialer_oth, selected_week_oth, selected_day_oth) if resolution == "Daily" else None
+                with perf.stage("others.figure"):
+                    fig = trend_figure(
+                        "others", (selected_year_oth, tuple(selected_month_indices_oth), selected_dialer_oth, selected_week_oth, selected_day_oth, resolution),
+                        df_others_trend, forecast, anomalies)
+
+                with perf.stage("others.plotly_chart"):
+                    chart_event = st.plotly_chart(fig, use_container_width=True, height=800, config={'displayModeBar': False},
+                                                  on_select="rerun", selection_mode="points", key="trend_chart_others")
+                drilldown_panel("others", selected_year_oth, selected_month_indices_oth, selected_dialer_oth, selected_week_oth, selected_day_oth, resolution, chart_event)
             else:
                 st.info(f"No Others data found for the selected period ({period_label}).")
 
         # --- Column 3: KPI Cards (Right Side) ---
         with main_body_col3:
-            st.markdown(f'<p class="chart-title-p">KPI calculations in {period_label} {selected_year_oth}</p>', unsafe_allow_html=True) 
+            with perf.stage("others.kpi_cards"):
+                st.markdown(f'<p class="chart-title-p">KPI calculations in {period_label} {selected_year_oth}</p>', unsafe_allow_html=True) 
             
-            # KPI 1: Others %
-            st.markdown(f'<div class="kpi-card-red"><h3>Others %</h3><p>{others_percentage}%</p></div>', unsafe_allow_html=True)
+                # KPI 1: Others %
+                st.markdown(f'<div class="kpi-card-red"><h3>Others %</h3><p>{others_percentage}%</p></div>', unsafe_allow_html=True)
 
-            # KPI 2: Average Others count per day
-            st.markdown(f'<div class="kpi-card-red"><h3>Average Others per day</h3><p>{avg_others_per_day}</p></div>', unsafe_allow_html=True)
+                # KPI 2: Average Others count per day
+                st.markdown(f'<div class="kpi-card-red"><h3>Average Others per day</h3><p>{avg_others_per_day}</p></div>', unsafe_allow_html=True)
             
-            # KPI 3 (MODIFIED TO DECIMAL): Average checks per agent
-            st.markdown(f'<div class="kpi-card-red"><h3>Average checks per agent</h3><p>{avg_checks_per_agent_display}</p></div>', unsafe_allow_html=True)
+                # KPI 3 (MODIFIED TO DECIMAL): Average checks per agent
+                st.markdown(f'<div class="kpi-card-red"><h3>Average checks per agent</h3><p>{avg_checks_per_agent_display}</p></div>', unsafe_allow_html=True)
 
-            # KPI 4: Average Attendance per day
-            st.markdown(f'<div class="kpi-card-red"><h3>Average Attendance per day</h3><p>{avg_att_per_day_oth}</p></div>', unsafe_allow_html=True)
+                # KPI 4: Average Attendance per day
+                st.markdown(f'<div class="kpi-card-red"><h3>Average Attendance per day</h3><p>{avg_att_per_day_oth}</p></div>', unsafe_allow_html=True)
             
         st.markdown('</div>', unsafe_allow_html=True)
 
+    export_panel("others", selected_year_oth, selected_month_indices_oth, selected_dialer_oth, selected_week_oth, selected_day_oth)
+
+
+# --- NEW PAGE FUNCTION: OVERVIEW ---
+
+def show_overview_page(df_attendance):
+    """
+    Renders the Overview page: the KPI cards of the Sales, Oplans and Others pages
+    side by side for one selection.
+    """
+    with perf.stage("overview.widgets"):
+        st.sidebar.markdown("---")
+        st.sidebar.subheader("Filter Overview")
+
+        selected_year_ov = st.sidebar.selectbox("Select Year (Overview)", options=YEARS, index=YEARS.index(2025) if 2025 in YEARS else 0, key="year_overview")
+
+        default_month_name = "November"
+        selected_month_names_ov = st.sidebar.multiselect(
+            "Select Month (you may choose multiple)",
+            options=MONTH_NAMES,
+            default=[default_month_name],
+            key="month_overview"
+        )
+        if not selected_month_names_ov:
+            selected_month_names_ov = [default_month_name]
+        selected_month_indices_ov = [MONTH_NAMES.index(m) + 1 for m in selected_month_names_ov]
+
+        if len(selected_month_indices_ov) == 1:
+            single_month_name_ov = selected_month_names_ov[0]
+            weeks_list_ov = get_weeks_in_month(selected_year_ov, single_month_name_ov)
+            selected_week_ov = st.sidebar.selectbox("Select Week (Overview)", options=weeks_list_ov, key="week_overview")
+            days_list_ov = get_days_in_period(selected_year_ov, single_month_name_ov, selected_week_ov)
+            selected_day_ov = st.sidebar.selectbox("Select Day (Overview)", options=days_list_ov, key="day_overview")
+        else:
+            selected_week_ov = "All Weeks"
+            selected_day_ov = "All Days"
+            st.sidebar.markdown("_Week and Day selection disabled for multiple months._")
+
+    overview_section(df_attendance, selected_year_ov, selected_month_names_ov, selected_month_indices_ov, selected_week_ov, selected_day_ov)
+
+
+@st.experimental_fragment
+@traced_fragment("Overview")
+def overview_section(df_attendance, selected_year_ov, selected_month_names_ov, selected_month_indices_ov, selected_week_ov, selected_day_ov):
+    """Dialer selector and the three pages' KPI cards, all from the one KPI pass of the selection."""
+    from dialer_core.engine import kpi_values
+    from dialer_core.report import PAGE_LAYOUT
+
+    with perf.stage("overview.dialer_widget"):
+        dialers_list_ov = get_attended_dialers(df_attendance, selected_year_ov, selected_month_indices_ov)
+        selected_dialer_ov = st.radio("Select Dialer (Overview)", options=dialers_list_ov, index=0, key="dialer_overview", horizontal=True)
+
+    with perf.stage("overview.compute"):
+        months = tuple(sorted(set(selected_month_indices_ov)))
+        shared = selection_kpis(selected_year_ov, months, selected_dialer_ov, selected_week_ov, selected_day_ov) or {}
+        results = {}
+        for page_key in PAGE_LAYOUT:
+            results[page_key] = shared.get(page_key)
+            if results[page_key] is not None:
+                continue
+            # No prepared tables, or a selection the shared pass leaves to the live page.
+            # The Others page cannot be computed without attendance, so its card says so instead.
+            if page_key == 'others' and not has_attendance(df_attendance, selected_year_ov, list(months), selected_dialer_ov, selected_week_ov, selected_day_ov):
+                continue
+            results[page_key] = page_result(page_key, selected_year_ov, months, selected_dialer_ov, selected_week_ov, selected_day_ov)
+
+    if selected_day_ov != "All Days":
+        period_label = selected_day_ov
+    elif selected_week_ov != "All Weeks":
+        period_label = selected_week_ov
+    else:
+        period_label = ", ".join(selected_month_names_ov)
+    st.markdown(F'<p class="chart-title-p">{selected_dialer_ov} in {period_label} {selected_year_ov}</p>', unsafe_allow_html=True)
+
+    with st.container():
+        st.markdown('<div class="dashboard-container">', unsafe_allow_html=True)
+        with perf.stage("overview.kpi_cards"):
+            for col, (page_key, (heading, _, _, cards)) in zip(st.columns(len(PAGE_LAYOUT)), PAGE_LAYOUT.items()):
+                with col:
+                    st.markdown(F'<p class="chart-title-p">{heading}</p>', unsafe_allow_html=True)
+                    if results[page_key] is None:
+                        st.info("No attendance recorded for this selection.")
+                        continue
+                    values = kpi_values(page_key, results[page_key])
+                    for kpi, name, suffix in cards:
+                        st.markdown(F'<div class="kpi-card-red"><h3>{name}</h3><p>{values.get(kpi, "")}{suffix}</p></div>', unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+
+# --- NEW PAGE FUNCTION: INTRADAY ACTIVITY ---
+
+@cache.process_resource
+def get_intraday_indexes(data_version):
+    """Hour/weekday/dialer encoding of the lead tables (dialer_core.intraday), once per process and data version."""
+    from dialer_core import intraday
+    tables = get_prepared_tables(data_version)
+    return None if tables is None else intraday.build_indexes(tables)
+
+
+@perf.track_cache("intraday_counts")
+@cache.shared_result(get_result_cache, loading.data_version)
+def intraday_counts(table, year, month_index, week_str, day_str):
+    """(dialers, dialers x weekday x hour counts) of one lead table for the selection, or None without dated tables."""
+    perf.record_cache_miss("intraday_counts")
+    indexes = get_intraday_indexes(loading.data_version())
+    if indexes is None:
+        return None
+    return indexes[table].counts(year, month_index, week_str, day_str)
+
+
+def show_intraday_page():
+    """
+    Renders the Intraday Activity page: sales, oplans and others by hour of day
+    (and weekday) per dialer.
+    """
+    with perf.stage("intraday.widgets"):
+        st.sidebar.markdown("---")
+        st.sidebar.subheader("Filter Intraday Data")
+
+        selected_year_id = st.sidebar.selectbox("Select Year (Intraday)", options=YEARS, index=YEARS.index(2025) if 2025 in YEARS else 0, key="year_intraday")
+
+        default_month_name = "November"
+        selected_month_names_id = st.sidebar.multiselect(
+            "Select Month (you may choose multiple)",
+            options=MONTH_NAMES,
+            default=[default_month_name],
+            key="month_intraday"
+        )
+        if not selected_month_names_id:
+            selected_month_names_id = [default_month_name]
+        selected_month_indices_id = [MONTH_NAMES.index(m) + 1 for m in selected_month_names_id]
+
+        if len(selected_month_indices_id) == 1:
+            single_month_name_id = selected_month_names_id[0]
+            weeks_list_id = get_weeks_in_month(selected_year_id, single_month_name_id)
+            selected_week_id = st.sidebar.selectbox("Select Week (Intraday)", options=weeks_list_id, key="week_intraday")
+            days_list_id = get_days_in_period(selected_year_id, single_month_name_id, selected_week_id)
+            selected_day_id = st.sidebar.selectbox("Select Day (Intraday)", options=days_list_id, key="day_intraday")
+        else:
+            selected_week_id = "All Weeks"
+            selected_day_id = "All Days"
+            st.sidebar.markdown("_Week and Day selection disabled for multiple months._")
+
+    intraday_section(selected_year_id, selected_month_names_id, selected_month_indices_id, selected_week_id, selected_day_id)
+
+
+@st.experimental_fragment
+@traced_fragment("Intraday Activity")
+def intraday_section(selected_year_id, selected_month_names_id, selected_month_indices_id, selected_week_id, selected_day_id):
+    """Lead table and view selectors, heatmap and peak cards of the Intraday page (a fragment, like the other pages)."""
+    from dialer_core import intraday
+
+    with perf.stage("intraday.view_widgets"):
+        source_col, view_col, dialer_col = st.columns([2, 2, 1])
+        table = source_col.radio("Leads", options=list(intraday.SOURCES), format_func=intraday.SOURCES.get, key="intraday_source", horizontal=True)
+        view = view_col.radio("View", options=["Hour x dialer", "Weekday x hour"], key="intraday_view", horizontal=True)
+
+    with perf.stage("intraday.compute"):
+        counts = intraday_counts(table, selected_year_id, selected_month_indices_id, selected_week_id, selected_day_id)
+
+    if selected_day_id != "All Days":
+        period_label = selected_day_id
+    elif selected_week_id != "All Weeks":
+        period_label = selected_week_id
+    else:
+        period_label = ", ".join(selected_month_names_id)
+    label = intraday.SOURCES[table]
+
+    if counts is None or not counts[0]:
+        st.info(F"No {label.lower()} data found for the selected period ({period_label}).")
+        return
+    dialers, cube = counts
+    hours = intraday.active_hours(cube)
+    hour_labels = [F"{h:02d}:00" for h in hours]
+
+    if view == "Hour x dialer":
+        rows, z = intraday.hour_by_dialer(dialers, cube)
+        z, row_title = z[:, hours.start:hours.stop], "Dialer"
+        selected = "All Dialers"
+    else:
+        selected = dialer_col.selectbox("Dialer", options=["All Dialers"] + [d for d in dialers if d != aggregates.NO_DIALER], key="intraday_dialer")
+        rows, row_title = intraday.WEEKDAYS, "Weekday"
+        z = intraday.weekday_by_hour(dialers, cube, selected)[:, hours.start:hours.stop]
+    scope = cube.sum(axis=0) if selected == "All Dialers" else intraday.weekday_by_hour(dialers, cube, selected)
+
+    with st.container():
+        st.markdown('<div class="dashboard-container">', unsafe_allow_html=True)
+        chart_col, kpi_col = st.columns([5, 1])
+        with chart_col:
+            st.markdown(F'<p class="chart-title-p">{label} by Hour of Day in {period_label} {selected_year_id}</p>', unsafe_allow_html=True)
+            with perf.stage("intraday.figure"):
+                fig = trend_charts().heatmap_figure(z, hour_labels, rows, "Hour", row_title, label)
+            with perf.stage("intraday.plotly_chart"):
+                st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+        with kpi_col:
+            with perf.stage("intraday.kpi_cards"):
+                by_hour, by_weekday = scope.sum(axis=0), scope.sum(axis=1)
+                st.markdown(F'<p class="chart-title-p">Peaks ({selected})</p>', unsafe_allow_html=True)
+                st.markdown(F'<div class="kpi-card-red"><h3>Busiest hour</h3><p>{int(by_hour.argmax()):02d}:00</p></div>', unsafe_allow_html=True)
+                st.markdown(F'<div class="kpi-card-red"><h3>Busiest weekday</h3><p>{intraday.WEEKDAYS[int(by_weekday.argmax())]}</p></div>', unsafe_allow_html=True)
+                st.markdown(F'<div class="kpi-card-red"><h3>Total {label}</h3><p>{int(scope.sum())}</p></div>', unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+
+# --- ANOMALY FLAGS ---
+
+# Per page: the dialer_core.anomaly metrics ringed on its trend chart
+ANOMALY_METRICS = {'sales': ('sales',), 'oplans': ('oplans', 'transfer_ratio'), 'others': ('others',)}
+ANOMALY_ALERT_DAYS = int(os.environ.get("DIALERS_ANOMALY_ALERT_DAYS", "5"))
+ANOMALY_ALERT_LINES = 8
+
+
+@cache.process_resource
+def get_anomaly_detector():
+    """Rolling anomaly scores (dialer_core.anomaly), shared by every session and extended as new days arrive."""
+    from dialer_core import anomaly
+    return anomaly.AnomalyDetector()
+
+
+@cache.process_resource
+def get_anomaly_flags(data_version):
+    """Every flagged (day, dialer, metric) of the data version, or None when the data cannot be prepared."""
+    tables = get_prepared_tables(data_version)
+    if tables is None:
+        return None
+    return get_anomaly_detector().update(aggregates.daily_aggregates(tables))
+
+
+@perf.track_cache("trend_anomalies")
+@cache.shared_result(get_result_cache, loading.data_version)
+def trend_anomalies(page, year, month_index, dialer, week_str, day_str):
+    """(Date, dialer, text) of the flagged points on the page's trend for the selection, or None."""
+    perf.record_cache_miss("trend_anomalies")
+    from dialer_core import anomaly
+    flags = anomaly.select(get_anomaly_flags(loading.data_version()), ANOMALY_METRICS[page],
+                           year, month_index, week_str, day_str, dialer)
+    if flags is None or flags.empty:
+        return None
+    # One ring per point; a point flagged on several metrics lists them all
+    flags = flags.assign(text=[anomaly.describe(row) for _, row in flags.iterrows()])
+    return flags.groupby(['Date', DIALER_COLUMN], sort=False)['text'].agg("<br>".join).reset_index()
+
+
+def show_anomaly_alert():
+    """Sidebar warning listing the flags of the last ANOMALY_ALERT_DAYS days with data."""
+    from dialer_core import anomaly
+    with perf.stage("anomaly.alert"):
+        flags = get_anomaly_flags(loading.data_version())
+    if flags is None or flags.empty:
+        return
+    last_date = get_anomaly_detector().last_update['last_date']
+    recent = flags[flags['Date'] > last_date - pd.Timedelta(days=ANOMALY_ALERT_DAYS)]
+    if recent.empty:
+        return
+    lines = [anomaly.describe(row) for _, row in recent.iloc[::-1].iterrows()]
+    more = F"\n\n…and {len(lines) - ANOMALY_ALERT_LINES} more" if len(lines) > ANOMALY_ALERT_LINES else ""
+    title = "1 anomaly" if len(lines) == 1 else F"{len(lines)} anomalies"
+    st.sidebar.warning(F"**{title} in the {ANOMALY_ALERT_DAYS} days to {last_date:%Y-%m-%d}**\n\n"
+                       + "\n".join(F"- {line}" for line in lines[:ANOMALY_ALERT_LINES]) + more, icon="⚠️")
+
+
+# --- PERFORMANCE PANEL (optional, sidebar) ---
+def show_perf_panel(trace):
+    """
+    Renders the timings recorded for the rerun that just finished.
+    """
+    st.sidebar.markdown("---")
+    if not st.sidebar.checkbox("Show performance timings", value=False, key="perf_panel") or trace is None:
+        return
+
+    record = trace.as_record()
+    st.sidebar.markdown(f"**Rerun total:** {record['total_ms']:.1f} ms")
+
+    df_stages = pd.DataFrame(list(record['stages_ms'].items()), columns=['Stage', 'ms'])
+    st.sidebar.dataframe(df_stages.sort_values('ms', ascending=False), hide_index=True, use_container_width=True)
+
+    st.sidebar.markdown(f"**Cache:** {record['cache']['hits']} hits / {record['cache']['misses']} misses")
+    if record['cache']['calls']:
+        df_cache = pd.DataFrame(record['cache']['calls']).rename(columns={'fn': 'Function', 'outcome': 'Result'})
+        st.sidebar.dataframe(df_cache, hide_index=True, use_container_width=True)
+
+    results = get_result_cache().stats()
+    st.sidebar.markdown(F"**Result cache:** {results['entries']} results, {results['mb']}/{results['max_mb']} MB, "
+                        F"{results['hits']} hits / {results['misses']} misses / {results['evictions']} evictions since start")
+
+    figures = get_figure_cache().stats()
+    st.sidebar.markdown(F"**Figure cache:** {figures['entries']}/{figures['max_entries']} figures, "
+                        F"{figures['hits']} hits / {figures['misses']} misses since start")
+
+    last_prewarm = get_prewarmer().last_run
+    if last_prewarm is not None:
+        st.sidebar.markdown(F"**Prewarm:** {last_prewarm['views']} views in {last_prewarm['ms']:.0f} ms "
+                            F"for data version {last_prewarm['data_version']}")
+
+    startup = perf.startup_timings()
+    if startup:
+        st.sidebar.markdown("**Process startup:** " + ", ".join(F"{name} {ms:.0f} ms" for name, ms in startup.items()))
+
+
+# --- PROFILE REPORT (when profiling is switched on) ---
+def show_profile_report(report, frames):
+    """
+    Shows where the profile was written, the top functions and the DataFrame footprints.
+    """
+    with st.expander(F"Profile of this rerun ({report['elapsed_ms']:.0f} ms)", expanded=True):
+        st.markdown(F"Profile written to `{report['prof_path']}` (summary: `{report['txt_path']}`)")
+        st.markdown("**Top functions by cumulative time**")
+        st.dataframe(pd.DataFrame(report['top']), hide_index=True, use_container_width=True)
+        st.markdown("**DataFrame memory (memory_usage(deep=True))**")
+        st.dataframe(pd.DataFrame(perf.frame_memory(frames)), hide_index=True, use_container_width=True)
+
 
 # --- 6. MAIN APP EXECUTION ---
 
 # Create a simple radio selector in the sidebar for page navigation
 page = st.sidebar.radio(
     "Select Dashboard View",
-    ("Sales Performance", "Oplans Performance", "Others Performance"), 
+    ("Sales Performance", "Oplans Performance", "Others Performance", "Overview", "Intraday Activity"), 
     index=0
 )
-
-# Call the selected function
-if page == "Sales Performance":
-    show_sales_dashboard(df_attendance, df_sales, df_oplans)
-elif page == "Oplans Performance":
-    show_oplans_dashboard(df_attendance, df_oplans)
-elif page == "Others Performance":
-    # PASS df_sheet2 to the others page function
-    show_others_page(df_others, df_oplans, df_attendance, df_sheet2)
+perf.set_page(page)
+show_anomaly_alert()
+
+def show_selected_page(page):
+    # Call the selected function
+    if page == "Sales Performance":
+        show_sales_dashboard(df_attendance, df_sales, df_oplans)
+    elif page == "Oplans Performance":
+        show_oplans_dashboard(df_attendance, df_oplans)
+    elif page == "Others Performance":
+        # PASS df_sheet2 to the others page function
+        show_others_page(df_others, df_oplans, df_attendance, df_sheet2)
+    elif page == "Overview":
+        show_overview_page(df_attendance)
+    elif page == "Intraday Activity":
+        show_intraday_page()
+
+# Profiling switch, off unless the server allows it (profiles run cProfile and write files):
+# DIALERS_PROFILE=query lets ?profile=1 profile the next rerun only, DIALERS_PROFILE=1 profiles every rerun
+profile_mode = os.environ.get("DIALERS_PROFILE", "")
+profile_from_query = profile_mode == "query" and st.query_params.get("profile") == "1"
+if profile_from_query or profile_mode == "1":
+    _, profile_report = perf.profile_call(page, show_selected_page, page)
+    if profile_from_query:
+        del st.query_params["profile"]
+    _trace = perf.current_trace()
+    show_profile_report(profile_report, _trace.frames if _trace is not None else {})
+else:
+    show_selected_page(page)
+
+# The first complete run in this process is the first paint; log the startup timings once
+if perf.note_startup("first_paint", time.perf_counter() - _script_started):
+    perf.log_startup()
+
+# Warm the other pages' default views and the most visited views in the background
+# (once per process; the thread rewarms whenever the data files change)
+if prewarm.PREWARM_ENABLED:
+    get_prewarmer().start()
+
+# Optional JSON API for wallboards and scripts (python -m dialer_core.service runs it standalone)
+if os.environ.get("DIALERS_API_PORT"):
+    get_kpi_service()
+
+# Close the rerun trace (emits one structured log line) and optionally show it
+show_perf_panel(perf.end_rerun())
 
 
 
@@ -0,0 +1,145 @@
+"""
+Benchmarks for the ingest, filter and KPI hot paths on synthetic data.
+
+Every case is run `--repeat` times for wall-clock time (min / median) and once more
+under tracemalloc for peak memory. The functions come from the headless `dialer_core`
+package, so each run measures the computation itself (no dashboard cache in between).
+
+    python -m benchmarks.bench_hotpaths --rows 10000 100000 1000000 --dialers 5 50 500
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_dataset
+from dialer_core import (
+    DATE_COLUMN_SALES,
+    DIALER_COLUMN,
+    MONTH_NAMES,
+    calculate_oplans_data,
+    calculate_others_data,
+    get_attended_dialers,
+    get_days_in_period,
+    get_weeks_in_month,
+    process_and_calculate_data,
+)
+from dialer_core import aggregates, anomaly, charts, intraday, leads, parallel, records
+from dialer_core.filters import (
+    _apply_day_filter_local,
+    _apply_dialer_filter_local,
+    _apply_week_filter_local,
+    _filter_by_date_local,
+    _standardize_df,
+)
+
+
+def build_cases(frames, year=2025, month=11):
+    """Returns [(name, callable)] with inputs prepared the way the pages prepare them."""
+    df_attendance, df_sales, df_oplans, df_others, df_sheet2 = frames
+    date_col, dialer_col = DATE_COLUMN_SALES, DIALER_COLUMN
+    month_name = MONTH_NAMES[month - 1]
+
+    std_sales = _standardize_df(df_sales, date_col, dialer_col)
+    month_sales = _filter_by_date_local(std_sales, date_col, year, [month])
+    week = get_weeks_in_month(year, month_name)[2]
+    day = get_days_in_period(year, month_name, "All Weeks")[3]
+    first_dialer = str(df_attendance['dialer'].iloc[0])
+    quarter = [max(1, month - 2), max(1, month - 1), month]
+    tables = aggregates.prepare_tables(*frames)
+    oplans_intraday = intraday.IntradayIndex(tables['oplans'])
+    oplans_records = records.RecordIndex(tables['oplans'])
+    quarter_days = aggregates.selection_days(year, quarter)
+    _, _, anomaly_series = anomaly.series_matrix(aggregates.daily_aggregates(tables))
+    sales_trend = process_and_calculate_data(
+        year, [month], "All Dialers", "All Weeks", "All Days", df_sales, df_oplans, df_attendance)[0]
+
+    return [
+        ('standardize_df', lambda: _standardize_df(df_sales, date_col, dialer_col)),
+        ('filter_by_date', lambda: _filter_by_date_local(std_sales, date_col, year, [month])),
+        ('week_filter', lambda: _apply_week_filter_local(month_sales, date_col, week)),
+        ('day_filter', lambda: _apply_day_filter_local(month_sales, date_col, day)),
+        ('dialer_filter', lambda: _apply_dialer_filter_local(month_sales, dialer_col, first_dialer)),
+        ('get_attended_dialers', lambda: get_attended_dialers(df_attendance, year, [month])),
+        ('process_and_calculate_data', lambda: process_and_calculate_data(
+            year, [month], "All Dialers", "All Weeks", "All Days", df_sales, df_oplans, df_attendance)),
+        ('oplans_kpis', lambda: calculate_oplans_data(
+            year, [month], "All Dialers", "All Weeks", "All Days", df_oplans, df_attendance)),
+        ('others_kpis', lambda: calculate_others_data(
+            year, [month], "All Dialers", "All Weeks", "All Days", df_others, df_oplans, df_attendance, df_sheet2)),
+        ('trend_figure_json', lambda: charts.trend_figure(sales_trend, 'Sales_Count', 'Sales Count').to_json()),
+        ('quarter_live', lambda: process_and_calculate_data(
+            year, quarter, "All Dialers", "All Weeks", "All Days", df_sales, df_oplans, df_attendance)),
+        ('quarter_month_partitions', lambda: parallel.selection_kpis(
+            tables, year, quarter, "All Dialers", pool=parallel.get_pool())),
+        ('intraday_quarter_bincount', lambda: oplans_intraday.counts(year, quarter)),
+        ('anomaly_rolling_scores', lambda: anomaly.rolling_scores(anomaly_series)),
+        ('lead_conversion_index', lambda: leads.ConversionIndex(tables['oplans'], tables['sales'])),
+        ('lead_key_rows', lambda: leads.lead_rows(tables['oplans'], tables['others'])),
+        ('drilldown_quarter_page', lambda: oplans_records.page(
+            oplans_records.sort(oplans_records.positions(quarter_days), DIALER_COLUMN, ascending=False), 2)),
+    ]
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), statistics.median(timings), peak
+
+
+def run(rows_list, dialers_list, repeat=3, only=None, seed=0):
+    results = []
+    for n_dialers in dialers_list:
+        for n_rows in rows_list:
+            frames = generate_dataset(n_rows, n_dialers, seed=seed)
+            for name, fn in build_cases(frames):
+                if only and name not in only:
+                    continue
+                best, median, peak = measure(fn, repeat)
+                results.append({
+                    'case': name,
+                    'rows': n_rows,
+                    'dialers': n_dialers,
+                    'min_ms': round(best * 1000, 2),
+                    'median_ms': round(median * 1000, 2),
+                    'peak_mb': round(peak / 1024 ** 2, 2),
+                })
+                print(F"{name:<28} rows={n_rows:<9} dialers={n_dialers:<4} "
+                      F"min={best * 1000:9.2f} ms  median={median * 1000:9.2f} ms  peak={peak / 1024 ** 2:8.2f} MB",
+                      flush=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Dialers data hot paths on synthetic data.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--dialers', type=int, nargs='+', default=[5, 50])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='*', help="case names to run (default: all)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.dialers, args.repeat, set(args.only or []), args.seed)
+    print()
+    print(pd.DataFrame(results).to_string(index=False))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
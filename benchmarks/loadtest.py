@@ -0,0 +1,241 @@
+"""
+Concurrent-session load test for Dialers.py using Streamlit's AppTest.
+
+N simulated managers each open the dashboard headlessly and click through a random
+but realistic sequence of widget changes (page switches, month multiselects, week and
+day picks, dialer radio changes). Every rerun is timed; the report gives p50/p95/p99
+latency overall and per action, plus the process's resident memory over the run.
+All sessions share one process, so they share the app's caches like a real server.
+
+    python -m benchmarks.loadtest --sessions 8 --steps 20 --rows 100000 --dialers 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_dataset, write_dataset
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, 'Dialers.py')
+
+PAGES = {
+    "Sales Performance": "sales",
+    "Oplans Performance": "oplans",
+    "Others Performance": "others",
+    "Overview": "overview",
+    "Intraday Activity": "intraday",
+}
+# Dialer widget of a page when it is not the "dialer_<suffix>" radio: (kind, key)
+DIALER_WIDGETS = {'intraday': ('selectbox', 'intraday_dialer')}
+PAGE_RADIO_LABEL = "Select Dashboard View"
+
+
+def rss_mb():
+    """Current resident set size of this process in MB (Linux /proc, else peak RSS)."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class MemorySampler(threading.Thread):
+    def __init__(self, interval=0.2):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.samples.append(rss_mb())
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.samples.append(rss_mb())
+
+
+def _find(elements, key=None, label=None):
+    for element in elements:
+        if (key is not None and element.key == key) or (label is not None and element.label == label):
+            return element
+    return None
+
+
+def _current_suffix(at):
+    page_radio = _find(at.radio, label=PAGE_RADIO_LABEL)
+    return PAGES.get(page_radio.value if page_radio is not None else "Sales Performance", "sales")
+
+
+def random_action(at, rng):
+    """Applies one widget change to `at` (without running it) and returns the action name."""
+    suffix = _current_suffix(at)
+    choices = ['page', 'months', 'week', 'day', 'dialer', 'dialer']
+    rng.shuffle(choices)
+    for action in choices:
+        if action == 'page':
+            page_radio = _find(at.radio, label=PAGE_RADIO_LABEL)
+            page_radio.set_value(rng.choice([p for p in PAGES if p != page_radio.value]))
+            return action
+        if action == 'months':
+            months = _find(at.multiselect, key=F"month_{suffix}")
+            if months is None:
+                continue
+            count = rng.choice([1, 1, 1, 2, 3])
+            start = rng.randint(0, 12 - count)
+            months.set_value(months.options[start:start + count])
+            return action
+        if action in ('week', 'day', 'dialer'):
+            kind, key = 'selectbox', F"{action}_{suffix}"
+            if action == 'dialer':
+                kind, key = DIALER_WIDGETS.get(suffix, ('radio', key))
+            # Widgets the page does not have are skipped for another action
+            widget = _find(getattr(at, kind), key=key)
+            if widget is None or len(widget.options) < 2:
+                continue
+            widget.set_value(rng.choice(widget.options))
+            return action
+    return 'rerun'
+
+
+def share_runtime():
+    """
+    AppTest installs a mock Runtime as the process-wide instance for each run and
+    clears it afterwards, which breaks as soon as two sessions run at once. Give all
+    sessions one shared mock runtime (one "server") and let each AppTest run write
+    its own instance into a subclass slot instead.
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1 import app_test
+
+    class _PerRunRuntimeSlot(Runtime):
+        pass
+
+    shared = MagicMock(spec=Runtime)
+    shared.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    shared.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = shared
+    app_test.Runtime = _PerRunRuntimeSlot
+
+
+def run_session(session_id, steps, seed, timeout, results, errors, barrier):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session_id)
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    barrier.wait()
+    try:
+        started = time.perf_counter()
+        at.run()
+        results.append((session_id, 'open', time.perf_counter() - started))
+        for _ in range(steps):
+            action = random_action(at, rng)
+            started = time.perf_counter()
+            at.run()
+            results.append((session_id, action, time.perf_counter() - started))
+            if at.exception:
+                errors.append((session_id, action, at.exception[0].message))
+                break
+    except Exception as E:
+        errors.append((session_id, 'crash', repr(E)))
+
+
+def summarize(results):
+    df = pd.DataFrame(results, columns=['session', 'action', 'seconds'])
+    df['ms'] = df['seconds'] * 1000
+
+    def row(name, values):
+        return {
+            'action': name,
+            'reruns': len(values),
+            'p50_ms': round(float(np.percentile(values, 50)), 1),
+            'p95_ms': round(float(np.percentile(values, 95)), 1),
+            'p99_ms': round(float(np.percentile(values, 99)), 1),
+            'max_ms': round(float(values.max()), 1),
+        }
+
+    rows = [row('ALL', df['ms'])]
+    rows += [row(action, group['ms']) for action, group in df.groupby('action')]
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent AppTest load test for the Dialers dashboard.")
+    parser.add_argument('--sessions', type=int, default=4)
+    parser.add_argument('--steps', type=int, default=15, help="widget changes per session after the first load")
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--dialers', type=int, default=10)
+    parser.add_argument('--data-dir', help="run against this directory instead of fresh synthetic data")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=300, help="per-rerun timeout in seconds")
+    args = parser.parse_args(argv)
+
+    # AppTest does not put the script's folder on sys.path the way `streamlit run` does
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    share_runtime()
+
+    tmp = None
+    data_dir = args.data_dir
+    if data_dir is None:
+        tmp = tempfile.TemporaryDirectory()
+        data_dir = tmp.name
+        print(F"Generating {args.rows} rows x {args.dialers} dialers in {data_dir} ...", flush=True)
+        write_dataset(data_dir, generate_dataset(args.rows, args.dialers, seed=args.seed))
+
+    # Dialers.py reads its files relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(data_dir)
+    sampler = MemorySampler()
+    results, errors = [], []
+    barrier = threading.Barrier(args.sessions)
+    try:
+        rss_start = rss_mb()
+        sampler.start()
+        threads = [
+            threading.Thread(target=run_session, args=(i, args.steps, args.seed, args.timeout, results, errors, barrier))
+            for i in range(args.sessions)
+        ]
+        wall_started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - wall_started
+        sampler.stop()
+    finally:
+        os.chdir(cwd)
+        if tmp is not None:
+            tmp.cleanup()
+
+    print()
+    print(F"{args.sessions} sessions x {args.steps} steps, {len(results)} reruns in {wall:.1f} s")
+    if results:
+        print(summarize(results).to_string(index=False))
+    print(F"RSS: start {rss_start:.0f} MB, peak {max(sampler.samples):.0f} MB, end {sampler.samples[-1]:.0f} MB")
+    for session_id, action, message in errors:
+        print(F"session {session_id} failed on '{action}': {message}")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
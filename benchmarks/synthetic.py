@@ -0,0 +1,146 @@
+"""
+Deterministic synthetic data for the Dialers dashboard.
+
+Produces the five tables in the exact shapes `load_raw_data` returns
+(attendance, sales, oplans, others, sheet2) with the same column names and value
+formats as the real exports: day-first `created time` strings, dialer names with
+stray whitespace/casing, the Client and Closing Status values the Sales page
+excludes, and the Opener Status values the Transfer Ratio counts.
+
+    python -m benchmarks.synthetic --rows 100000 --dialers 50 --out bench_data
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+
+CLIENTS = ['Acme Dental', 'Bright Smile', 'PPO-Braces chasing', 'City Ortho']
+CLOSING_STATUSES = ['Closed', 'Booked', 'Rejected by client', 'Retransfer to client', 'Pending']
+OPENER_STATUSES = ['Transferred', 'Green Flag', 'Red Flags', 'No Answer', 'Call Back', 'Not Interested']
+
+
+def dialer_names(n_dialers):
+    """SA1, SA2, ... with a few HU/OS teams mixed in, always `n_dialers` unique names."""
+    prefixes = ['SA', 'HU', 'OS']
+    return [F"{prefixes[i % len(prefixes)]}{i // len(prefixes) + 1}" for i in range(n_dialers)]
+
+
+def _messy(names, rng):
+    # Real exports mix casing and padding; _standardize_df strips/uppercases them
+    variants = np.array([' {} ', '{}', '{} '], dtype=object)
+    picks = rng.integers(0, len(variants), len(names))
+    lowered = rng.random(len(names)) < 0.2
+    out = [variants[p].format(n.lower() if low else n) for n, p, low in zip(names, picks, lowered)]
+    return np.array(out, dtype=object)
+
+
+def _timestamps(n, days, rng):
+    """Random working-day timestamps (08:00-20:00) formatted day-first like the CSV exports."""
+    day_idx = rng.integers(0, len(days), n)
+    seconds = rng.integers(8 * 3600, 20 * 3600, n)
+    ts = days.values[day_idx] + seconds.astype('timedelta64[s]')
+    return pd.Series(ts).dt.strftime('%d/%m/%Y %H:%M').to_numpy(dtype=object)
+
+
+def _phones(pool, picks, rng):
+    """Phone numbers of `pool` (9-digit mobile numbers) written as "+44 7..." or "07..." like the exports mix them."""
+    numbers = pool[picks].astype(str)
+    international = rng.random(len(picks)) < 0.3
+    return np.where(international, np.char.add('+44 7', numbers), np.char.add('07', numbers)).astype(object)
+
+
+def generate_dataset(n_rows=10_000, n_dialers=5, year=2025, seed=0):
+    """
+    Returns (df_attendance, df_sales, df_oplans, df_others, df_sheet2), the same order
+    as load_raw_data. Sales and oplans hold `n_rows` rows each, others half of that;
+    attendance has one row per working day and dialer of `year`.
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range(F"{year}-01-01", F"{year}-12-31")
+    names = dialer_names(n_dialers)
+    # Some dialers are busier than others so per-dialer series differ
+    weights = rng.uniform(0.5, 1.5, n_dialers)
+    weights /= weights.sum()
+
+    # Attendance: every working day x dialer (a few missing days), attendance as float
+    att_days = np.repeat(days.values, n_dialers)
+    att_dialers = np.tile(np.array(names, dtype=object), len(days))
+    keep = rng.random(len(att_days)) > 0.03
+    df_attendance = pd.DataFrame({
+        'date': att_days[keep],
+        'dialer': att_dialers[keep],
+        'attendance': rng.integers(5, 30, keep.sum()).astype(float),
+    })
+
+    # Sales: CSV-style strings, some rows without a dialer
+    sales_dialers = _messy(rng.choice(names, n_rows, p=weights), rng)
+    sales_dialers[rng.random(n_rows) < 0.01] = None
+    df_sales = pd.DataFrame({
+        'created time': _timestamps(n_rows, days, rng),
+        'dialer': sales_dialers,
+        'Client': rng.choice(CLIENTS, n_rows, p=[0.4, 0.3, 0.1, 0.2]),
+        'Closing Status': rng.choice(CLOSING_STATUSES, n_rows, p=[0.4, 0.3, 0.1, 0.1, 0.1]),
+    })
+
+    df_oplans = pd.DataFrame({
+        'created time': _timestamps(n_rows, days, rng),
+        'dialer': _messy(rng.choice(names, n_rows, p=weights), rng),
+        'Opener Status': rng.choice(OPENER_STATUSES, n_rows, p=[0.35, 0.15, 0.1, 0.2, 0.1, 0.1]),
+    })
+
+    n_others = max(1, n_rows // 2)
+    df_others = pd.DataFrame({
+        'created time': _timestamps(n_others, days, rng),
+        'Other Leads Dialer': _messy(rng.choice(names, n_others, p=weights), rng),
+    })
+
+    # sheet2: one row per calendar day with the 'att' column used by "Average checks per agent"
+    calendar_days = pd.date_range(F"{year}-01-01", F"{year}-12-31")
+    df_sheet2 = pd.DataFrame({
+        'date': calendar_days,
+        'att': rng.integers(0, 30 * n_dialers, len(calendar_days)).astype(float),
+    })
+
+    # Lead phone numbers from their own generator, so the columns above stay the same per seed.
+    # Some leads repeat within a file; sales and others reuse part of the O-Plan leads.
+    lead_rng = np.random.default_rng([seed, 1])
+    pool = lead_rng.choice(10**9 - 10**8, n_rows * 2, replace=False) + 10**8
+    oplan_picks = lead_rng.integers(0, len(pool), n_rows)
+    sale_picks = np.where(lead_rng.random(n_rows) < 0.4, lead_rng.choice(oplan_picks, n_rows), lead_rng.integers(0, len(pool), n_rows))
+    other_picks = np.where(lead_rng.random(n_others) < 0.3, lead_rng.choice(oplan_picks, n_others), lead_rng.integers(0, len(pool), n_others))
+    df_oplans['Phone'] = _phones(pool, oplan_picks, lead_rng)
+    df_sales['Phone'] = _phones(pool, sale_picks, lead_rng)
+    df_others['Phone'] = _phones(pool, other_picks, lead_rng)
+
+    return df_attendance, df_sales, df_oplans, df_others, df_sheet2
+
+
+def write_dataset(directory, frames):
+    """Writes the tables under the file names load_raw_data reads."""
+    df_attendance, df_sales, df_oplans, df_others, df_sheet2 = frames
+    os.makedirs(directory, exist_ok=True)
+    df_attendance.to_excel(os.path.join(directory, 'Dialers Attendance.xlsx'), index=False)
+    df_sheet2.to_excel(os.path.join(directory, 'sheet2.xlsx'), index=False)
+    df_sales.to_csv(os.path.join(directory, 'sales.csv'), index=False)
+    df_oplans.to_csv(os.path.join(directory, 'O_Plan_Leads.csv'), index=False)
+    df_others.to_csv(os.path.join(directory, 'Other_Leads.csv'), index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic Dialers dataset.")
+    parser.add_argument('--rows', type=int, default=10_000, help="sales/oplans rows (others get half)")
+    parser.add_argument('--dialers', type=int, default=5)
+    parser.add_argument('--year', type=int, default=2025)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='bench_data')
+    args = parser.parse_args(argv)
+
+    frames = generate_dataset(args.rows, args.dialers, args.year, args.seed)
+    write_dataset(args.out, frames)
+    print(F"Wrote {args.rows} rows x {args.dialers} dialers to {args.out}/")
+
+
+if __name__ == '__main__':
+    main()
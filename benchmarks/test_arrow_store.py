@@ -0,0 +1,71 @@
+"""
+The shared Arrow copies of the prepared tables: mapped tables answer like the
+in-process ones, and only other versions idle past the grace period are removed.
+
+    python -m pytest benchmarks/test_arrow_store.py
+"""
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_dataset
+from dialer_core import aggregates, arrow_store, parallel
+
+pytest.importorskip("pyarrow")
+
+YEAR = 2025
+
+
+@pytest.fixture(scope="module")
+def local():
+    return aggregates.prepare_tables(*generate_dataset(n_rows=3000, n_dialers=4, year=YEAR, seed=5))
+
+
+def test_prepared_tables_are_written_once_and_mapped(local, tmp_path):
+    calls = []
+
+    def prepare():
+        calls.append(1)
+        return local
+
+    mapped = arrow_store.load_prepared(prepare, 'v1', 'phone', str(tmp_path))
+    again = arrow_store.load_prepared(prepare, 'v1', 'phone', str(tmp_path))
+    assert len(calls) == 1
+    assert set(again) == set(arrow_store.PREPARED_NAMES)
+    # Text columns come back dictionary-encoded, numbers and dates as they were
+    assert isinstance(mapped['oplans']['dialer'].dtype, pd.CategoricalDtype)
+    assert mapped['leads']['key'].dtype == local['leads']['key'].dtype
+    assert mapped['sales']['created time'].dtype == local['sales']['created time'].dtype
+
+
+@pytest.mark.parametrize("months, dialer", [([3], "All Dialers"), ([1, 2], "SA1"), ([7], "HU1")])
+def test_mapped_tables_give_the_same_kpis(local, tmp_path, months, dialer):
+    mapped = arrow_store.load_prepared(lambda: local, 'v1', 'phone', str(tmp_path))
+    expected = parallel.selection_kpis(local, YEAR, months, dialer)
+    result = parallel.selection_kpis(mapped, YEAR, months, dialer)
+    for page in aggregates.PAGES:
+        assert result[page][1:] == expected[page][1:]
+        pd.testing.assert_frame_equal(result[page][0].reset_index(drop=True), expected[page][0].reset_index(drop=True))
+
+
+def test_dialer_codes_of_a_mapped_column_match_the_names(local, tmp_path):
+    mapped = arrow_store.load_prepared(lambda: local, 'v1', 'phone', str(tmp_path))
+    codes, names = aggregates.dialer_codes(mapped['sales'])
+    expected_codes, expected_names = aggregates.dialer_codes(local['sales'])
+    assert names == expected_names
+    assert (codes == expected_codes).all()
+
+
+def test_remove_stale_keeps_recent_versions(tmp_path):
+    for version in ('old', 'recent', 'current'):
+        os.makedirs(tmp_path / arrow_store._dir_name(version))
+        (tmp_path / arrow_store._dir_name(version) / 'sales.arrow').write_bytes(b"")
+    long_ago = time.time() - 3600
+    old = tmp_path / arrow_store._dir_name('old')
+    for path in (old / 'sales.arrow', old):
+        os.utime(path, (long_ago, long_ago))
+
+    arrow_store.remove_stale('current', str(tmp_path), grace=600)
+    assert sorted(os.listdir(tmp_path)) == sorted(arrow_store._dir_name(v) for v in ('recent', 'current'))
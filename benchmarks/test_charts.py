@@ -0,0 +1,81 @@
+"""
+Trend rollup and LTTB downsampling (`dialer_core.charts`): weekly and monthly buckets
+keep the totals, and downsampled series keep their ends, their spikes and the point
+budget.
+
+    python -m pytest benchmarks/test_charts.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from dialer_core import charts
+from dialer_core.config import DIALER_COLUMN
+
+
+def _trend(start="2025-01-01", days=400, dialers=("SA1", "HU1"), seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=days)
+    return pd.DataFrame({
+        'Date': np.tile(dates, len(dialers)),
+        DIALER_COLUMN: np.repeat(dialers, days),
+        'Sales Count': rng.integers(0, 20, days * len(dialers)),
+    })
+
+
+@pytest.mark.parametrize("days, expected", [(30, "Daily"), (92, "Daily"), (93, "Weekly"), (400, "Weekly"), (401, "Monthly")])
+def test_auto_granularity_follows_the_span(days, expected):
+    assert charts.resolve_granularity(_trend(days=days), "Auto") == expected
+    assert charts.resolve_granularity(_trend(days=days), "Monthly") == "Monthly"
+
+
+@pytest.mark.parametrize("granularity", ["Weekly", "Monthly"])
+def test_rollup_matches_pandas_buckets(granularity):
+    # Starts on a Wednesday, so the first week is partial
+    df = _trend(start="2025-01-08", days=200)
+    result = charts.rollup_trend(df, 'Sales Count', granularity)
+
+    bucket = df['Date'].dt.to_period('W-SUN' if granularity == "Weekly" else 'M').dt.start_time
+    expected = (df.assign(Date=bucket.clip(lower=df['Date'].min()))
+                .groupby(['Date', DIALER_COLUMN])['Sales Count'].sum().reset_index())
+    merged = result.merge(expected, on=['Date', DIALER_COLUMN], suffixes=('', '_expected'))
+    assert len(merged) == len(result) == len(expected)
+    assert (merged['Sales Count'] == merged['Sales Count_expected']).all()
+    assert result['Date'].min() == df['Date'].min()
+    assert result['Date'].is_monotonic_increasing
+    # Buckets after the clipped first one start on Mondays or on the 1st
+    later = result.loc[result['Date'] > df['Date'].min(), 'Date']
+    assert (later.dt.dayofweek == 0).all() if granularity == "Weekly" else (later.dt.day == 1).all()
+
+
+def test_rollup_leaves_daily_and_empty_trends_alone():
+    df = _trend(days=10)
+    assert charts.rollup_trend(df, 'Sales Count', "Daily") is df
+    empty = df.iloc[:0]
+    assert charts.rollup_trend(empty, 'Sales Count', "Weekly") is empty
+
+
+def test_lttb_keeps_ends_spikes_and_the_budget():
+    x = np.arange(1000)
+    y = np.sin(x / 50.0)
+    y[537] = 25.0
+    keep = charts.lttb(x, y, 100)
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert (np.diff(keep) > 0).all()
+    assert 537 in keep
+
+
+@pytest.mark.parametrize("n, n_out", [(50, 100), (50, 50), (50, 2)])
+def test_lttb_keeps_short_series_whole(n, n_out):
+    assert (charts.lttb(np.arange(n), np.ones(n), n_out) == np.arange(n)).all()
+
+
+def test_long_daily_trends_are_downsampled_per_dialer():
+    df = _trend(days=3000)
+    fig = charts.trend_figure(df, 'Sales Count', "Sales", granularity="Daily", point_budget=400)
+    lines = [trace for trace in fig.data if trace.mode == 'lines']
+    assert [trace.name for trace in lines] == ["SA1", "HU1"]
+    assert all(len(trace.x) == 200 for trace in lines)
+    short = charts.trend_figure(_trend(days=50), 'Sales Count', "Sales", granularity="Daily", point_budget=400)
+    assert all(len(trace.x) == 50 for trace in short.data if trace.mode == 'lines')
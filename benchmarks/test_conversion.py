@@ -0,0 +1,83 @@
+"""
+The O-Plan -> sale conversion funnel (`leads.ConversionIndex`) on hand-made leads:
+each lead counts once, on its first O-Plan, and converts on its first sale at or
+after it within the window.
+
+    python -m pytest benchmarks/test_conversion.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from dialer_core import aggregates, leads
+
+YEAR = 2025
+
+
+def _tables():
+    """Prepared tables with leads A (phone ...01) to E (...05) and one O-Plan without a phone."""
+    df_oplans = pd.DataFrame({
+        'created time': ['01/10/2025 09:00', '05/10/2025 09:00', '02/10/2025 10:00', '03/10/2025 11:00',
+                         '06/10/2025 12:00', '03/11/2025 09:00', '07/10/2025 09:00'],
+        'dialer': ['SA1', 'SA2', 'SA1', 'SA2', 'SA2', 'SA1', 'SA1'],
+        'Opener Status': 'Transferred',
+        'Phone': ['07700900001', '07700900001', '07700900002', '07700900003', '07700900004', '07700900005', None],
+    })
+    # A closes after 10 days, B after 2; C's only sale is before its O-Plan, D's is past the window
+    df_sales = pd.DataFrame({
+        'created time': ['11/10/2025 09:00', '04/10/2025 10:00', '30/09/2025 09:00', '20/12/2025 09:00'],
+        'dialer': ['SA1', 'SA1', 'SA2', 'SA2'],
+        'Client': 'Acme Dental',
+        'Closing Status': 'Closed',
+        'Phone': ['+44 7700 900001', '07700900002', '07700900003', '07700900004'],
+    })
+    df_others = pd.DataFrame({'created time': ['01/10/2025 09:00'], 'Other Leads Dialer': ['SA1']})
+    df_attendance = pd.DataFrame({'date': pd.to_datetime(['2025-10-01', '2025-11-03']), 'dialer': ['SA1', 'SA2'], 'attendance': 1.0})
+    df_sheet2 = pd.DataFrame({'date': pd.date_range(F"{YEAR}-09-01", F"{YEAR}-12-31"), 'att': 2.0})
+    return aggregates.prepare_tables(df_attendance, df_sales, df_oplans, df_others, df_sheet2)
+
+
+@pytest.fixture(scope="module")
+def index():
+    tables = _tables()
+    return leads.ConversionIndex(tables['oplans'], tables['sales'], key='phone', window_days=30)
+
+
+def _rows(summary):
+    return {row['Dialer']: row for row in summary.to_dict('records')}
+
+
+def test_summary_counts_first_oplans_and_sales_in_the_window(index):
+    assert index.available and index.leads == 5
+    summary = index.summary(YEAR, [10])
+    assert list(summary.columns) == leads.FUNNEL_COLUMNS
+    assert list(summary['Dialer']) == ["SA1", "SA2", "All Dialers"]
+    rows = _rows(summary)
+    assert (rows["SA1"]['O-Plan Leads'], rows["SA1"]['Converted'], rows["SA1"]['Conversion %']) == (2, 2, 100.0)
+    assert (rows["SA1"]['Median Days to Close'], rows["SA1"]['Mean Days to Close']) == (6.0, 6.0)
+    assert (rows["SA2"]['O-Plan Leads'], rows["SA2"]['Converted'], rows["SA2"]['Conversion %']) == (2, 0, 0.0)
+    assert np.isnan(rows["SA2"]['Median Days to Close'])
+    assert (rows["All Dialers"]['O-Plan Leads'], rows["All Dialers"]['Converted'], rows["All Dialers"]['Conversion %']) == (4, 2, 50.0)
+
+
+def test_summary_follows_the_filters(index):
+    assert list(index.summary(YEAR, [10], dialer=" sa2")['Dialer']) == ["SA2", "All Dialers"]
+    assert _rows(index.summary(YEAR, [10, 11]))["All Dialers"]['O-Plan Leads'] == 5
+    assert _rows(index.summary(YEAR, [10], day_str="2025-10-02"))["All Dialers"]['O-Plan Leads'] == 1
+
+
+def test_a_longer_window_converts_late_sales():
+    tables = _tables()
+    rows = _rows(leads.ConversionIndex(tables['oplans'], tables['sales'], key='phone', window_days=90).summary(YEAR, [10]))
+    assert rows["SA2"]['Converted'] == 1 and rows["All Dialers"]['Converted'] == 3
+
+
+def test_empty_selection_and_missing_key_columns(index):
+    empty = index.summary(YEAR, [3])
+    assert list(empty['Dialer']) == ["All Dialers"]
+    assert (empty['O-Plan Leads'].iloc[0], empty['Conversion %'].iloc[0]) == (0, 0.0)
+
+    tables = _tables()
+    unavailable = leads.ConversionIndex(tables['oplans'], tables['sales'], key='lead_id')
+    assert not unavailable.available and unavailable.leads == 0
+    assert list(unavailable.summary(YEAR, [10])['O-Plan Leads']) == [0]
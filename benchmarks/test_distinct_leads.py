@@ -0,0 +1,89 @@
+"""
+Distinct lead counts of the Others page: a lead in both lead files, or twice in one,
+counts once within a selection, and a lead seen in two months counts in each.
+
+    python -m pytest benchmarks/test_distinct_leads.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from dialer_core import aggregates, engine, leads, parallel
+
+YEAR = 2025
+
+
+def _frames():
+    """(attendance, sales, oplans, others, sheet2) with the phones below, in load_raw_data's shapes."""
+    # Lead A is in both files, C twice in Other_Leads, D in October and again (written
+    # "+44 ...") in November, and one November Others row has no phone
+    df_oplans = pd.DataFrame({
+        'created time': ['01/10/2025 09:00', '02/10/2025 10:00', '03/11/2025 11:00'],
+        'dialer': ['SA1', 'sa1 ', 'SA1'],
+        'Opener Status': ['Transferred', 'No Answer', 'Transferred'],
+        'Phone': ['07700900001', '07700900002', '+44 7700 900004'],
+    })
+    df_others = pd.DataFrame({
+        'created time': ['03/10/2025 09:00', '06/10/2025 09:30', '07/10/2025 12:00', '08/10/2025 15:00',
+                         '04/11/2025 09:00', '05/11/2025 10:00'],
+        'Other Leads Dialer': ['SA2', 'SA2', ' SA2', 'SA2', 'SA2', 'SA2'],
+        'Phone': ['+44 7700 900001', '07700900003', '07700900003', '07700900004', '07700900005', None],
+    })
+    df_sales = pd.DataFrame({
+        'created time': ['01/10/2025 12:00'],
+        'dialer': ['SA1'],
+        'Client': ['Acme Dental'],
+        'Closing Status': ['Closed'],
+        'Phone': ['07700900001'],
+    })
+    # One attendance per dialer and month, so Average checks per agent is Total Leads / dialers / months
+    df_attendance = pd.DataFrame({
+        'date': pd.to_datetime(['2025-10-01', '2025-10-01', '2025-11-03', '2025-11-03']),
+        'dialer': ['SA1', 'SA2', 'SA1', 'SA2'],
+        'attendance': 1.0,
+    })
+    df_sheet2 = pd.DataFrame({'date': pd.date_range(F"{YEAR}-10-01", F"{YEAR}-11-30"), 'att': 2.0})
+    return df_attendance, df_sales, df_oplans, df_others, df_sheet2
+
+
+# (months, dialer) -> (Others %, Average checks per agent)
+EXPECTED = {
+    # Total Leads A, B, C, D; Others A, C, D
+    ((10,), "All Dialers"): (75.0, '2.00'),
+    # D, E and the keyless row; Others E and the keyless row
+    ((11,), "All Dialers"): (66.7, '1.50'),
+    # A, B, C, D, E and the keyless row: D counts once over both months
+    ((10, 11), "All Dialers"): (83.3, '1.50'),
+    ((10,), "SA1"): (0, '2.00'),
+    ((10,), "SA2"): (100.0, '3.00'),
+}
+
+
+def test_distinct_leads_counts_keys_once_and_keyless_rows_each():
+    hashes = np.array([7, 7, 9, 0], dtype=np.uint64)
+    valid = np.array([True, True, True, False])
+    assert leads.distinct_leads((hashes, valid)) == 3
+    assert leads.distinct_leads((hashes, valid), (np.array([9, 11], dtype=np.uint64), np.array([True, True]))) == 4
+    assert leads.distinct_leads() == 0
+
+
+@pytest.mark.parametrize("months, dialer", list(EXPECTED))
+def test_live_others_kpis(months, dialer):
+    result = engine.live_kpis('others', _frames(), YEAR, list(months), dialer, "All Weeks", "All Days")
+    values = engine.kpi_values('others', result)
+    assert (values['others_percentage'], values['avg_checks_per_agent_display']) == EXPECTED[(months, dialer)]
+
+
+@pytest.mark.parametrize("months, dialer", list(EXPECTED))
+def test_aggregate_others_kpis(months, dialer):
+    tables = aggregates.prepare_tables(*_frames())
+    result = parallel.selection_kpis(tables, YEAR, list(months), dialer)['others']
+    values = engine.kpi_values('others', result)
+    assert (values['others_percentage'], values['avg_checks_per_agent_display']) == EXPECTED[(months, dialer)]
+
+
+def test_prepared_tables_keep_keys_out_of_the_lead_frames():
+    tables = aggregates.prepare_tables(*_frames())
+    assert list(tables['leads'].columns[-3:]) == ['source', 'key', 'has_key']
+    for name in ('oplans', 'others'):
+        assert not {'key', 'has_key', 'source'} & set(tables[name].columns)
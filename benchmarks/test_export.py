@@ -0,0 +1,96 @@
+"""
+Chunked exports (`dialer_core.export`) on a synthetic dataset: the chunks cover the
+selection's rows once, and the CSV, Parquet and Excel writers read back to them.
+
+    python -m pytest benchmarks/test_export.py
+"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_dataset
+from dialer_core import aggregates, export
+from dialer_core.config import DATE_COLUMN_SALES, DIALER_COLUMN
+
+YEAR = 2025
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return aggregates.prepare_tables(*generate_dataset(n_rows=3000, n_dialers=3, year=YEAR, seed=6))
+
+
+def _expected(tables, table, months, dialer):
+    df = tables[table]
+    dates = df['date' if table == 'attendance' else DATE_COLUMN_SALES]
+    keep = (dates.dt.year == YEAR) & dates.dt.month.isin(months)
+    if dialer != "All Dialers":
+        keep &= df[DIALER_COLUMN] == dialer
+    rows = df[keep]
+    return rows.iloc[np.argsort(dates[keep].dt.month.to_numpy(), kind='stable')]
+
+
+@pytest.mark.parametrize("table", export.EXPORT_TABLES)
+@pytest.mark.parametrize("months, dialer", [([3], "All Dialers"), ([5, 2], "SA1")])
+def test_filtered_rows_cover_the_selection_in_chunks(tables, table, months, dialer):
+    chunks = list(export.filtered_rows(tables, table, YEAR, months, dialer, chunk_rows=100))
+    assert chunks and all(len(chunk) <= 100 for chunk in chunks)
+    rows = pd.concat(chunks)
+    expected = _expected(tables, table, months, dialer)
+    assert list(rows.index) == list(expected.index)
+    if table == 'oplans':
+        assert rows['is_transfer'].dtype == bool
+
+
+def _chunks(tables, chunk_rows=200):
+    return export.filtered_rows(tables, 'sales', YEAR, [3, 4], chunk_rows=chunk_rows)
+
+
+def test_csv_reads_back_with_one_header(tables):
+    data = b"".join(export.iter_export('csv', _chunks(tables)))
+    expected = pd.concat(_chunks(tables))
+    result = pd.read_csv(io.BytesIO(data))
+    assert list(result.columns) == list(expected.columns)
+    assert len(result) == len(expected)
+    assert (result[DIALER_COLUMN].to_numpy() == expected[DIALER_COLUMN].to_numpy()).all()
+
+
+def test_parquet_writes_one_row_group_per_chunk(tables):
+    pq = pytest.importorskip("pyarrow.parquet")
+    expected = pd.concat(_chunks(tables))
+    data = b"".join(export.iter_export('parquet', _chunks(tables)))
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.num_row_groups == len(list(_chunks(tables)))
+    result = parquet.read().to_pandas()
+    pd.testing.assert_frame_equal(result, expected.reset_index(drop=True), check_dtype=False)
+
+
+def test_xlsx_reads_back(tables, tmp_path):
+    pytest.importorskip("openpyxl")
+    expected = pd.concat(_chunks(tables)).reset_index(drop=True)
+    path = tmp_path / 'sales.xlsx'
+    with open(path, 'wb') as sink:
+        export.write_export('xlsx', _chunks(tables), sink, sheet_title="Sales rows")
+    streamed = pd.read_excel(io.BytesIO(b"".join(export.iter_export('xlsx', _chunks(tables)))))
+    result = pd.read_excel(path, sheet_name="Sales rows")
+    assert list(result.columns) == list(expected.columns) == list(streamed.columns)
+    assert len(result) == len(streamed) == len(expected)
+    assert (result[DIALER_COLUMN] == expected[DIALER_COLUMN]).all()
+
+
+def test_empty_selection_writes_empty_files(tables):
+    pq = pytest.importorskip("pyarrow.parquet")
+    empty = export.filtered_rows(tables, 'sales', YEAR - 10, [1])
+    assert b"".join(export.iter_export('csv', empty)) == b""
+    data = b"".join(export.iter_export('parquet', export.filtered_rows(tables, 'sales', YEAR - 10, [1])))
+    assert pq.ParquetFile(io.BytesIO(data)).metadata.num_rows == 0
+
+
+def test_unknown_format_and_table_are_rejected(tables):
+    with pytest.raises(ValueError):
+        export.iter_export('json', _chunks(tables))
+    with pytest.raises(ValueError):
+        export.selection_positions(tables, 'leads', YEAR, [3])
+    assert export.export_filename('sales', YEAR, [11, 3], 'xlsx') == "sales_2025_03-11.xlsx"
@@ -0,0 +1,79 @@
+"""
+Daily forecasts (`dialer_core.forecast`) on regular synthetic counts: the forecast
+follows each dialer's weekday pattern, covers the selection's days after the data,
+and fitted models are reused until the counts in the window change.
+
+    python -m pytest benchmarks/test_forecast.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from dialer_core import forecast, intraday
+from dialer_core.config import DATE_COLUMN_SALES, DIALER_COLUMN
+
+pytest.importorskip("sklearn")
+
+YEAR = 2025
+LAST_DATE = pd.Timestamp(F"{YEAR}-03-14")
+
+
+def _rows(first="2024-12-01", last=LAST_DATE):
+    """SA1: 2 leads every day; HU1: 6 on Mondays and 1 on other days."""
+    rows = []
+    for date in pd.date_range(first, last):
+        rows += [(date + pd.Timedelta(hours=10), "SA1")] * 2
+        rows += [(date + pd.Timedelta(hours=11), "HU1")] * (6 if date.dayofweek == 0 else 1)
+    return pd.DataFrame(rows, columns=[DATE_COLUMN_SALES, DIALER_COLUMN])
+
+
+def _forecast(df, models, **kwargs):
+    return forecast.forecast_frame(intraday.IntradayIndex(df), 'sales', 'Sales Count', YEAR, [3], models=models, **kwargs)
+
+
+def test_forecast_covers_the_rest_of_the_selection():
+    frame = _forecast(_rows(), forecast.ForecastModels())
+    dates = pd.DatetimeIndex(frame['Date'].unique())
+    assert dates.min() > LAST_DATE and dates.max() <= pd.Timestamp(F"{YEAR}-03-31")
+    assert set(frame[DIALER_COLUMN]) == {"SA1", "HU1"}
+    sa1 = frame[frame[DIALER_COLUMN] == "SA1"]['Sales Count']
+    assert np.allclose(sa1, 2, atol=0.2)
+    hu1 = frame[frame[DIALER_COLUMN] == "HU1"].set_index('Date')['Sales Count']
+    mondays = hu1.index.dayofweek == 0
+    assert hu1[mondays].min() > 4 and hu1[~mondays].max() < 2
+
+
+def test_models_are_reused_until_the_window_changes():
+    models = forecast.ForecastModels()
+    df = _rows()
+    first = _forecast(df, models)
+    pd.testing.assert_frame_equal(_forecast(df, models), first)
+    assert models.fits == 1
+    # A change before the training window keeps the model
+    older = pd.concat([pd.DataFrame({DATE_COLUMN_SALES: [pd.Timestamp("2024-11-04 09:00")], DIALER_COLUMN: ["SA1"]}), df])
+    _forecast(older, models)
+    assert models.fits == 1
+    # A new row inside it refits
+    newer = pd.concat([df, pd.DataFrame({DATE_COLUMN_SALES: [LAST_DATE + pd.Timedelta(hours=15)], DIALER_COLUMN: ["SA1"]})])
+    _forecast(newer, models)
+    assert models.fits == 2
+
+
+def test_one_dialer():
+    frame = _forecast(_rows(), forecast.ForecastModels(), dialer=" hu1")
+    assert set(frame[DIALER_COLUMN]) == {"HU1"}
+
+
+@pytest.mark.parametrize("df, months", [
+    (_rows(), [2]),                                    # no days after the data
+    (_rows(first="2025-03-05"), [3]),                  # too little history
+    (_rows().iloc[:0], [3]),                           # no rows
+])
+def test_no_forecast(df, months):
+    frame = forecast.forecast_frame(intraday.IntradayIndex(df), 'sales', 'Sales Count', YEAR, months)
+    assert frame.empty and list(frame.columns) == ['Date', DIALER_COLUMN, 'Sales Count']
+
+
+def test_no_forecast_without_scikit_learn(monkeypatch):
+    monkeypatch.setattr(forecast, '_ridge', lambda: None)
+    assert _forecast(_rows(), forecast.ForecastModels()).empty
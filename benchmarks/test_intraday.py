@@ -0,0 +1,82 @@
+"""
+Intraday counts (`dialer_core.intraday`) on a synthetic dataset: the bincount cube
+and the daily matrix match a pandas groupby of the prepared tables, and empty
+selections give empty cubes.
+
+    python -m pytest benchmarks/test_intraday.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_dataset
+from dialer_core import aggregates, intraday
+from dialer_core.config import DATE_COLUMN_SALES, DIALER_COLUMN
+from dialer_core.periods import get_days_in_period, get_weeks_in_month
+
+YEAR = 2025
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return aggregates.prepare_tables(*generate_dataset(n_rows=4000, n_dialers=3, year=YEAR, seed=9))
+
+
+@pytest.fixture(scope="module")
+def indexes(tables):
+    return intraday.build_indexes(tables)
+
+
+def _selections():
+    week = get_weeks_in_month(YEAR, "March")[2]
+    return [([3], "All Weeks", "All Days"), ([1, 2], "All Weeks", "All Days"), ([3], week, "All Days"),
+            ([3], week, get_days_in_period(YEAR, "March", week)[2])]
+
+
+def _expected(df, months, week_str, day_str):
+    dates = df[DATE_COLUMN_SALES]
+    rows = df[(dates.dt.year == YEAR) & dates.dt.month.isin(months)]
+    rows = rows[aggregates.period_mask(pd.DatetimeIndex(rows[DATE_COLUMN_SALES].dt.normalize()), week_str, day_str)]
+    times = rows[DATE_COLUMN_SALES]
+    return rows.groupby([rows[DIALER_COLUMN].astype(str), times.dt.dayofweek, times.dt.hour]).size()
+
+
+@pytest.mark.parametrize("table", list(intraday.SOURCES))
+@pytest.mark.parametrize("months, week, day", _selections())
+def test_counts_match_a_groupby(tables, indexes, table, months, week, day):
+    dialers, cube = indexes[table].counts(YEAR, months, week, day)
+    expected = _expected(tables[table], months, week, day)
+    assert dialers == sorted(expected.index.get_level_values(0).unique())
+    assert cube.sum() == expected.sum()
+    for (dialer, weekday, hour), count in expected.items():
+        assert cube[dialers.index(dialer), weekday, hour] == count
+
+
+def test_views_sum_the_cube(indexes):
+    dialers, cube = indexes['oplans'].counts(YEAR, [3])
+    names, by_hour = intraday.hour_by_dialer(dialers, cube)
+    assert names == [d for d in dialers if d != aggregates.NO_DIALER]
+    assert by_hour.shape == (len(names), intraday.HOURS)
+    assert (intraday.weekday_by_hour(dialers, cube) == cube.sum(axis=0)).all()
+    assert (intraday.weekday_by_hour(dialers, cube, dialers[0]) == cube[0]).all()
+    assert not intraday.weekday_by_hour(dialers, cube, "ZZZ").any()
+
+
+def test_empty_selections(tables, indexes):
+    dialers, cube = indexes['sales'].counts(YEAR - 10, [3])
+    assert dialers == [] and cube.shape == (0, 7, intraday.HOURS)
+    assert list(intraday.active_hours(cube)) == list(range(intraday.HOURS))
+    dialers, cube = intraday.IntradayIndex(tables['sales'].iloc[:0]).counts(YEAR, [3])
+    assert dialers == [] and cube.shape == (0, 7, intraday.HOURS)
+
+
+def test_daily_counts_match_a_groupby(tables, indexes):
+    first = int(np.datetime64(F"{YEAR}-03-01", 'D').astype(np.int64))
+    dialers, counts = indexes['sales'].daily_counts(first, first + 30)
+    df = tables['sales']
+    rows = df[(df[DATE_COLUMN_SALES].dt.year == YEAR) & (df[DATE_COLUMN_SALES].dt.month == 3)]
+    expected = rows.groupby([rows[DIALER_COLUMN].astype(str), rows[DATE_COLUMN_SALES].dt.day]).size()
+    assert counts.shape == (len(dialers), 31)
+    assert counts.sum() == expected.sum()
+    for (dialer, day), count in expected.items():
+        assert counts[dialers.index(dialer), day - 1] == count
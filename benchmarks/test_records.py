@@ -0,0 +1,90 @@
+"""
+Raw-record drill-down (`dialer_core.records`) on a synthetic dataset: the positions of
+a selection, search, sort and pages match the same steps in pandas.
+
+    python -m pytest benchmarks/test_records.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_dataset
+from dialer_core import aggregates, records
+from dialer_core.config import DATE_COLUMN_SALES, DIALER_COLUMN
+
+YEAR = 2025
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return aggregates.prepare_tables(*generate_dataset(n_rows=3000, n_dialers=3, year=YEAR, seed=10))
+
+
+@pytest.fixture(scope="module")
+def index(tables):
+    return records.RecordIndex(tables['sales'])
+
+
+def _days(months):
+    return aggregates.selection_days(YEAR, months, "All Weeks", "All Days")
+
+
+def _expected(df, days, dialer="All Dialers"):
+    day = df[DATE_COLUMN_SALES].to_numpy(dtype='datetime64[D]').astype(np.int64)
+    rows = df[np.isin(day, days)]
+    if dialer != "All Dialers":
+        rows = rows[rows[DIALER_COLUMN] == dialer]
+    return rows.assign(_day=rows[DATE_COLUMN_SALES].dt.normalize()).sort_values(
+        ['_day', DIALER_COLUMN, DATE_COLUMN_SALES], kind='stable')
+
+
+@pytest.mark.parametrize("months, dialer", [([3], "All Dialers"), ([3], " sa1"), ([1, 2], "HU1"), ([3], "ZZZ")])
+def test_positions_of_a_selection(tables, index, months, dialer):
+    positions = index.positions(_days(months), dialer)
+    expected = _expected(tables['sales'], _days(months), dialer if dialer == "All Dialers" else dialer.strip().upper())
+    assert list(tables['sales'].index[positions]) == list(expected.index)
+
+
+def test_search_matches_text_columns(tables, index):
+    positions = index.positions(_days([3, 4]))
+    df = tables['sales'].iloc[positions]
+    text = [c for c in df.columns if pd.api.types.is_object_dtype(df[c].dtype) or pd.api.types.is_string_dtype(df[c].dtype)]
+    term = str(df['Client'].dropna().iloc[0])[1:4].lower()
+    hit = np.zeros(len(df), dtype=bool)
+    for column in text:
+        hit |= df[column].astype(str).str.contains(term, case=False, regex=False).to_numpy() & df[column].notna().to_numpy()
+    assert list(index.search(positions, F" {term.upper()} ")) == list(positions[hit])
+    assert 0 < hit.sum() < len(df)
+    assert index.search(positions, "no such text").size == 0
+    assert index.search(positions, "  ") is positions
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+def test_sort_orders_by_a_column_with_empty_values_last(tables, index, ascending):
+    positions = index.positions(_days([3]))
+    df = tables['sales'].iloc[positions]
+    df = df.assign(Client=df['Client'].where(np.arange(len(df)) % 7 != 0))
+    sorting = records.RecordIndex(tables['sales'].assign(Client=df['Client'].reindex(tables['sales'].index)))
+    expected = df.sort_values('Client', ascending=ascending, kind='stable', na_position='last')
+    assert list(tables['sales'].index[sorting.sort(positions, 'Client', ascending)]) == list(expected.index)
+    assert index.sort(positions, None) is positions
+
+
+def test_pages(tables, index):
+    positions = index.positions(_days([3]))
+    rows = 40
+    pages = records.page_count(positions, rows)
+    assert pages == -(-len(positions) // rows) and records.page_count(positions[:0], rows) == 1
+    assert pd.concat([index.page(positions, n, rows) for n in range(1, pages + 1)]).index.equals(tables['sales'].index[positions])
+    assert index.page(positions, 0, rows).index.equals(index.page(positions, 1, rows).index)
+    assert index.page(positions, pages + 1, rows).empty
+
+
+def test_bucket_days():
+    days = _days([3])
+    weekly = records.bucket_days(days, "Weekly")
+    assert [pd.Timestamp(np.datetime64(start, 'D')).dayofweek for start in weekly] == [0] * len(weekly)
+    assert np.concatenate(list(weekly.values())).tolist() == sorted(days.tolist())
+    monthly = records.bucket_days(_days([2, 3]), "Monthly")
+    assert [pd.Timestamp(np.datetime64(start, 'D')).day for start in monthly] == [1, 1]
+    assert list(records.bucket_days(days, "Daily")) == days.tolist()
@@ -0,0 +1,80 @@
+"""
+Batch HTML snapshots (`dialer_core.report`) on a synthetic dataset: the one-pass
+period KPIs match the live pages, pages without attendance render a note, and the
+snapshot files are written.
+
+    python -m pytest benchmarks/test_report.py
+"""
+import argparse
+
+import pytest
+
+from benchmarks.synthetic import generate_dataset
+from dialer_core import aggregates, engine, kpis, report
+
+YEAR = 2025
+
+
+class SyntheticEngine:
+    """The KpiEngine methods period_snapshots uses, on in-memory frames."""
+
+    def __init__(self, frames, prepared=True):
+        self.frames = frames
+        self.prepared = aggregates.prepare_tables(*frames) if prepared else None
+
+    def dialers(self, year, months):
+        return kpis.get_attended_dialers(self.frames[0], year, list(months))
+
+    def tables(self):
+        return self.prepared
+
+    def page_kpis(self, page, year, months, dialer, week_str="All Weeks", day_str="All Days"):
+        return engine.live_kpis(page, self.frames, year, list(months), dialer, week_str, day_str)
+
+
+@pytest.fixture(scope="module")
+def frames():
+    return generate_dataset(n_rows=3000, n_dialers=3, year=YEAR, seed=8)
+
+
+@pytest.mark.parametrize("prepared", [True, False])
+@pytest.mark.parametrize("months", [[3], [10, 11]])
+def test_period_snapshots_match_live_pages(frames, prepared, months):
+    source = SyntheticEngine(frames, prepared)
+    snapshots = report.period_snapshots(source, YEAR, months)
+    assert [dialer for dialer, _ in snapshots] == list(source.dialers(YEAR, months))
+    for dialer, pages in snapshots:
+        for page in aggregates.PAGES:
+            live = source.page_kpis(page, YEAR, months, dialer)
+            assert engine.kpi_values(page, pages[page]) == engine.kpi_values(page, live), (dialer, page)
+
+
+def test_period_snapshots_keep_only_the_wanted_dialers(frames):
+    snapshots = report.period_snapshots(SyntheticEngine(frames), YEAR, [3], dialers=[" sa1"])
+    assert [dialer for dialer, _ in snapshots] == ["All Dialers", "SA1"]
+
+
+def test_page_without_attendance_renders_a_note(frames, tmp_path, monkeypatch):
+    source = SyntheticEngine(frames, prepared=False)
+
+    def page_kpis(page, *args):
+        if page == 'others':
+            raise ZeroDivisionError
+        return SyntheticEngine.page_kpis(source, page, *args)
+
+    monkeypatch.setattr(source, 'page_kpis', page_kpis)
+    (dialer, pages), = report.period_snapshots(source, YEAR, [3], dialers=[])
+    assert pages['others'] is None and pages['sales'] is not None
+
+    filename = report.snapshot_filename(YEAR, [3], dialer)
+    job = (str(tmp_path), filename, YEAR, [3], dialer, pages, '<script src="plotly.min.js"></script>', "2025-04-01 09:00")
+    assert report.render_snapshot(job)[0] == filename == "2025_03_all-dialers.html"
+    document = (tmp_path / filename).read_text(encoding='utf-8')
+    assert "No attendance recorded for this selection." in document
+    assert "Total Sales Count" in document and "Oplans Performance" in document
+
+
+def test_period_arguments():
+    assert report._period("10,nov") == [10, 11]
+    with pytest.raises(argparse.ArgumentTypeError):
+        report._period("13")
@@ -0,0 +1,56 @@
+"""
+The shared KPI pass of a filter state (`parallel.selection_kpis`) against the live
+page functions (`engine.live_kpis`) on a synthetic dataset, over months, weeks, days
+and dialers.
+
+    python -m pytest benchmarks/test_selection_kpis.py
+"""
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import dialer_names, generate_dataset
+from dialer_core import aggregates, engine, parallel
+from dialer_core.periods import get_days_in_period, get_weeks_in_month
+
+YEAR = 2025
+DIALERS = ["All Dialers"] + dialer_names(3)[:2]
+
+
+@pytest.fixture(scope="module")
+def frames():
+    return generate_dataset(n_rows=4000, n_dialers=3, year=YEAR, seed=3)
+
+
+@pytest.fixture(scope="module")
+def tables(frames):
+    return aggregates.prepare_tables(*frames)
+
+
+def _selections():
+    """(months, week, day) filter states: single and multi-month, weeks and days of March."""
+    selections = [([3], "All Weeks", "All Days"), ([1, 2, 3], "All Weeks", "All Days"), ([11, 12], "All Weeks", "All Days")]
+    for week in get_weeks_in_month(YEAR, "March")[1:3]:
+        selections.append(([3], week, "All Days"))
+    week = get_weeks_in_month(YEAR, "March")[2]
+    for day in get_days_in_period(YEAR, "March", week)[1:3]:
+        selections.append(([3], week, day))
+    return selections
+
+
+def _trend(df):
+    return df.sort_values(['Date', df.columns[1]]).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("months, week, day", _selections())
+@pytest.mark.parametrize("dialer", DIALERS)
+def test_selection_kpis_match_live_pages(frames, tables, months, week, day, dialer):
+    shared = parallel.selection_kpis(tables, YEAR, months, dialer, week, day)
+    for page in aggregates.PAGES:
+        if shared[page] is None:
+            # Left to the live page, which cannot compute it either
+            with pytest.raises(ZeroDivisionError):
+                engine.live_kpis(page, frames, YEAR, months, dialer, week, day)
+            continue
+        live = engine.live_kpis(page, frames, YEAR, months, dialer, week, day)
+        assert engine.kpi_values(page, shared[page]) == engine.kpi_values(page, live), page
+        pd.testing.assert_frame_equal(_trend(shared[page][0]), _trend(live[0]), check_dtype=False)
@@ -0,0 +1,113 @@
+"""
+The KPI JSON service (`dialer_core.service`) on a synthetic dataset: valid selections,
+400s for unknown weeks, days and dialers, 404s for unknown paths, 304s only for valid
+requests, and one process per port.
+
+    python -m pytest benchmarks/test_service.py
+"""
+import json
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.synthetic import generate_dataset
+from dialer_core import engine, kpis, service
+from dialer_core.periods import get_days_in_period, get_weeks_in_month
+
+YEAR = 2025
+
+
+class SyntheticSource:
+    """A service source computing with the live page functions on in-memory frames."""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def version(self):
+        return 'v1'
+
+    def dialers(self, year, months):
+        return kpis.get_attended_dialers(self.frames[0], year, list(months))
+
+    def page_kpis(self, page, year, months, dialer, week_str="All Weeks", day_str="All Days"):
+        return engine.live_kpis(page, self.frames, year, list(months), dialer, week_str, day_str)
+
+
+@pytest.fixture(scope="module")
+def source():
+    return SyntheticSource(generate_dataset(n_rows=2000, n_dialers=3, year=YEAR, seed=4))
+
+
+@pytest.fixture
+def api(source):
+    return service.KpiService(source, threads=1)
+
+
+def _get(api, path, if_none_match=None, **query):
+    status, body, etag = api.respond(path, {k: [v] for k, v in query.items()}, if_none_match)
+    return status, json.loads(body) if body else None, etag
+
+
+def test_kpis_of_a_valid_selection(api, source):
+    week = get_weeks_in_month(YEAR, "March")[2]
+    day = get_days_in_period(YEAR, "March", week)[1]
+    status, payload, etag = _get(api, '/kpis/sales', year=str(YEAR), months="mar", week=week, day=day, dialer="SA1")
+    assert (status, etag) == (200, '"v1"')
+    assert (payload['months'], payload['week'], payload['day']) == ([3], week, day)
+    expected = engine.kpi_values('sales', source.page_kpis('sales', YEAR, [3], "SA1", week, day))
+    assert payload['sales']['kpis'] == json.loads(json.dumps(expected, default=service._json_default))
+
+
+@pytest.mark.parametrize("query", [
+    {'months': "3", 'week': "garbage"},
+    {'months': "3", 'day': "2025-04-01"},
+    {'months': "3", 'dialer': "ZZZ"},
+    {'months': "13"},
+    {'year': "x"},
+    {'year': "0"},
+])
+def test_bad_selections_get_400(api, query):
+    status, payload, etag = _get(api, '/kpis/others', **query)
+    assert status == 400 and etag is None
+    assert payload['error']
+
+
+def test_several_months_ignore_week_and_day(api):
+    status, payload, _ = _get(api, '/kpis/oplans', months="1,2", week="garbage", day="garbage")
+    assert status == 200
+    assert (payload['week'], payload['day']) == ("All Weeks", "All Days")
+
+
+@pytest.mark.parametrize("path", ['/nothing', '/kpis/unknown', '/kpis/sales/extra'])
+def test_unknown_paths_get_404(api, path):
+    assert _get(api, path, months="3")[0] == 404
+
+
+def test_matching_etag_gets_304_only_for_valid_requests(api):
+    assert _get(api, '/kpis/sales', if_none_match='"v1"', months="3")[0] == 304
+    assert _get(api, '/kpis/sales', if_none_match='"v0"', months="3")[0] == 200
+    assert _get(api, '/nothing', if_none_match='"v1"')[0] == 404
+    assert _get(api, '/kpis/sales', if_none_match='"v1"', months="3", week="garbage")[0] == 400
+
+
+def test_page_without_attendance_is_reported(api, source, monkeypatch):
+    def page_kpis(page, *args):
+        if page == 'others':
+            raise ZeroDivisionError
+        return SyntheticSource.page_kpis(source, page, *args)
+
+    monkeypatch.setattr(source, 'page_kpis', page_kpis)
+    status, payload, _ = _get(api, '/kpis', months="3")
+    assert status == 200
+    assert payload['others'] == {'kpis': None, 'trend': [], 'error': "No attendance for this selection"}
+    assert payload['sales']['kpis'] is not None
+
+
+def test_one_process_claims_a_port(tmp_path):
+    assert service.claim_port('127.0.0.1', 65001, str(tmp_path))
+    assert not service.claim_port('127.0.0.1', 65001, str(tmp_path))
+    claim = F"from dialer_core import service; print(service.claim_port('127.0.0.1', {{}}, {str(tmp_path)!r}))"
+    other = [subprocess.run([sys.executable, '-c', claim.format(port)], capture_output=True, text=True, check=True).stdout.strip()
+             for port in (65001, 65002)]
+    assert other == ['False', 'True']
@@ -0,0 +1,45 @@
+"""
+Headless compute core for the Dialers Performance dashboard.
+
+Loading, column standardization, the period/dialer filter chain and the KPI
+calculations for the Sales, Oplans and Others pages, with no Streamlit import, so
+batch jobs, benchmarks and worker processes can reuse them:
+
+    from dialer_core import load_raw_data, process_and_calculate_data
+    df_attendance, df_sales, df_oplans, df_others, df_sheet2 = load_raw_data("./")
+
+Only pandas/numpy are imported here; plotting stays in the dashboard.
+"""
+from dialer_core.config import (
+    DATE_COLUMN_SALES,
+    DATE_COLUMN_SALES_VARIATIONS,
+    DIALER_COLUMN,
+    DIALER_COLUMN_VARIATIONS,
+    MONTH_NAMES,
+    YEARS,
+)
+from dialer_core.kpis import (
+    calculate_oplans_data,
+    calculate_others_data,
+    get_attended_dialers,
+    process_and_calculate_data,
+)
+from dialer_core.loading import DataLoadError, load_raw_data
+from dialer_core.periods import get_days_in_period, get_weeks_in_month
+
+__all__ = [
+    'DATE_COLUMN_SALES',
+    'DATE_COLUMN_SALES_VARIATIONS',
+    'DIALER_COLUMN',
+    'DIALER_COLUMN_VARIATIONS',
+    'MONTH_NAMES',
+    'YEARS',
+    'DataLoadError',
+    'calculate_oplans_data',
+    'calculate_others_data',
+    'get_attended_dialers',
+    'get_days_in_period',
+    'get_weeks_in_month',
+    'load_raw_data',
+    'process_and_calculate_data',
+]
@@ -0,0 +1,391 @@
+"""
+Per-day, per-dialer aggregate tables.
+
+Every KPI on the three pages is a row count, a sum or a distinct-day count over the
+rows that survive the month/week/day/dialer filters. Reducing each source table to
+(Date, dialer) totals once therefore answers any period and dialer selection
+without touching the raw rows again. The tables are built per month partition.
+The exception is the Others page's distinct lead count, which is not a sum: the lead
+keys stay per row and each selection counts its unique keys.
+"""
+import calendar
+
+import numpy as np
+import pandas as pd
+
+from dialer_core.config import DATE_COLUMN_SALES, DIALER_COLUMN
+from dialer_core.filters import _standardize_df
+from dialer_core.kpis import TRANSFER_STATUSES, _exclude_sales_rows, _find_att_col, _find_status_col
+
+# Rows without a dialer count toward "All Dialers" but never toward a single dialer.
+# Dialer names are upper-cased by _standardize_df, so a lower-case label cannot collide.
+NO_DIALER = '<no dialer>'
+
+
+def _parse_dates(df, date_col):
+    """Same parsing as _filter_by_date_local, done once for the whole table."""
+    if date_col not in df.columns:
+        return pd.DataFrame(columns=[date_col, DIALER_COLUMN])
+    df = df.copy()
+    df[date_col] = pd.to_datetime(df[date_col], errors='coerce', dayfirst=True)
+    return df.dropna(subset=[date_col])
+
+
+def prepare_tables(df_attendance, df_sales, df_oplans, df_others, df_sheet2):
+    """
+    Standardizes and date-parses the five raw tables with the page rules, applies
+    the Sales exclusions and returns them as a dict keyed 'attendance', 'sales',
+    'oplans', 'others', 'sheet2', plus 'leads': the lead keys of the oplans and
+    others rows (leads.lead_rows). Raises ValueError for shapes the aggregates
+    cannot represent (a lead table without a dialer column, a sheet2 with one).
+    """
+    # dialer_core.leads imports this module
+    from dialer_core import leads
+
+    tables = {
+        'attendance': _parse_dates(_standardize_df(df_attendance, 'date', DIALER_COLUMN), 'date'),
+        'sales': _parse_dates(_standardize_df(df_sales, DATE_COLUMN_SALES, DIALER_COLUMN), DATE_COLUMN_SALES),
+        'oplans': _parse_dates(_standardize_df(df_oplans, DATE_COLUMN_SALES, DIALER_COLUMN), DATE_COLUMN_SALES),
+        'others': _parse_dates(_standardize_df(df_others, DATE_COLUMN_SALES, DIALER_COLUMN), DATE_COLUMN_SALES),
+        'sheet2': _parse_dates(_standardize_df(df_sheet2, DATE_COLUMN_SALES, DIALER_COLUMN), DATE_COLUMN_SALES),
+    }
+    for name in ('attendance', 'sales', 'oplans', 'others'):
+        if DIALER_COLUMN not in tables[name].columns:
+            raise ValueError(F"'{name}' has no dialer column; per-dialer aggregates need one")
+    if DIALER_COLUMN in tables['sheet2'].columns:
+        raise ValueError("'sheet2' has a dialer column; aggregates expect it per day only")
+
+    tables['sales'] = _exclude_sales_rows(tables['sales'])
+    tables['leads'] = leads.lead_rows(tables['oplans'], tables['others'])
+    return tables
+
+
+def month_partition(tables, year, month):
+    """Rows of every prepared table that fall in `year`/`month`."""
+    out = {}
+    for name, df in tables.items():
+        date_col = 'date' if name == 'attendance' else DATE_COLUMN_SALES
+        dates = df[date_col]
+        out[name] = df[(dates.dt.year == year) & (dates.dt.month == month)]
+    return out
+
+
+def sorted_codes(values, fill=None):
+    """
+    (int64 codes, names in sorted order) of a text column; missing values get code -1,
+    or the code of `fill` when given. A dictionary-encoded (categorical) column, as
+    the shared Arrow dataset maps it, is recoded from its integer codes without
+    materializing the names per row.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy().astype(np.int64)
+        names = list(values.cat.categories)
+        if fill is not None and (codes < 0).any():
+            if fill not in names:
+                names.append(fill)
+            codes = np.where(codes < 0, names.index(fill), codes)
+        order = np.argsort(np.array(names, dtype=object), kind='stable')
+        rank = np.empty(len(names) + 1, dtype=np.int64)
+        rank[order] = np.arange(len(names))
+        rank[-1] = -1  # code -1 indexes the last slot
+        return rank[codes], [names[i] for i in order]
+    if fill is not None:
+        values = values.fillna(fill)
+    codes, names = pd.factorize(values, sort=True)
+    return codes.astype(np.int64), list(names)
+
+
+def dialer_codes(df):
+    """(codes, sorted names) of a prepared table's dialer column, NO_DIALER for rows without one."""
+    return sorted_codes(df[DIALER_COLUMN], NO_DIALER)
+
+
+def _ones(df):
+    return pd.Series(1, index=df.index)
+
+
+def _daily(df, date_col, values):
+    """Groups by (Date, dialer) and aggregates `values` ({out_col: (series, how)})."""
+    keys = [df[date_col].dt.normalize().rename('Date')]
+    if DIALER_COLUMN in df.columns:
+        # Group on the sorted dialer codes, so the output is ordered as grouping on the names
+        codes, names = dialer_codes(df)
+        keys.append(pd.Series(codes, index=df.index, name=DIALER_COLUMN))
+    frame = pd.DataFrame({col: series for col, (series, _) in values.items()}, index=df.index)
+    out = frame.groupby(keys).agg({col: how for col, (_, how) in values.items()}).reset_index()
+    if DIALER_COLUMN not in out.columns:
+        out[DIALER_COLUMN] = NO_DIALER
+    else:
+        out[DIALER_COLUMN] = np.asarray(names, dtype=object)[out[DIALER_COLUMN].to_numpy(dtype=np.int64)]
+    return out
+
+
+def daily_aggregates(part):
+    """
+    Reduces one partition to (Date, dialer) tables:
+    sales/others: count; oplans: count, transfers;
+    attendance: rows, att_sum, att_count (non-null); sheet2: att_sum per Date;
+    leads: the partition's lead rows (Date, dialer, source, key, has_key), kept
+    per row because distinct leads do not add up over days.
+    """
+    sales, oplans, others = part['sales'], part['oplans'], part['others']
+    status_col = _find_status_col(oplans)
+    if status_col is not None:
+        transfers = oplans[status_col].astype(str).str.strip().str.upper().isin(TRANSFER_STATUSES).astype(np.int64)
+    else:
+        transfers = pd.Series(0, index=oplans.index)
+
+    attendance = part['attendance']
+    if 'attendance' in attendance.columns:
+        att = pd.to_numeric(attendance['attendance'], errors='coerce')
+    else:
+        att = pd.Series(np.nan, index=attendance.index)
+
+    lead_rows = part['leads']
+    lead_codes, lead_dialers = dialer_codes(lead_rows)
+
+    sheet2 = part['sheet2']
+    att_col = _find_att_col(sheet2)
+    sheet2_att = pd.to_numeric(sheet2[att_col], errors='coerce') if att_col is not None else pd.Series(np.nan, index=sheet2.index)
+
+    return {
+        'sales': _daily(sales, DATE_COLUMN_SALES, {'count': (_ones(sales), 'sum')}),
+        'oplans': _daily(oplans, DATE_COLUMN_SALES, {'count': (_ones(oplans), 'sum'), 'transfers': (transfers, 'sum')}),
+        'others': _daily(others, DATE_COLUMN_SALES, {'count': (_ones(others), 'sum')}),
+        'attendance': _daily(attendance, 'date', {
+            'rows': (_ones(attendance), 'sum'),
+            'att_sum': (att, 'sum'),
+            'att_count': (att, 'count'),
+        }),
+        'sheet2': _daily(sheet2, DATE_COLUMN_SALES, {'att_sum': (sheet2_att, 'sum')}),
+        'leads': pd.DataFrame({
+            'Date': lead_rows[DATE_COLUMN_SALES].dt.normalize().to_numpy(),
+            DIALER_COLUMN: np.asarray(lead_dialers, dtype=object)[lead_codes],
+            'source': lead_rows['source'].to_numpy(),
+            'key': lead_rows['key'].to_numpy(),
+            'has_key': lead_rows['has_key'].to_numpy(),
+        }),
+        'has_status': status_col is not None,
+        'has_attendance': 'attendance' in attendance.columns,
+    }
+
+
+def wide(daily, column, dates, dialers):
+    """
+    Pivots one measure of a daily table to a (len(dates), len(dialers)) float matrix;
+    missing (Date, dialer) pairs are 0.
+    """
+    out = np.zeros((len(dates), len(dialers)))
+    if daily.empty:
+        return out
+    rows = pd.DatetimeIndex(dates).get_indexer(daily['Date'])
+    cols = pd.Index(dialers).get_indexer(daily[DIALER_COLUMN])
+    keep = (rows >= 0) & (cols >= 0)
+    np.add.at(out, (rows[keep], cols[keep]), daily[column].to_numpy(dtype=float)[keep])
+    return out
+
+# --- KPIs FROM DAILY AGGREGATES ---
+
+PAGES = ('sales', 'oplans', 'others')
+KPI_COLUMNS = {
+    'sales': ['sales_percentage', 'avg_sales_per_day', 'avg_att_per_dialer', 'avg_att_per_day', 'total_sales_count'],
+    'oplans': ['avg_oplans_per_day', 'transfer_ratio_pct', 'total_oplans_count', 'avg_att_per_day'],
+    'others': ['others_percentage', 'avg_others_per_day', 'avg_checks_per_agent_display', 'avg_att_per_day', 'total_leads'],
+}
+# page -> (daily table, count column name used by the page's trend frame)
+TREND_SOURCES = {'sales': ('sales', 'Sales_Count'), 'oplans': ('oplans', 'Oplan_Count'), 'others': ('others', 'Others_Count')}
+
+
+def period_mask(dates, week_str, day_str):
+    """Boolean mask over a DatetimeIndex of normalized dates, same rules as the week/day filters."""
+    mask = np.ones(len(dates), dtype=bool)
+    if week_str != "All Weeks":
+        start_date = pd.to_datetime(week_str.split('(')[1].split(' to ')[0])
+        end_date = pd.to_datetime(week_str.split(' to ')[1].replace(')', ''))
+        mask &= np.asarray((dates >= start_date) & (dates <= end_date) & (dates.weekday <= 4))
+    if day_str != "All Days":
+        mask &= np.asarray(dates == pd.to_datetime(day_str))
+    return mask
+
+
+def selection_days(year, months, week_str="All Weeks", day_str="All Days"):
+    """Day numbers (days since 1970-01-01) of the days the month/week/day filters keep."""
+    dates = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(F"{int(year)}-{int(m):02d}-01", periods=calendar.monthrange(int(year), int(m))[1], freq='D')
+        for m in sorted(set(months))
+    ]))
+    kept = dates[period_mask(dates, week_str, day_str)]
+    return kept.to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+def merge_daily(parts):
+    """Merges daily_aggregates of disjoint partitions (e.g. months) into one."""
+    parts = list(parts)
+    merged = {name: pd.concat([p[name] for p in parts], ignore_index=True) for name in ('sales', 'oplans', 'others', 'attendance', 'sheet2', 'leads')}
+    merged['has_status'] = any(p['has_status'] for p in parts)
+    merged['has_attendance'] = any(p['has_attendance'] for p in parts)
+    return merged
+
+
+def _rint(num, den, scale=1.0):
+    """round(num / den * scale) where den > 0, else 0 (elementwise, as ints)."""
+    safe = np.where(den > 0, den, 1)
+    return np.where(den > 0, np.rint(num / safe * scale), 0).astype(np.int64)
+
+
+def distinct_leads(leads, dates, P, names):
+    """
+    (total, others): the distinct leads of both lead tables, and of the Others rows
+    alone, for every selection, as (choices x ["All Dialers"] + names) matrices.
+    Each selection counts the unique keys of its rows (P's days, the dialer's rows);
+    a row without a key is one lead.
+    """
+    total = np.zeros((P.shape[0], 1 + len(names)), dtype=np.int64)
+    others = np.zeros_like(total)
+    if leads.empty:
+        return total, others
+    has_key = leads['has_key'].to_numpy()
+    codes = np.empty(len(leads), dtype=np.int64)
+    codes[has_key] = pd.factorize(leads['key'].to_numpy()[has_key])[0]
+    # Keyless rows get codes of their own after the keys
+    codes[~has_key] = has_key.sum() + np.arange((~has_key).sum())
+    position = dates.get_indexer(pd.DatetimeIndex(leads['Date']))
+    is_other = leads['source'].to_numpy() == 1
+    dialers = leads[DIALER_COLUMN].to_numpy()
+    in_period = P > 0
+
+    for j, name in enumerate([None] + list(names)):
+        rows = slice(None) if name is None else np.flatnonzero(dialers == name)
+        row_codes, row_position, row_other = codes[rows], position[rows], is_other[rows]
+        for c in range(P.shape[0]):
+            selected = in_period[c, row_position]
+            total[c, j] = len(np.unique(row_codes[selected]))
+            others[c, j] = len(np.unique(row_codes[selected & row_other]))
+    return total, others
+
+
+def combination_kpis(daily, choices, dialer_options):
+    """
+    KPI values of every page for every (week, day) in `choices` crossed with every
+    entry of `dialer_options` ("All Dialers" first). Returns {page: DataFrame} with
+    week, day, dialer and the page's KPI_COLUMNS.
+
+    Each measure is pivoted to a (dates x dialers) matrix once; a 0/1
+    (choices x dates) period matrix then gives every total and distinct-day count in
+    a single product. The Others page's distinct leads are counted per selection
+    (distinct_leads). Others combinations where the live page would divide by zero
+    attendance are left out so the caller falls back to it.
+    """
+    tables = ('sales', 'oplans', 'others', 'attendance', 'sheet2')
+    dates = pd.DatetimeIndex(sorted(set().union(*(daily[t]['Date'] for t in tables))))
+    P = np.array([period_mask(dates, w, d) for w, d in choices], dtype=float).reshape(len(choices), len(dates))
+
+    names = list(dialer_options[1:])
+    columns = sorted(set(names).union(*(daily[t][DIALER_COLUMN] for t in tables[:4])))
+    position = {c: i for i, c in enumerate(columns)}
+    selected = [position[n] for n in names]
+    real = [i for i, c in enumerate(columns) if c != NO_DIALER]
+
+    def per_selection(table, column):
+        # (dates x selections): column 0 is "All Dialers", then one column per dialer
+        V = wide(daily[table], column, dates, columns)
+        return np.column_stack([V.sum(axis=1), V[:, selected]]), V
+
+    def days(M):
+        return P @ (M > 0)
+
+    sales, _ = per_selection('sales', 'count')
+    oplans, _ = per_selection('oplans', 'count')
+    transfers, _ = per_selection('oplans', 'transfers')
+    others, _ = per_selection('others', 'count')
+    att_rows, att_rows_all = per_selection('attendance', 'rows')
+    att_sum, _ = per_selection('attendance', 'att_sum')
+    att_count, _ = per_selection('attendance', 'att_count')
+    sheet2 = P @ wide(daily['sheet2'], 'att_sum', dates, [NO_DIALER])
+
+    S, O, T, OT = P @ sales, P @ oplans, P @ transfers, P @ others
+    combined, OT_distinct = distinct_leads(daily['leads'], dates, P, names)
+    A_sum, A_count, A_days = P @ att_sum, P @ att_count, days(att_rows)
+    present = A_days > 0
+    present[:, 0] = (days(att_rows_all[:, real]) > 0).any(axis=1) if real else False
+
+    avg_att_per_day = _rint(A_sum, A_days)
+    if daily['has_attendance']:
+        avg_att_per_dialer = np.where(present & (A_count > 0), _rint(A_sum, A_count), 0)
+    else:
+        avg_att_per_dialer = np.zeros_like(avg_att_per_day)
+    transfer_ratio = _rint(T, O, 100) if daily['has_status'] else np.zeros_like(avg_att_per_day)
+
+    # Total Leads counts each lead of the selection once, as the live page does
+    others_pct = np.zeros(OT.shape)
+    # Python round() on one decimal, exactly as the page does it
+    for idx in zip(*np.nonzero(combined > 0)):
+        others_pct[idx] = round((OT_distinct[idx] / combined[idx]) * 100, 1)
+    checks_ok = ~((sheet2 > 0) & (A_sum == 0))
+    checks = np.where(sheet2 > 0, combined / np.where(A_sum == 0, 1, A_sum), 0)
+    checks_display = np.array([f"{x:.2f}" for x in checks.reshape(-1)], dtype=object)
+
+    n_sel = 1 + len(names)
+    keys = pd.DataFrame({
+        'week': np.repeat([w for w, _ in choices], n_sel),
+        'day': np.repeat([d for _, d in choices], n_sel),
+        'dialer': np.tile(np.array(["All Dialers"] + names, dtype=object), len(choices)),
+    })
+
+    def frame(values):
+        out = keys.copy()
+        for col, arr in values.items():
+            out[col] = np.asarray(arr).reshape(-1)
+        return out
+
+    return {
+        'sales': frame({
+            'sales_percentage': _rint(S, O, 100),
+            'avg_sales_per_day': _rint(S, days(sales)),
+            'avg_att_per_dialer': avg_att_per_dialer,
+            'avg_att_per_day': avg_att_per_day,
+            'total_sales_count': S.astype(np.int64),
+        }),
+        'oplans': frame({
+            'avg_oplans_per_day': _rint(O, days(oplans)),
+            'transfer_ratio_pct': transfer_ratio,
+            'total_oplans_count': O.astype(np.int64),
+            'avg_att_per_day': avg_att_per_day,
+        }),
+        'others': frame({
+            'others_percentage': others_pct,
+            'avg_others_per_day': _rint(OT, days(others)),
+            'avg_checks_per_agent_display': checks_display,
+            'avg_att_per_day': avg_att_per_day,
+            'total_leads': combined.astype(np.int64),
+        })[checks_ok.reshape(-1)].reset_index(drop=True),
+    }
+
+
+def trend_points(daily, page):
+    """(Date, dialer, count) rows of the page's trend chart, dialer-less rows excluded."""
+    table, count_col = TREND_SOURCES[page]
+    trend = daily[table]
+    trend = trend[(trend[DIALER_COLUMN] != NO_DIALER) & (trend['count'] > 0)]
+    trend = trend[['Date', DIALER_COLUMN, 'count']].rename(columns={'count': count_col})
+    return trend.astype({count_col: np.int64}).sort_values(['Date', DIALER_COLUMN]).reset_index(drop=True)
+
+
+def slice_trend(trend, page, dialer, week_str, day_str):
+    """The part of a trend_points frame one (dialer, week, day) selection shows."""
+    if trend is None:
+        return pd.DataFrame(columns=['Date', DIALER_COLUMN, TREND_SOURCES[page][1]])
+    mask = period_mask(pd.DatetimeIndex(trend['Date']), week_str, day_str)
+    if dialer != "All Dialers":
+        mask &= (trend[DIALER_COLUMN] == dialer.strip().upper()).to_numpy()
+    return trend[mask].reset_index(drop=True)
+
+
+def kpi_tuple(page, values, trend):
+    """Builds the tuple the live KPI function of `page` returns from one KPI_COLUMNS row."""
+    if page == 'others':
+        others_percentage, avg_others_per_day, checks_display, avg_att_per_day, total_leads = values
+        # The live function returns an int 0 (shown as "0%") when there are no leads
+        others_percentage = others_percentage if total_leads > 0 else 0
+        return trend, others_percentage, avg_others_per_day, checks_display, avg_att_per_day
+    return (trend, *values)
@@ -0,0 +1,156 @@
+"""
+Anomaly flags on the daily per-dialer series: sales, oplans, transfer ratio, other leads and attendance.
+
+Each series is scored against the `DIALERS_ANOMALY_WINDOW` working days before it
+with a robust z-score, 0.6745 * (value - rolling median) / rolling MAD, and flagged
+at |z| >= `DIALERS_ANOMALY_Z`. The five metrics of every dialer are stacked into
+one (days x metrics * dialers) matrix, so a single sliding-window median pass
+scores all of them. Working days are the dates present in any table. A dialer's
+series only runs from its first to its last active day, so dialers that join or
+leave are not flagged for it.
+
+`AnomalyDetector` keeps the last matrix and its scores. When new rows arrive, the
+rows that did not change (same dates, dialers and values) keep their scores, and
+only the new days, plus any day whose values changed, are scored again.
+"""
+import os
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from dialer_core import aggregates
+from dialer_core.aggregates import NO_DIALER
+from dialer_core.config import DIALER_COLUMN
+
+ANOMALY_WINDOW = int(os.environ.get("DIALERS_ANOMALY_WINDOW", "20"))
+ANOMALY_Z = float(os.environ.get("DIALERS_ANOMALY_Z", "3.5"))
+MIN_PERIODS = 10
+# MAD floor (one count / one percentage point), so flat histories do not flag every small change
+MIN_MAD = 1.0
+
+# metric -> label; 'transfer_ratio' is in percent like the Oplans page's Transfer Ratio
+METRICS = {'sales': "Sales", 'oplans': "Oplans", 'transfer_ratio': "Transfer Ratio", 'others': "Others", 'attendance': "Attendance"}
+
+
+def series_matrix(daily):
+    """
+    (dates, dialers, values) from daily_aggregates output: values is a
+    (days x len(METRICS) * dialers) float matrix, metric-major, NaN outside each
+    dialer's active days (and for the transfer ratio on days without oplans).
+    """
+    tables = ('sales', 'oplans', 'others', 'attendance')
+    dates = pd.DatetimeIndex(sorted(set().union(*(daily[t]['Date'] for t in tables))))
+    dialers = sorted(set().union(*(daily[t][DIALER_COLUMN] for t in tables)) - {NO_DIALER})
+
+    sales = aggregates.wide(daily['sales'], 'count', dates, dialers)
+    oplans = aggregates.wide(daily['oplans'], 'count', dates, dialers)
+    transfers = aggregates.wide(daily['oplans'], 'transfers', dates, dialers)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(oplans > 0, transfers / oplans * 100, np.nan)
+    others = aggregates.wide(daily['others'], 'count', dates, dialers)
+    attended = aggregates.wide(daily['attendance'], 'rows', dates, dialers) > 0
+    attendance = np.where(attended, aggregates.wide(daily['attendance'], 'att_sum', dates, dialers), np.nan)
+
+    active = attended | (sales > 0) | (oplans > 0) | (others > 0)
+    position = np.arange(len(dates))[:, None]
+    first = np.where(active.any(axis=0), active.argmax(axis=0), len(dates))
+    last = len(dates) - 1 - active[::-1].argmax(axis=0)
+    inside = (position >= first) & (position <= last)
+
+    values = np.concatenate([np.where(inside, m, np.nan) for m in (sales, oplans, ratio, others, attendance)], axis=1)
+    return dates, dialers, values
+
+
+def rolling_scores(values, window=ANOMALY_WINDOW, min_periods=MIN_PERIODS, start=0):
+    """
+    (median, z) for rows `start`: of `values` (days x series), each row scored
+    against the `window` rows before it; NaN where fewer than `min_periods` of them
+    are set.
+    """
+    padded = np.vstack([np.full((window, values.shape[1]), np.nan), values])
+    # windows[r] holds rows r - window .. r - 1 of values
+    windows = sliding_window_view(padded, window, axis=0)[start:len(values)]
+    current = values[start:]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN windows
+        median = np.nanmedian(windows, axis=-1)
+        mad = np.nanmedian(np.abs(windows - median[..., None]), axis=-1)
+    enough = (~np.isnan(windows)).sum(axis=-1) >= min_periods
+    z = 0.6745 * (current - median) / np.maximum(np.nan_to_num(mad), MIN_MAD)
+    z[~enough] = np.nan
+    return median, z
+
+
+def _unchanged_rows(old, new):
+    """Length of the leading rows two (dates, dialers, values) states share."""
+    old_dates, old_dialers, old_values = old
+    new_dates, new_dialers, new_values = new
+    if old_dialers != new_dialers:
+        return 0
+    n = min(len(old_dates), len(new_dates))
+    same = np.asarray(old_dates[:n] == new_dates[:n])
+    values_same = ((old_values[:n] == new_values[:n]) | (np.isnan(old_values[:n]) & np.isnan(new_values[:n]))).all(axis=1)
+    changed = np.flatnonzero(~(same & values_same))
+    return int(changed[0]) if len(changed) else n
+
+
+class AnomalyDetector:
+    """Scores of the daily series, kept between data versions and extended incrementally."""
+
+    def __init__(self, window=ANOMALY_WINDOW, threshold=ANOMALY_Z, min_periods=MIN_PERIODS):
+        self.window = window
+        self.threshold = threshold
+        self.min_periods = min_periods
+        self.last_update = None
+        self._state = None
+        self._lock = threading.Lock()
+
+    def update(self, daily):
+        """Scores the series of `daily` (daily_aggregates output), reusing unchanged rows; returns the flags."""
+        dates, dialers, values = series_matrix(daily)
+        with self._lock:
+            start = _unchanged_rows(self._state[:3], (dates, dialers, values)) if self._state is not None else 0
+            median, z = rolling_scores(values, self.window, self.min_periods, start)
+            if start:
+                median = np.vstack([self._state[3][:start], median])
+                z = np.vstack([self._state[4][:start], z])
+            self._state = (dates, dialers, values, median, z)
+            self.last_update = {'days': len(dates), 'days_scored': len(dates) - start,
+                                'last_date': dates[-1] if len(dates) else None}
+        return self.flags(dates, dialers, values, median, z)
+
+    def flags(self, dates, dialers, values, median, z):
+        """Date, dialer, metric, value, usual (rolling median) and z of every flagged point."""
+        with np.errstate(invalid='ignore'):
+            rows, cols = np.nonzero(np.abs(z) >= self.threshold)
+        metrics = list(METRICS)
+        return pd.DataFrame({
+            'Date': dates[rows],
+            DIALER_COLUMN: np.array(dialers, dtype=object)[cols % len(dialers)] if dialers else np.array([], dtype=object),
+            'metric': np.array(metrics, dtype=object)[cols // max(len(dialers), 1)],
+            'value': values[rows, cols].round(1),
+            'usual': median[rows, cols].round(1),
+            'z': z[rows, cols].round(1),
+        }).sort_values(['Date', DIALER_COLUMN, 'metric'], kind='stable').reset_index(drop=True)
+
+
+def describe(flag):
+    """One line for a flag row: "2025-12-30 SA2 Sales 3 (usual 12)"."""
+    unit = "%" if flag['metric'] == 'transfer_ratio' else ""
+    return (F"{flag['Date']:%Y-%m-%d} {flag[DIALER_COLUMN]} {METRICS[flag['metric']]} "
+            F"{flag['value']:g}{unit} (usual {flag['usual']:g}{unit})")
+
+
+def select(flags, metrics, year, months, week_str="All Weeks", day_str="All Days", dialer="All Dialers"):
+    """The flags of `metrics` that fall in a page selection."""
+    if flags is None or flags.empty:
+        return flags
+    dates = pd.DatetimeIndex(flags['Date'])
+    mask = flags['metric'].isin(metrics).to_numpy() & (dates.year == int(year)) & np.isin(dates.month, list(months))
+    mask &= aggregates.period_mask(dates, week_str, day_str)
+    if dialer != "All Dialers":
+        mask &= (flags[DIALER_COLUMN] == dialer.strip().upper()).to_numpy()
+    return flags[mask].reset_index(drop=True)
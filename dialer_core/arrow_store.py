@@ -0,0 +1,218 @@
+"""
+Memory-mapped Arrow IPC copies of the tables, shared by server processes.
+
+The first process to load a data version writes the parsed tables to
+`DIALERS_ARROW_DIR/<data version>-v<format>/<table>.arrow` (uncompressed Arrow IPC files);
+every process after that maps those files instead of parsing the xlsx/csv sources.
+Numeric and datetime columns come back as read-only numpy views of the mapped
+pages, so the OS page cache holds one physical copy of them however many server
+processes run. The live KPI functions work on object columns, so the text columns
+of these five raw tables are still materialized per process.
+
+The prepared tables (`aggregates.prepare_tables`, lead rows included) are the ones
+the aggregation, exports, drill-down and intraday indexes read, and the largest.
+`load_prepared` writes them once per data version and lead key under `prepared-<key>/`,
+with every text column dictionary-encoded: a mapped text column is a pandas
+Categorical, integer codes over one copy of the distinct values. Dialer groupings
+work on those codes (`aggregates.dialer_codes`), so month partitions and indexes are
+built from the mapped arrays without a per-process copy of the names.
+
+A process that writes a new version removes the directories of other versions
+that have not been written to for `DIALERS_ARROW_STALE_SECONDS` (default 600), so a
+sibling still writing an older version is not pulled from under it.
+
+pyarrow is optional: without it `load_shared` simply parses the source files and
+`load_prepared` prepares the tables in-process.
+"""
+import os
+import shutil
+import time
+
+import numpy as np
+
+from dialer_core import loading, perf
+
+try:
+    import pyarrow as pa
+    from pyarrow import ipc
+except ImportError:  # pragma: no cover - optional dependency
+    pa = ipc = None
+
+ARROW_DIR = os.environ.get("DIALERS_ARROW_DIR", "arrow_cache")
+
+# One file per table, in the order load_raw_data returns them
+TABLE_NAMES = ("attendance", "sales", "oplans", "others", "sheet2")
+# The tables of aggregates.prepare_tables
+PREPARED_NAMES = ("attendance", "sales", "oplans", "others", "sheet2", "leads")
+# Part of the folder name; bumped whenever load_raw_data changes its columns (2: duplicate
+# lead flags, 3: flags removed again, 4: prepared tables), so files written by another
+# release are not mapped
+DATASET_FORMAT = 4
+# Other versions' directories untouched for this long are removed
+STALE_SECONDS = float(os.environ.get("DIALERS_ARROW_STALE_SECONDS", "600"))
+
+
+def _dir_name(version):
+    return F"{version}-v{DATASET_FORMAT}"
+
+
+def _version_dir(directory, version):
+    return os.path.join(directory, _dir_name(version))
+
+
+def _prepared_dir(directory, version, key):
+    return os.path.join(_version_dir(directory, version), F"prepared-{key}")
+
+
+def _write_tables(target, tables):
+    """
+    Writes {name: Arrow table} as IPC files in `target`. Files are written under a
+    temporary name and renamed into place, so a process mapping them never sees a
+    partial file.
+    """
+    os.makedirs(target, exist_ok=True)
+    for name, table in tables.items():
+        path = os.path.join(target, F"{name}.arrow")
+        tmp = F"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp, 'wb') as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+
+
+def _encoded(df):
+    """`df` as an Arrow table with every text column dictionary-encoded."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            # One chunk, so the IPC file holds a single dictionary per column
+            table = table.set_column(i, field.name, table.column(i).combine_chunks().dictionary_encode())
+    return table
+
+
+def write_dataset(frames, version, directory=ARROW_DIR):
+    """Writes the five raw tables for `version`. Raises pyarrow's errors for columns Arrow cannot type."""
+    _write_tables(_version_dir(directory, version),
+                  {name: pa.Table.from_pandas(df, preserve_index=False) for name, df in zip(TABLE_NAMES, frames)})
+
+
+def write_prepared(tables, version, key, directory=ARROW_DIR):
+    """Writes prepare_tables output for `version` and lead key `key`, text columns dictionary-encoded."""
+    _write_tables(_prepared_dir(directory, version, key), {name: _encoded(tables[name]) for name in PREPARED_NAMES})
+
+
+def _to_frame(table):
+    """DataFrame over the mapped table; nulls in text columns become NaN as read_csv leaves them."""
+    df = table.to_pandas(split_blocks=True)
+    for column in df.columns:
+        if df[column].dtype == object and df[column].hasnans:
+            values = df[column].to_numpy(copy=True)
+            values[df[column].isna().to_numpy()] = np.nan
+            df[column] = values
+    return df
+
+
+def _open_tables(target, names):
+    """{name: DataFrame} mapped from `target`, or None when a file has not been written."""
+    frames = {}
+    for name in names:
+        try:
+            source = pa.memory_map(os.path.join(target, F"{name}.arrow"), 'r')
+            frames[name] = _to_frame(ipc.open_file(source).read_all())
+        except (OSError, pa.ArrowInvalid):
+            return None
+    return frames
+
+
+def open_dataset(version, directory=ARROW_DIR):
+    """The tables of `version` mapped from disk, or None when they have not been written."""
+    frames = _open_tables(_version_dir(directory, version), TABLE_NAMES)
+    return None if frames is None else tuple(frames[name] for name in TABLE_NAMES)
+
+
+def open_prepared(version, key, directory=ARROW_DIR):
+    """The prepared tables of `version` and lead key `key` mapped from disk, or None when they have not been written."""
+    return _open_tables(_prepared_dir(directory, version, key), PREPARED_NAMES)
+
+
+def _last_write(path):
+    """Latest modification time of `path` and everything under it."""
+    latest = os.path.getmtime(path)
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            try:
+                latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+            except OSError:  # removed meanwhile
+                pass
+    return latest
+
+
+def remove_stale(version, directory=ARROW_DIR, grace=STALE_SECONDS):
+    """
+    Deletes the files of other data versions that nothing wrote to for `grace`
+    seconds, so a process still writing an older version keeps its directory.
+    Mapped files stay readable to the processes holding them open.
+    """
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    cutoff = time.time() - grace
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            stale = name != _dir_name(version) and _last_write(path) < cutoff
+        except OSError:
+            continue
+        if stale:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_shared(base_path="./", directory=ARROW_DIR):
+    """
+    The five tables, like loading.load_raw_data, mapped from the Arrow files of the
+    current data version; parses the sources (and writes the files for the other
+    processes) when they do not exist yet, or everything inline without pyarrow.
+    """
+    if pa is None:
+        return loading.load_raw_data(base_path)
+    version = loading.data_version(base_path)
+    with perf.stage("load.arrow_map"):
+        frames = open_dataset(version, directory)
+    if frames is not None:
+        return frames
+
+    frames = loading.load_raw_data(base_path)
+    try:
+        with perf.stage("load.arrow_write"):
+            write_dataset(frames, version, directory)
+    except (OSError, pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Mixed-type columns Arrow cannot store, or no write access: keep the parsed frames
+        return frames
+    remove_stale(version, directory)
+    # Map the files just written so this process shares the pages too
+    return open_dataset(version, directory) or frames
+
+
+def load_prepared(prepare, version, key, directory=ARROW_DIR):
+    """
+    prepare_tables output for `version`, mapped from the shared files; calls
+    `prepare()` (and writes the files for the other processes) when they do not
+    exist yet, or returns `prepare()` as is without pyarrow. `key` is the lead key
+    the lead rows were built with.
+    """
+    if pa is None:
+        return prepare()
+    with perf.stage("load.arrow_map_prepared"):
+        tables = open_prepared(version, key, directory)
+    if tables is not None:
+        return tables
+
+    tables = prepare()
+    try:
+        with perf.stage("load.arrow_write_prepared"):
+            write_prepared(tables, version, key, directory)
+    except (OSError, pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Mixed-type columns Arrow cannot store, or no write access: keep the in-process tables
+        return tables
+    return open_prepared(version, key, directory) or tables
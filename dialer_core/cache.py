@@ -0,0 +1,215 @@
+"""
+Process-wide, size-bounded LRU caches shared by every dashboard session.
+
+Two instances live in the dashboard process:
+
+- the figure cache: built trend figures keyed by page, filter spec and data version,
+  bounded by entry count (`DIALERS_FIGURE_CACHE_SIZE`);
+- the result cache, which replaces `st.cache_data` for the loaded tables, the
+  attended-dialer lists and the page KPI tuples. It is bounded by a memory budget
+  (`DIALERS_RESULT_CACHE_MB`), evicts least recently used results first and keys
+  results by function, data version and filter arguments, so the large DataFrame
+  arguments are never hashed. Hits return the stored object itself instead of
+  unpickling a copy; the numeric blocks of stored DataFrames are marked read-only
+  so an accidental in-place write raises instead of changing another session's
+  result, and callers treat the rest as read-only too.
+
+All access goes through one lock per cache, since sessions run in separate script
+threads. A value is computed outside the lock, so two sessions missing the same key
+at once both compute it and the second store wins.
+
+`process_resource` holds these caches (and the other per-process resources) instead
+of `st.cache_resource`. That cache is process-wide too, but it belongs to the
+Streamlit runtime. Streamlit warns about calls from threads without a script-run
+context, such as the prewarm thread and the KPI service. Outside a running server
+(batch jobs, benchmarks, tests) `st.cache_resource` recomputes on every call.
+`process_resource` is plain Python and usable from any thread. It also keeps only
+the latest arguments, so an old data version's resources are released.
+"""
+import functools
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+FIGURE_CACHE_SIZE = int(os.environ.get("DIALERS_FIGURE_CACHE_SIZE", "64"))
+RESULT_CACHE_BYTES = int(float(os.environ.get("DIALERS_RESULT_CACHE_MB", "1024")) * 1024 ** 2)
+
+_MISSING = object()
+
+_resources = {}
+_resources_lock = threading.Lock()
+
+
+def deep_sizeof(value):
+    """Approximate memory held by `value`: DataFrames/Series deeply, containers recursively."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(deep_sizeof(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(deep_sizeof(k) + deep_sizeof(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+def make_readonly(value):
+    """
+    Marks numeric/datetime numpy arrays, and those blocks of DataFrames, in `value`
+    (recursively through tuples/lists/dict values) read-only. Object blocks stay writeable: several pandas
+    routines take them as writeable buffers.
+    """
+    if isinstance(value, pd.DataFrame):
+        for arr in value._mgr.arrays:
+            if isinstance(arr, np.ndarray) and arr.dtype != object:
+                arr.flags.writeable = False
+    elif isinstance(value, (tuple, list)):
+        for v in value:
+            make_readonly(v)
+    elif isinstance(value, dict):
+        for v in value.values():
+            make_readonly(v)
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        value.flags.writeable = False
+    return value
+
+
+class LRUCache:
+    """
+    LRU cache bounded by `max_entries` and/or `max_bytes` (measured with `sizeof`).
+    The least recently used entries are evicted first; a value larger than the whole
+    byte budget is returned but not stored.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, sizeof=deep_sizeof):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries = OrderedDict()  # key -> (value, bytes)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries)
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def get_or_create(self, key, factory):
+        """The cached value for `key`, built with `factory()` and stored on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'mb': round(self.bytes / 1024 ** 2, 1),
+                'max_mb': round(self.max_bytes / 1024 ** 2, 1) if self.max_bytes is not None else None,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+def process_resource(fn):
+    """
+    Decorator keeping a function's result for the life of the process, for callers
+    on any thread. Only the latest arguments are held (resources keyed by data version
+    drop the old version's value), keyed by module and qualified name, so it survives
+    the dashboard script redefining the function on every rerun.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args):
+        key = (fn.__module__, fn.__qualname__)
+        with _resources_lock:
+            held_args, value = _resources.get(key, (None, _MISSING))
+        if value is _MISSING or held_args != args:
+            value = fn(*args)
+            with _resources_lock:
+                held_args, held = _resources.get(key, (None, _MISSING))
+                if held is not _MISSING and held_args == args:
+                    value = held
+                else:
+                    _resources[key] = (args, value)
+        return value
+    return wrapper
+
+
+def _key_part(value):
+    """Hashable form of a filter argument (month lists become tuples)."""
+    if isinstance(value, (list, set)):
+        return tuple(sorted(value)) if isinstance(value, set) else tuple(value)
+    return value
+
+
+def shared_result(result_cache, version_fn):
+    """
+    Decorator memoizing a function's result in `result_cache` (a callable returning
+    the LRUCache, so it can be created lazily). The key is the function name,
+    `version_fn()` and the non-DataFrame arguments: DataFrame arguments are assumed
+    to be the loaded dataset of that data version and are left out of the key.
+    Stored results are made read-only.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (
+                fn.__name__,
+                version_fn(),
+                tuple(_key_part(a) for a in args if not isinstance(a, pd.DataFrame)),
+                tuple(sorted((k, _key_part(v)) for k, v in kwargs.items() if not isinstance(v, pd.DataFrame))),
+            )
+            return result_cache().get_or_create(key, lambda: make_readonly(fn(*args, **kwargs)))
+        wrapper.clear = lambda: result_cache().clear()
+        return wrapper
+    return decorator
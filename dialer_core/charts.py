@@ -0,0 +1,301 @@
+"""
+Trend chart builder shared by the Sales, Oplans and Others pages, and the count
+heatmaps of the Intraday page.
+
+One line trace per dialer plus a single text trace carrying the sampled point labels
+of every dialer, built from numpy arrays in one pass (no per-dialer DataFrame
+subsetting). Above `WEBGL_POINT_THRESHOLD` points the lines switch to WebGL
+(`scattergl`) and straight segments, since spline smoothing is SVG-only and gets
+expensive on long series.
+
+Long ranges are rolled up before plotting: `resolve_granularity` picks daily, weekly
+or monthly buckets from the span of the trend (or takes the page's override), and
+series that stay at daily resolution are reduced to a point budget with
+largest-triangle-three-buckets (LTTB) downsampling, so the chart payload stays
+bounded whatever the selection.
+
+Imports plotly, so it is kept out of `dialer_core/__init__` and loaded lazily.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from dialer_core.config import DIALER_COLUMN
+
+# Fixed colors for the main teams; other dialers get the Plotly palette like px.line does
+DIALER_COLORS = {
+    'SA2': '#8C1007',
+    'SA3': '#EB5A3C',
+    'SA4': '#DF9755',
+    'HU1': "#83CBE7"
+}
+# px.line takes unmapped colors from the default template's colorway
+PALETTE = list(pio.templates['plotly'].layout.colorway)
+MAX_LABELS = 8  # labels per series, sampled evenly
+ANOMALY_COLOR = '#FFD23F'  # rings around anomalous points, distinct from every line color
+WEBGL_POINT_THRESHOLD = int(os.environ.get("DIALERS_WEBGL_POINTS", "1500"))
+
+# Trend resolution: "Auto" picks from the span of the trend's dates (in days)
+GRANULARITIES = ["Auto", "Daily", "Weekly", "Monthly"]
+DAILY_MAX_DAYS = int(os.environ.get("DIALERS_DAILY_MAX_DAYS", "92"))
+WEEKLY_MAX_DAYS = int(os.environ.get("DIALERS_WEEKLY_MAX_DAYS", "400"))
+# Points per chart kept by LTTB (split across series, at least MIN_SERIES_POINTS each)
+POINT_BUDGET = int(os.environ.get("DIALERS_CHART_POINTS", "2000"))
+MIN_SERIES_POINTS = 60
+
+
+def dialer_colors(names, color_map=DIALER_COLORS):
+    """Colors for `names` in order, assigned the way px.line assigns color_discrete_map + sequence."""
+    mapping = dict(color_map)
+    sequence = PALETTE
+    for name in names:
+        if name not in mapping:
+            mapping[name] = sequence[len(mapping) % len(sequence)]
+    return [mapping[name] for name in names]
+
+
+def _label_mask(codes, n_groups, max_labels):
+    """Rows to label: every ceil(n / max_labels)-th row of each group (rows grouped, in order)."""
+    sizes = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    steps = np.maximum(1, np.ceil(sizes / max_labels)).astype(np.int64)
+    rank = np.arange(len(codes)) - starts[codes]
+    return rank % steps[codes] == 0
+
+
+# --- ROLLUP AND DOWNSAMPLING ---
+
+def resolve_granularity(df_trend, choice="Auto"):
+    """'Daily', 'Weekly' or 'Monthly' for `df_trend`: `choice` itself unless it is 'Auto'."""
+    if choice != "Auto":
+        return choice
+    if df_trend.empty:
+        return "Daily"
+    span = (df_trend['Date'].max() - df_trend['Date'].min()).days + 1
+    if span <= DAILY_MAX_DAYS:
+        return "Daily"
+    return "Weekly" if span <= WEEKLY_MAX_DAYS else "Monthly"
+
+
+def rollup_trend(df_trend, y_col, granularity):
+    """
+    Sums `y_col` per week (Monday start) or calendar month and dialer. Buckets are
+    dated by their first day, clipped to the first date of the trend so a partial
+    first week does not start before the selection.
+    """
+    if granularity == "Daily" or df_trend.empty:
+        return df_trend
+    days = df_trend['Date'].to_numpy().astype('datetime64[D]')
+    if granularity == "Weekly":
+        # 1970-01-01 was a Thursday: (days + 3) % 7 is 0 on Mondays
+        buckets = days - ((days.astype(np.int64) + 3) % 7)
+    else:
+        buckets = days.astype('datetime64[M]').astype('datetime64[D]')
+    buckets = np.maximum(buckets, days.min()).astype('datetime64[ns]')
+
+    keys = [pd.Series(buckets, index=df_trend.index, name='Date')]
+    if DIALER_COLUMN in df_trend.columns:
+        keys.append(df_trend[DIALER_COLUMN])
+    df = df_trend[y_col].groupby(keys, sort=False).sum().reset_index()
+    return df.sort_values('Date', kind='stable', ignore_index=True)
+
+
+def lttb(x, y, n_out):
+    """
+    Indices of the `n_out` points largest-triangle-three-buckets keeps from the
+    series (x ascending). The first and last points are always kept; every bucket in
+    between keeps the point spanning the largest triangle with the previously kept
+    point and the next bucket's average.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Bucket averages from prefix sums; the last bucket looks ahead to the final point
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    widths = edges[1:] - edges[:-1]
+    avg_x = np.append((cx[edges[1:]] - cx[edges[:-1]]) / widths, x[-1])
+    avg_y = np.append((cy[edges[1:]] - cy[edges[:-1]]) / widths, y[-1])
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nx, ny = avg_x[i + 1], avg_y[i + 1]
+        area = np.abs((x[a] - nx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (ny - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def _downsample(bounds, dates, values, budget):
+    """Row indices to plot: each series [bounds[i], bounds[i+1]) reduced with LTTB to its share of `budget`."""
+    n_series = len(bounds) - 1
+    per_series = max(MIN_SERIES_POINTS, budget // max(1, n_series))
+    if (np.diff(bounds) <= per_series).all():
+        return None
+    x = dates.astype(np.int64)
+    return np.concatenate([
+        bounds[i] + lttb(x[bounds[i]:bounds[i + 1]], values[bounds[i]:bounds[i + 1]], per_series)
+        for i in range(n_series)
+    ])
+
+
+# --- FIGURE ---
+
+def trend_figure(df_trend, y_col, y_title, label_colors=False, granularity="Daily", point_budget=POINT_BUDGET,
+                 max_labels=MAX_LABELS, webgl_threshold=WEBGL_POINT_THRESHOLD, forecast=None, anomalies=None):
+    """
+    Line chart of `y_col` over 'Date', one series per dialer. `label_colors` gives the
+    point labels of the fixed-color teams their line color (Oplans page); otherwise
+    labels are white. `granularity` is one of GRANULARITIES ('Auto' resolves through
+    resolve_granularity); daily series longer than their share of `point_budget` are
+    downsampled with LTTB. `forecast` (Date, dialer, `y_col` rows, daily charts only)
+    is drawn as dashed lines in each dialer's color. `anomalies` (Date, dialer, text
+    rows, daily charts only) are ringed on their dialer's line, with `text` on hover.
+    """
+    granularity = resolve_granularity(df_trend, granularity)
+    df = rollup_trend(df_trend, y_col, granularity).sort_values('Date', kind='stable')
+    # Second resolution serializes as "YYYY-MM-DDTHH:MM:SS" (ns arrays would add 9 digits per point)
+    dates = df['Date'].to_numpy().astype('datetime64[s]')
+    values = df[y_col].to_numpy()
+    # Y-axis range: a small buffer so the top of the chart is above the highest point
+    has_forecast = forecast is not None and not forecast.empty and granularity == "Daily"
+    max_val = values.max() if len(values) else None
+    if has_forecast:
+        max_val = max(max_val or 0, float(forecast[y_col].max()))
+    buffer = 3
+    top_range = (max_val + buffer) if (max_val is not None and max_val > 0) else 1
+
+    if DIALER_COLUMN in df.columns:
+        # Group rows per dialer (first-appearance order, dates stay sorted inside a group)
+        codes, names = pd.factorize(df[DIALER_COLUMN], sort=False)
+        order = np.argsort(codes, kind='stable')
+        codes, dates, values = codes[order], dates[order], values[order]
+        names = list(names)
+    else:
+        codes = np.zeros(len(df), dtype=np.int64)
+        names = []
+    n_series = max(1, len(names))
+    bounds = np.searchsorted(codes, np.arange(n_series + 1))
+    if granularity == "Daily":
+        kept = _downsample(bounds, dates, values, point_budget)
+        if kept is not None:
+            codes, dates, values = codes[kept], dates[kept], values[kept]
+            bounds = np.searchsorted(codes, np.arange(n_series + 1))
+
+    fig = go.Figure()
+    use_webgl = len(dates) > webgl_threshold
+    line_trace = go.Scattergl if use_webgl else go.Scatter
+    line_style = dict(width=2.5) if use_webgl else dict(width=2.5, shape='spline', smoothing=1.3)
+
+    if names:
+        colors = dialer_colors(names)
+        for i, name in enumerate(names):
+            part = slice(bounds[i], bounds[i + 1])
+            fig.add_trace(line_trace(
+                x=dates[part], y=values[part], mode='lines', name=name, legendgroup=name,
+                line=dict(color=colors[i], **line_style),
+                hovertemplate=F"{DIALER_COLUMN}={name}<br>Date=%{{x}}<br>{y_col}=%{{y}}<extra></extra>",
+            ))
+    else:
+        fig.add_trace(line_trace(
+            x=dates, y=values, mode='lines', showlegend=False,
+            line=dict(color=PALETTE[0], **line_style),
+            hovertemplate=F"Date=%{{x}}<br>{y_col}=%{{y}}<extra></extra>",
+        ))
+    if label_colors and names:
+        # Only the fixed team colors carry over to labels; other dialers keep white labels
+        label_color = np.asarray([DIALER_COLORS.get(name, 'white') for name in names], dtype=object)[codes]
+    else:
+        label_color = 'white'
+
+    if has_forecast:
+        # Same colors as the dialers' lines; forecast-only dialers continue the palette
+        extra = [n for n in dict.fromkeys(forecast[DIALER_COLUMN]) if n not in names]
+        palette = dict(zip(names + extra, dialer_colors(names + extra)))
+        for name, part in forecast.groupby(DIALER_COLUMN, sort=False):
+            fig.add_trace(go.Scatter(
+                x=part['Date'].to_numpy().astype('datetime64[s]'), y=part[y_col].to_numpy(), mode='lines',
+                name=F"{name} forecast", legendgroup=name, showlegend=False,
+                line=dict(color=palette.get(name, PALETTE[0]), width=2, dash='dash'),
+                hovertemplate=F"{DIALER_COLUMN}={name} (forecast)<br>Date=%{{x}}<br>{y_col}=%{{y}}<extra></extra>",
+            ))
+
+    if anomalies is not None and not anomalies.empty and granularity == "Daily" and names:
+        # Placed on the (not downsampled) daily value, so flagged days never drop out of the chart
+        points = anomalies.merge(df[['Date', DIALER_COLUMN, y_col]], on=['Date', DIALER_COLUMN])
+        if not points.empty:
+            fig.add_trace(go.Scatter(
+                x=points['Date'].to_numpy().astype('datetime64[s]'), y=points[y_col].to_numpy(), mode='markers',
+                name="Anomaly", text=points['text'].to_numpy(), showlegend=False,
+                marker=dict(symbol='circle-open', size=16, color=ANOMALY_COLOR, line=dict(width=3)),
+                hovertemplate="%{text}<extra>Anomaly</extra>",
+            ))
+
+    # All point labels in one text trace
+    keep = _label_mask(codes, n_series, max_labels)
+    if isinstance(label_color, np.ndarray):
+        label_color = label_color[keep]
+    fig.add_trace(line_trace(
+        x=dates[keep], y=values[keep], mode='text',
+        text=values[keep].astype(np.int64).astype(str),
+        textposition="top center", showlegend=False, hoverinfo='skip',
+        textfont=dict(color=label_color, size=11),
+    ))
+
+    # Dark theme layout
+    fig.update_layout(
+        height=520,
+        plot_bgcolor='#1e1e1e',
+        paper_bgcolor='#1e1e1e',
+        font_color='white',
+        legend_title_text='Dialer' if names else None,
+        legend_tracegroupgap=0,
+        xaxis_title='Date',
+        yaxis_title=y_title,
+        margin=dict(l=10, r=10, t=20, b=40),
+        # Use a date x-axis so Plotly plots lines chronologically
+        xaxis={'type': 'date'},
+        # Expand the top of the y-axis by `buffer` and remove thousand separators
+        yaxis={'range': [0, float(top_range)], 'tickformat': '.0f'}
+    )
+    return fig
+
+
+# --- HEATMAP ---
+
+# Dark panel to the dashboard's KPI orange
+HEATMAP_COLORSCALE = [[0.0, '#1e1e1e'], [0.5, '#b8431f'], [1.0, '#ff6a3d']]
+
+
+def heatmap_figure(z, x_labels, y_labels, x_title, y_title, value_title):
+    """Count heatmap (rows `y_labels`, columns `x_labels`) in the trend charts' dark theme; cells show their count."""
+    z = np.asarray(z)
+    fig = go.Figure(go.Heatmap(
+        z=z, x=list(x_labels), y=list(y_labels),
+        colorscale=HEATMAP_COLORSCALE, zmin=0, xgap=2, ygap=2,
+        text=z, texttemplate="%{text}", textfont=dict(size=11),
+        colorbar=dict(title=value_title),
+        hovertemplate=F"{y_title}=%{{y}}<br>{x_title}=%{{x}}<br>{value_title}=%{{z}}<extra></extra>",
+    ))
+    fig.update_layout(
+        height=max(320, 36 * len(y_labels) + 140),
+        plot_bgcolor='#1e1e1e',
+        paper_bgcolor='#1e1e1e',
+        font_color='white',
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        margin=dict(l=10, r=10, t=20, b=40),
+        # Categorical axes keep the given order (hours as labels, first row on top)
+        xaxis={'type': 'category'},
+        yaxis={'type': 'category', 'autorange': 'reversed'},
+    )
+    return fig
@@ -0,0 +1,23 @@
+"""
+Column naming and period configuration shared by the loaders, filters and KPIs.
+"""
+import calendar
+
+
+# --- Configuration for Column Naming ---
+DATE_COLUMN_SALES = 'created time'
+DATE_COLUMN_SALES_VARIATIONS = ['created time', 'Created Time', 'Created time', 'Date', 'date', 'Timestamp']
+DIALER_COLUMN = 'dialer'
+# ADDED 'Other Leads Dialer' as requested for the Others page
+DIALER_COLUMN_VARIATIONS = ['dialer', 'Dialer', 'Agent', 'agent', 'sales_rep', 'Other Leads Dialer']
+
+# Lead identity columns (first match, case-insensitive) for the lead key; see dialer_core.leads
+LEAD_KEY_COLUMN_VARIATIONS = {
+    'phone': ['Phone', 'Phone Number', 'Mobile', 'Mobile Number', 'Contact Number', 'Telephone'],
+    'lead_id': ['Lead ID', 'Lead Id', 'LeadID', 'lead_id', 'Lead Number'],
+    'name': ['Name', 'Full Name', 'Lead Name', 'Customer Name', 'Patient Name'],
+}
+
+# Define the years and months for the filter (includes 2024 as per last feedback)
+YEARS = [2025, 2026] 
+MONTH_NAMES = list(calendar.month_name)[1:]
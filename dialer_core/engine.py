@@ -0,0 +1,125 @@
+"""
+Headless counterpart of the dashboard's cached data functions, for the KPI service
+and batch jobs that run outside Streamlit.
+
+`KpiEngine` loads the five tables through the shared Arrow dataset
+(`arrow_store.load_shared`), keeps its results in a memory-bounded `cache.LRUCache`
+keyed by data version, and answers a page's KPI tuple the way the pages do: the
+precomputed store for single months, then one aggregation pass per filter state that
+all three pages share, then the live KPI functions for what that pass leaves out. It is thread-safe; a data refresh is picked up
+on the next call, since every key carries `loading.data_version()`.
+"""
+import threading
+
+from dialer_core import aggregates, arrow_store, cache, kpis, loading, parallel, perf
+from dialer_core.precompute import PRECOMPUTED_DIR, PrecomputedStore
+
+
+def live_kpis(page, frames, year, months, dialer, week_str, day_str):
+    """The page's live KPI function on the (attendance, sales, oplans, others, sheet2) tables."""
+    df_attendance, df_sales, df_oplans, df_others, df_sheet2 = frames
+    if page == 'sales':
+        return kpis.process_and_calculate_data(year, months, dialer, week_str, day_str, df_sales, df_oplans, df_attendance)
+    if page == 'oplans':
+        return kpis.calculate_oplans_data(year, months, dialer, week_str, day_str, df_oplans, df_attendance)
+    if page == 'others':
+        return kpis.calculate_others_data(year, months, dialer, week_str, day_str, df_others, df_oplans, df_attendance, df_sheet2)
+    raise ValueError(F"Unknown page: {page}")
+
+
+def kpi_values(page, result):
+    """{KPI name: value} for a page's KPI tuple (trend first, as the KPI functions return it)."""
+    return dict(zip(aggregates.KPI_COLUMNS[page], result[1:]))
+
+
+class KpiEngine:
+    """Cached KPI tuples and dialer lists for the data files in `base_path`."""
+
+    def __init__(self, base_path="./", precomputed_dir=PRECOMPUTED_DIR, result_cache=None, pool=None):
+        self.base_path = base_path
+        self.precomputed_dir = precomputed_dir
+        self.results = result_cache if result_cache is not None else cache.LRUCache(max_bytes=cache.RESULT_CACHE_BYTES)
+        self.pool = pool
+        # Per data version: the precomputed store and the prepared tables (latest version only)
+        self._resources = {}
+        self._lock = threading.Lock()
+
+    def version(self):
+        return loading.data_version(self.base_path)
+
+    def _memo(self, name, args, factory, version=None):
+        key = (name, version or self.version(), args)
+        return self.results.get_or_create(key, lambda: cache.make_readonly(factory()))
+
+    def frames(self, version=None):
+        """The five tables, like loading.load_raw_data returns them."""
+        return self._memo('load_raw_data', (), lambda: arrow_store.load_shared(self.base_path), version)
+
+    def _resource(self, version, name, factory):
+        with self._lock:
+            if version not in self._resources:
+                self._resources = {version: {}}
+            held = self._resources[version]
+            if name in held:
+                return held[name]
+        value = factory()
+        with self._lock:
+            return self._resources.setdefault(version, {}).setdefault(name, value)
+
+    def store(self, version):
+        return self._resource(version, 'store', lambda: PrecomputedStore.open(self.precomputed_dir, version))
+
+    def tables(self, version=None):
+        """The prepared tables (aggregates.prepare_tables, mapped from the shared Arrow files), or None when the data cannot be prepared."""
+        version = version or self.version()
+
+        def prepare():
+            from dialer_core import leads
+            try:
+                return arrow_store.load_prepared(lambda: aggregates.prepare_tables(*self.frames(version)), version, leads.LEAD_KEY)
+            except ValueError:
+                return None
+        return self._resource(version, 'tables', prepare)
+
+    def dialers(self, year, months):
+        """The dialer options of the month selection ("All Dialers" first)."""
+        version = self.version()
+        return self._memo('get_attended_dialers', (year, tuple(months)),
+                          lambda: kpis.get_attended_dialers(self.frames(version)[0], year, list(months)), version)
+
+    def page_kpis(self, page, year, months, dialer, week_str="All Weeks", day_str="All Days"):
+        """The KPI tuple of `page` ('sales', 'oplans' or 'others') for one selection."""
+        version = self.version()
+        months = list(months)
+
+        def compute():
+            store = self.store(version)
+            if store is not None:
+                with perf.stage(F"{page}.precomputed_lookup"):
+                    result = store.lookup(page, year, months, dialer, week_str, day_str)
+                if result is not None:
+                    return result
+            shared = self.selection_kpis(year, months, dialer, week_str, day_str, version)
+            if shared is not None and shared[page] is not None:
+                return shared[page]
+            return live_kpis(page, self.frames(version), year, months, dialer, week_str, day_str)
+
+        return self._memo(F"{page}_kpis", (year, tuple(months), dialer, week_str, day_str), compute, version)
+
+    def selection_kpis(self, year, months, dialer, week_str="All Weeks", day_str="All Days", version=None):
+        """
+        {page: KPI tuple or None} of all three pages for one filter state from one
+        aggregation pass (parallel.selection_kpis), shared by the pages; None when
+        the tables cannot be prepared.
+        """
+        version = version or self.version()
+        months = tuple(sorted(set(months)))
+
+        def compute():
+            tables = self.tables(version)
+            if tables is None or not isinstance(dialer, str):
+                return None
+            with perf.stage("selection.aggregate"):
+                return parallel.selection_kpis(tables, year, months, dialer, week_str, day_str, pool=self.pool)
+
+        return self._memo('selection_kpis', (year, months, dialer, week_str, day_str), compute, version)
@@ -0,0 +1,221 @@
+"""
+Chunked export of the filtered rows and KPI tables behind the pages.
+
+Rows come from the prepared tables (`aggregates.prepare_tables`: parsed dates,
+cleaned dialers, Sales exclusions applied). The selection is one array of row
+positions (`selection_positions`), read in chunks of `DIALERS_EXPORT_CHUNK_ROWS`
+rows, so an export never materializes more than one chunk of the selection:
+
+- sales: the rows the Sales page counts (PPO-Braces chasing client and the excluded
+  closing statuses removed);
+- oplans: the O-Plan leads with an `is_transfer` column (the Transfer Ratio's
+  numerator);
+- others, attendance: the rows as loaded.
+
+`kpi_table` lists the page's KPIs for every dialer of the selection.
+
+Writers stream the chunks out: CSV chunk by chunk, Parquet one row group per
+chunk (pyarrow, optional), Excel through openpyxl's write-only workbook, which
+keeps rows on disk until the file is saved. `iter_export` yields the file as byte
+blocks for an HTTP response; `write_export` writes it to a file object.
+"""
+import io
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from dialer_core import aggregates
+from dialer_core.config import DATE_COLUMN_SALES, DIALER_COLUMN
+from dialer_core.engine import kpi_values
+from dialer_core.kpis import TRANSFER_STATUSES, _find_status_col
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+CHUNK_ROWS = int(os.environ.get("DIALERS_EXPORT_CHUNK_ROWS", "50000"))
+BLOCK_BYTES = 1024 * 1024
+SPOOL_BYTES = 8 * 1024 * 1024
+
+EXPORT_TABLES = ('sales', 'oplans', 'others', 'attendance')
+# format -> (MIME type, file extension)
+FORMATS = {
+    'csv': ("text/csv", "csv"),
+    'parquet': ("application/vnd.apache.parquet", "parquet"),
+    'xlsx': ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+
+# --- ROW SOURCES ---
+
+def selection_positions(tables, table, year, months, dialer="All Dialers", week_str="All Weeks", day_str="All Days"):
+    """
+    Row positions of one prepared table in the selection, month by month and in table
+    order within a month. The year/month, period and dialer masks are each computed
+    once over the table.
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError(F"Unknown export table: {table}")
+    df = tables[table]
+    dates = df['date' if table == 'attendance' else DATE_COLUMN_SALES]
+    month = dates.dt.month.to_numpy()
+    positions = np.flatnonzero((dates.dt.year == int(year)).to_numpy() & np.isin(month, [int(m) for m in months]))
+    keep = aggregates.period_mask(pd.DatetimeIndex(dates.iloc[positions].dt.normalize()), week_str, day_str)
+    if dialer != "All Dialers":
+        keep &= (df[DIALER_COLUMN].iloc[positions] == dialer.strip().upper()).to_numpy()
+    positions = positions[keep]
+    return positions[np.argsort(month[positions], kind='stable')]
+
+
+def position_rows(tables, table, positions, chunk_rows=CHUNK_ROWS):
+    """Yields the rows of one prepared table at `positions`, `chunk_rows` at a time (O-Plan rows with `is_transfer`)."""
+    df = tables[table]
+    status_col = _find_status_col(df) if table == 'oplans' else None
+    for start in range(0, len(positions), chunk_rows):
+        rows = df.iloc[positions[start:start + chunk_rows]]
+        if table == 'oplans':
+            if status_col is not None:
+                is_transfer = rows[status_col].astype(str).str.strip().str.upper().isin(TRANSFER_STATUSES)
+            else:
+                is_transfer = False
+            rows = rows.assign(is_transfer=is_transfer)
+        yield rows
+
+
+def filtered_rows(tables, table, year, months, dialer="All Dialers", week_str="All Weeks", day_str="All Days", chunk_rows=CHUNK_ROWS):
+    """Yields the rows of one prepared table in the selection, month by month, `chunk_rows` at a time."""
+    positions = selection_positions(tables, table, year, months, dialer, week_str, day_str)
+    return position_rows(tables, table, positions, chunk_rows)
+
+
+def kpi_table(source, page, year, months, week_str="All Weeks", day_str="All Days"):
+    """
+    The page's KPIs for every dialer option of the selection ("All Dialers" first).
+    `source` is a KpiEngine (or anything with its dialers/page_kpis methods). A
+    dialer whose KPIs cannot be computed (no attendance to divide by) gets an
+    empty row.
+    """
+    rows = []
+    for dialer in source.dialers(year, months):
+        try:
+            result = source.page_kpis(page, year, months, dialer, week_str, day_str)
+        except ZeroDivisionError:
+            rows.append({'dialer': dialer, **dict.fromkeys(aggregates.KPI_COLUMNS[page])})
+            continue
+        rows.append({'dialer': dialer, **kpi_values(page, result)})
+    return pd.DataFrame(rows)
+
+
+# --- WRITERS ---
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only stream that hands out what was written since the last drain()."""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _iter_csv(chunks):
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode()
+        header = False
+    if header:
+        yield b""
+
+
+def _iter_parquet(chunks):
+    if pq is None:
+        raise RuntimeError("Parquet export needs pyarrow")
+    sink = _ChunkSink()
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table.cast(writer.schema))
+        yield sink.drain()
+    if writer is None:
+        writer = pq.ParquetWriter(sink, pa.schema([]))
+    writer.close()
+    yield sink.drain()
+
+
+def _excel_rows(chunk):
+    """Rows of `chunk` as Python values openpyxl can write (NaN/NaT become empty cells)."""
+    values = chunk.astype(object).where(chunk.notna(), None)
+    for row in values.itertuples(index=False, name=None):
+        yield [v.item() if isinstance(v, np.generic) else v for v in row]
+
+
+def _write_xlsx(chunks, sink, sheet_title="Export"):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title[:31])
+    header = False
+    for chunk in chunks:
+        if not header:
+            sheet.append([str(c) for c in chunk.columns])
+            header = True
+        for row in _excel_rows(chunk):
+            sheet.append(row)
+    workbook.save(sink)
+
+
+def _iter_xlsx(chunks, sheet_title="Export"):
+    # The zip is only complete once saved, so it goes through a spooled file and out in blocks
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as spool:
+        _write_xlsx(chunks, spool, sheet_title)
+        spool.seek(0)
+        while True:
+            block = spool.read(BLOCK_BYTES)
+            if not block:
+                break
+            yield block
+
+
+def iter_export(fmt, chunks, sheet_title="Export"):
+    """The export file in `fmt` ('csv', 'parquet' or 'xlsx') as an iterator of byte blocks."""
+    if fmt == 'csv':
+        return _iter_csv(chunks)
+    if fmt == 'parquet':
+        return _iter_parquet(chunks)
+    if fmt == 'xlsx':
+        return _iter_xlsx(chunks, sheet_title)
+    raise ValueError(F"Unknown export format: {fmt}")
+
+
+def write_export(fmt, chunks, sink, sheet_title="Export"):
+    """Writes the export file in `fmt` to the binary file object `sink`."""
+    if fmt == 'xlsx':
+        _write_xlsx(chunks, sink, sheet_title)
+        return
+    for block in iter_export(fmt, chunks, sheet_title):
+        sink.write(block)
+
+
+def export_filename(name, year, months, fmt):
+    months = "-".join(F"{m:02d}" for m in sorted(set(months)))
+    return F"{name}_{year}_{months}.{FORMATS[fmt][1]}"
@@ -0,0 +1,100 @@
+"""
+Column standardization and the date / week / day / dialer filter chain used by every page.
+"""
+import numpy as np
+import pandas as pd
+
+from dialer_core.config import DATE_COLUMN_SALES_VARIATIONS, DIALER_COLUMN_VARIATIONS
+
+
+# Helper function to standardize columns (used by multiple pages)
+def _standardize_df(df, date_col_name, dialer_col_name):
+    df_local = df.copy()
+    
+    # Standardize Date Column
+    found_date = next((c for c in df_local.columns if c.lower() in [v.lower() for v in DATE_COLUMN_SALES_VARIATIONS]), None)
+    if found_date and found_date != date_col_name:
+        df_local = df_local.rename(columns={found_date: date_col_name})
+
+    # Standardize Dialer Column
+    found_dialer = next((c for c in df_local.columns if c in DIALER_COLUMN_VARIATIONS), None) # Use direct match for Dialer Variations
+    
+    if found_dialer and found_dialer != dialer_col_name:
+        df_local = df_local.rename(columns={found_dialer: dialer_col_name})
+    
+    # CRITICAL FIX: Robust Data Cleaning (Strip/Uppercase)
+    if dialer_col_name in df_local.columns:
+        df_local[dialer_col_name] = df_local[dialer_col_name].astype(str).str.strip().str.upper().replace('NAN', np.nan)
+        
+    return df_local
+
+# Helper function to filter by date (used by multiple pages)
+def _filter_by_date_local(df, date_col, year, months):
+    if date_col not in df.columns:
+        return pd.DataFrame()
+    df_local = df.copy()
+    # Try parsing with dayfirst=True to handle European date formats (common in spreadsheets)
+    df_local[date_col] = pd.to_datetime(df_local[date_col], errors='coerce',dayfirst=True)
+    df_local = df_local.dropna(subset=[date_col])
+    try:
+        year = int(year)
+    except Exception:
+        pass
+    if isinstance(months, (list, tuple, set)):
+        months_list = [int(m) for m in months]
+        df_local = df_local[(df_local[date_col].dt.year == year) & (df_local[date_col].dt.month.isin(months_list))]
+    else:
+        df_local = df_local[(df_local[date_col].dt.year == year) & (df_local[date_col].dt.month == int(months))]
+    return df_local
+
+# Helper function to apply week filter (used by multiple pages)
+def _apply_week_filter_local(df, date_col, week_str):
+    if week_str != "All Weeks" and not df.empty and date_col in df.columns:
+        try:
+            start_date_str = week_str.split('(')[1].split(' to ')[0]
+            end_date_str = week_str.split(' to ')[1].replace(')', '')
+            start_date = pd.to_datetime(start_date_str).date()
+            end_date = pd.to_datetime(end_date_str).date()
+
+            # Must convert to date type for comparison
+            df['DateOnly'] = pd.to_datetime(df[date_col], errors='coerce', dayfirst=True).dt.date
+            # Filter for dates within the week range (Mon=0 to Fri=4)
+            df['Weekday'] = pd.to_datetime(df[date_col], errors='coerce', dayfirst=True).dt.weekday
+            df_out = df[(df['DateOnly'] >= start_date) & (df['DateOnly'] <= end_date) & (df['Weekday'] <= 4)].copy()
+            df_out.drop(columns=['DateOnly', 'Weekday'], inplace=True, errors='ignore')
+            return df_out
+        except Exception:
+            return df
+    return df
+
+# NEW HELPER: Helper function to apply day filter
+def _apply_day_filter_local(df, date_col, selected_day_str):
+    if selected_day_str != "All Days" and not df.empty and date_col in df.columns:
+        try:
+            target_date = pd.to_datetime(selected_day_str).date()
+            
+            # Ensure the date column is clean and converted to date part only
+            df['DateOnly'] = pd.to_datetime(df[date_col], errors='coerce', dayfirst=True).dt.date
+            df_out = df[df['DateOnly'] == target_date].copy()
+            df_out.drop(columns=['DateOnly'], inplace=True, errors='ignore')
+            return df_out
+        except Exception:
+            return df
+    return df
+
+# Helper function to apply dialer filter (used by multiple pages)
+def _apply_dialer_filter_local(df, dialer_col, selected_dialer):
+    if df.empty or dialer_col not in df.columns:
+        return df
+
+    if isinstance(selected_dialer, (list, tuple, set)):
+        if len(selected_dialer) == 0 or 'All Dialers' in selected_dialer:
+            pass
+        else:
+            cleaned_selected_dialers = [d.strip().upper() for d in selected_dialer if d != "All Dialers"]
+            df = df[df[dialer_col].isin(cleaned_selected_dialers)].copy()
+    elif selected_dialer != "All Dialers":
+        cleaned_dialer = selected_dialer.strip().upper()
+        df = df[df[dialer_col] == cleaned_dialer].copy()
+    
+    return df
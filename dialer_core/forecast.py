@@ -0,0 +1,109 @@
+"""
+Per-dialer forecasts of the daily lead counts, drawn over the daily trend charts.
+
+For each lead table, one ridge regression is fitted for every dialer at once. All
+dialers share the design matrix: a linear trend plus weekday indicators over the
+last `DIALERS_FORECAST_WINDOW` days. The target is the (days x dialers) matrix of
+daily counts, so scikit-learn solves all dialers in a single multi-output fit. The
+counts come from the intraday encoding (`IntradayIndex.daily_counts`), with one
+bincount per table.
+
+Fitted models are kept in `ForecastModels`, keyed by table, window and a digest of
+the training counts. A data refresh that brings no new days (or only changes rows
+outside the window) reuses the fitted model; a refit happens when new days arrive.
+The forecast covers the selection's days after the table's last day with data, up
+to `DIALERS_FORECAST_HORIZON` days ahead, i.e. the rest of the current month.
+
+scikit-learn is optional: without it there is no forecast. It is imported on the
+first fit rather than with this module (about a second), so selections with no days
+left to project never pay for it.
+"""
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from dialer_core import cache
+from dialer_core.aggregates import NO_DIALER
+from dialer_core.config import DIALER_COLUMN
+
+FORECAST_WINDOW = int(os.environ.get("DIALERS_FORECAST_WINDOW", "56"))
+FORECAST_HORIZON = int(os.environ.get("DIALERS_FORECAST_HORIZON", "31"))
+MIN_HISTORY_DAYS = 14
+RIDGE_ALPHA = 1.0
+
+
+def _ridge():
+    """scikit-learn's Ridge, or None when it is not installed."""
+    try:
+        from sklearn.linear_model import Ridge
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return Ridge
+
+
+def design_matrix(days, origin):
+    """Trend (weeks since `origin`) and Monday..Sunday indicator columns for day numbers."""
+    days = np.asarray(days, dtype=np.int64)
+    X = np.zeros((len(days), 8))
+    X[:, 0] = (days - origin) / 7.0
+    # 1970-01-01 (day 0) was a Thursday
+    X[np.arange(len(days)), 1 + (days + 3) % 7] = 1.0
+    return X
+
+
+class ForecastModels:
+    """Fitted multi-output ridge models, keyed by table, training window and counts digest."""
+
+    def __init__(self, max_entries=16):
+        self.models = cache.LRUCache(max_entries=max_entries)
+        self.fits = 0
+        self._lock = threading.Lock()
+
+    def fit(self, table, first_day, dialers, Y):
+        """The model for counts `Y` (days x dialers) starting at day number `first_day`."""
+        digest = hashlib.blake2b(np.ascontiguousarray(Y).tobytes(), digest_size=16).hexdigest()
+
+        def build():
+            with self._lock:
+                self.fits += 1
+            days = np.arange(first_day, first_day + Y.shape[0])
+            return _ridge()(alpha=RIDGE_ALPHA).fit(design_matrix(days, first_day), Y)
+
+        return self.models.get_or_create((table, first_day, tuple(dialers), digest), build)
+
+
+def forecast_frame(index, table, y_col, year, months, week_str="All Weeks", day_str="All Days", dialer="All Dialers", models=None):
+    """
+    (Date, dialer, `y_col`) forecast rows for the selection's days after the last day
+    of `index` (an IntradayIndex of `table`), one per dialer (or only `dialer`).
+    Empty without scikit-learn, future days or MIN_HISTORY_DAYS of history.
+    """
+    empty = pd.DataFrame(columns=['Date', DIALER_COLUMN, y_col])
+    if not len(index.day):
+        return empty
+    last = int(index.day.max())
+    future = index.day_lookup(year, months, week_str, day_str)
+    future = future[(future > last) & (future <= last + FORECAST_HORIZON)]
+    first = max(last - FORECAST_WINDOW + 1, int(index.day.min()))
+    if not len(future) or last - first + 1 < MIN_HISTORY_DAYS or _ridge() is None:
+        return empty
+
+    dialers, counts = index.daily_counts(first, last)
+    named = [i for i, d in enumerate(dialers) if d != NO_DIALER and counts[i].any()]
+    if not named:
+        return empty
+    names = [dialers[i] for i in named]
+    model = (models or ForecastModels()).fit(table, first, names, counts[named].T.astype(float))
+    predicted = np.clip(model.predict(design_matrix(future, first)), 0, None).reshape(len(future), len(names))
+
+    frame = pd.DataFrame({
+        'Date': np.repeat(future.astype('datetime64[D]').astype('datetime64[ns]'), len(names)),
+        DIALER_COLUMN: np.tile(np.array(names, dtype=object), len(future)),
+        y_col: predicted.reshape(-1).round(1),
+    })
+    if dialer != "All Dialers":
+        frame = frame[frame[DIALER_COLUMN] == dialer.strip().upper()].reset_index(drop=True)
+    return frame
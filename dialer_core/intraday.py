@@ -0,0 +1,107 @@
+"""
+Hour-of-day and weekday activity of the lead tables, for the Intraday page.
+
+The Sales, Oplans and Others pages collapse `created time` to days; here the time
+of day is kept. Each prepared table is encoded once per data version into integer
+arrays (`IntradayIndex`): the day number, a weekday * 24 + hour slot and a dialer
+code. A selection is then a boolean lookup over day numbers (the month, week and
+day filters, same rules as the pages) and a single `numpy.bincount` over
+dialer * 168 + slot, giving a (dialers x 7 x 24) count cube. Both views are sums
+over that cube: hour x dialer, and weekday x hour for one dialer or all of them.
+`daily_counts` gives the (dialers x days) matrix the forecasts are fitted on.
+"""
+import calendar
+
+import numpy as np
+
+from dialer_core import aggregates
+from dialer_core.aggregates import NO_DIALER
+from dialer_core.config import DATE_COLUMN_SALES, DIALER_COLUMN
+
+# table -> label; sales rows are counted after the Sales page exclusions (prepare_tables)
+SOURCES = {'sales': "Sales", 'oplans': "Oplans", 'others': "Others"}
+WEEKDAYS = list(calendar.day_abbr)
+HOURS = 24
+SLOTS = 7 * HOURS
+
+
+class IntradayIndex:
+    """Integer-encoded (day, weekday * 24 + hour, dialer) of the rows of one prepared table."""
+
+    def __init__(self, df):
+        if DATE_COLUMN_SALES in df.columns:
+            minutes = df[DATE_COLUMN_SALES].to_numpy(dtype='datetime64[m]')
+        else:
+            minutes = np.array([], dtype='datetime64[m]')
+        days = minutes.astype('datetime64[D]')
+        self.day = days.astype(np.int64)
+        hour = (minutes - days).astype(np.int64) // 60
+        # 1970-01-01 (day 0) was a Thursday: Monday is weekday 0 as in pandas
+        self.slot = ((self.day + 3) % 7) * HOURS + hour
+        if DIALER_COLUMN in df.columns and len(df):
+            codes, names = aggregates.dialer_codes(df)
+        else:
+            codes, names = np.zeros(len(minutes), dtype=np.int64), [NO_DIALER]
+        self.code = codes.astype(np.int64)
+        self.dialers = list(names)
+
+    def day_lookup(self, year, months, week_str="All Weeks", day_str="All Days"):
+        """Day numbers of the days the month/week/day filters keep."""
+        return aggregates.selection_days(year, months, week_str, day_str)
+
+    def counts(self, year, months, week_str="All Weeks", day_str="All Days"):
+        """
+        (dialers, cube): cube[i, weekday, hour] counts the rows of dialers[i] in the
+        selection. Dialers without rows are dropped; NO_DIALER rows only count
+        toward "All Dialers".
+        """
+        days = self.day_lookup(year, months, week_str, day_str)
+        if not len(days) or not len(self.day):
+            return [], np.zeros((0, 7, HOURS), dtype=np.int64)
+        first = days.min()
+        keep = np.zeros(days.max() - first + 1, dtype=bool)
+        keep[days - first] = True
+        offset = self.day - first
+        mask = (offset >= 0) & (offset < len(keep))
+        mask[mask] = keep[offset[mask]]
+
+        cube = np.bincount(self.code[mask] * SLOTS + self.slot[mask], minlength=len(self.dialers) * SLOTS)
+        cube = cube.reshape(len(self.dialers), 7, HOURS)
+        present = cube.sum(axis=(1, 2)) > 0
+        return [d for d, p in zip(self.dialers, present) if p], cube[present]
+
+    def daily_counts(self, first_day, last_day):
+        """(dialers, dialers x days matrix) of the rows per day number from first_day to last_day."""
+        n_days = last_day - first_day + 1
+        offset = self.day - first_day
+        mask = (offset >= 0) & (offset < n_days)
+        counts = np.bincount(self.code[mask] * n_days + offset[mask], minlength=len(self.dialers) * n_days)
+        return list(self.dialers), counts.reshape(len(self.dialers), n_days)
+
+
+def build_indexes(tables):
+    """{table: IntradayIndex} for the SOURCES tables of prepare_tables output."""
+    return {name: IntradayIndex(tables[name]) for name in SOURCES}
+
+
+def hour_by_dialer(dialers, cube):
+    """(dialer names, dialers x 24 matrix) without the dialer-less rows."""
+    named = [i for i, d in enumerate(dialers) if d != NO_DIALER]
+    return [dialers[i] for i in named], cube[named].sum(axis=1)
+
+
+def weekday_by_hour(dialers, cube, dialer="All Dialers"):
+    """7 x 24 matrix for one dialer, or all rows for "All Dialers"."""
+    if dialer == "All Dialers":
+        return cube.sum(axis=0)
+    if dialer not in dialers:
+        return np.zeros((7, HOURS), dtype=np.int64)
+    return cube[dialers.index(dialer)]
+
+
+def active_hours(cube):
+    """The hours from the first to the last one with any row in `cube` (all 24 when it is empty)."""
+    hours = np.flatnonzero(cube.reshape(-1, HOURS).sum(axis=0))
+    if not len(hours):
+        return range(HOURS)
+    return range(hours[0], hours[-1] + 1)
@@ -0,0 +1,440 @@
+"""
+KPI and trend calculations for the Sales, Oplans and Others pages.
+
+These are plain functions with no Streamlit dependency; the dashboard wraps them in
+its caches. Each returns the same tuple the corresponding page unpacks.
+"""
+import pandas as pd
+
+from dialer_core import perf
+from dialer_core.config import DATE_COLUMN_SALES, DATE_COLUMN_SALES_VARIATIONS, DIALER_COLUMN, DIALER_COLUMN_VARIATIONS
+from dialer_core.filters import (
+    _apply_day_filter_local,
+    _apply_dialer_filter_local,
+    _apply_week_filter_local,
+    _filter_by_date_local,
+    _standardize_df,
+)
+
+
+# Statuses that count as a 'transfer' on the Oplans page (compared after strip/upper)
+# Values confirmed by user: 'Transferred', 'Green Flag', 'Red Flags'
+TRANSFER_STATUSES = {'TRANSFERRED', 'GREEN FLAG', 'RED FLAGS'}
+
+
+def _exclude_sales_rows(df_sales):
+    """Drops the PPO-Braces chasing client and the client-side closing statuses from sales rows."""
+    # find a reasonable Client column (case-insensitive match)
+    client_col = next((C for C in df_sales.columns if 'client' in C.lower()), None)
+    if client_col is not None:
+        df_sales = df_sales[~df_sales[client_col].astype(str).str.contains('PPO-Braces chasing', case=False, na=False)]
+
+    # find a Closing Status column (common variations)
+    closing_col = next((C for C in df_sales.columns if 'closing' in C.lower() and 'status' in C.lower()), None)
+    if closing_col is None:
+        closing_col = next((C for C in df_sales.columns if C.lower().strip() in ['closing status', 'closing_status', 'status', 'closingstatus']), None)
+
+    if closing_col is not None:
+        exclude_statuses = {S.lower() for S in ['Retransfer to client', 'Rejected by client']}
+        df_sales = df_sales[~df_sales[closing_col].astype(str).str.lower().isin(exclude_statuses)]
+    return df_sales
+
+
+def _find_status_col(df_oplans):
+    """Opener status column of the oplans table, or None."""
+    status_col = next((c for c in df_oplans.columns if 'opener' in c.lower() and 'status' in c.lower()), None)
+    if status_col is None:
+        status_col = next((c for c in df_oplans.columns if 'opener' in c.lower()), None)
+    if status_col is None:
+        status_col = next((c for c in df_oplans.columns if 'status' in c.lower()), None)
+    return status_col
+
+
+def _find_att_col(df_sheet2):
+    """Attendance column of sheet2 ('att', else anything containing 'attendance'), or None."""
+    att_col = next((c for c in df_sheet2.columns if c.lower() == 'att'), None)
+    if att_col is None:
+        att_col = next((c for c in df_sheet2.columns if 'attendance' in c.lower()), None)
+    return att_col
+
+
+# Helper function: Get dialers who attended during the selected month/year
+def get_attended_dialers(df_attendance, selected_year, selected_month_index):
+    df_attendance_copy = df_attendance.copy()
+
+    # --- Standardize Dialer Column ---
+    found_dialer_col = None
+    for variation in DIALER_COLUMN_VARIATIONS:
+        if variation in df_attendance_copy.columns:
+            found_dialer_col = variation
+            break
+            
+    if found_dialer_col:
+        df_attendance_copy = df_attendance_copy.rename(columns={found_dialer_col: DIALER_COLUMN})
+
+    # --- Standardize Date Column (Must be named 'date' for filtering below) ---
+    found_date_col = None
+    for variation in DATE_COLUMN_SALES_VARIATIONS:
+        # Use lower() on column names for robust matching
+        if variation.lower() in [c.lower() for c in df_attendance_copy.columns]:
+            # Find the original name of the column that matched the variation
+            found_date_col = next((c for c in df_attendance_copy.columns if c.lower() == variation.lower()), None)
+            break
+            
+    if found_date_col and found_date_col != 'date':
+        df_attendance_copy = df_attendance_copy.rename(columns={found_date_col: 'date'})
+    # --- END Date FIX ---
+    
+    if DIALER_COLUMN not in df_attendance_copy.columns or 'date' not in df_attendance_copy.columns:
+        return ["All Dialers"]
+        
+    # --- CRITICAL FIX: Clean and standardize dialer names to ensure consistent grouping ---
+    df_attendance_copy[DIALER_COLUMN] = df_attendance_copy[DIALER_COLUMN].astype(str).str.strip().str.upper()
+    # --- END CRITICAL FIX ---
+    
+    df_attendance_copy['date'] = pd.to_datetime(df_attendance_copy['date'], errors='coerce')
+    df_filtered = df_attendance_copy.dropna(subset=['date'])
+
+    # selected_month_index may be an int or an iterable of ints
+    if isinstance(selected_month_index, (list, tuple, set)):
+        df_filtered = df_filtered[(df_filtered['date'].dt.year == selected_year) & (df_filtered['date'].dt.month.isin(selected_month_index))]
+    else:
+        df_filtered = df_filtered[(df_filtered['date'].dt.year == selected_year) & (df_filtered['date'].dt.month == selected_month_index)]
+    
+    dialers = sorted(df_filtered[DIALER_COLUMN].unique().astype(str).tolist())
+    
+    # Remove any empty or 'NAN' dialer names from the list of options
+    dialers = [d for d in dialers if d.strip() and d.upper() != 'NAN' and d.upper() != 'NONE']
+    
+    return ["All Dialers"] + dialers
+
+
+# Helper function: attendance rows of a selection (standardized attendance table)
+def _filter_attendance(df_attendance_local, year, month_index, dialer, week_str, day_str):
+    df_att_filtered = _filter_by_date_local(df_attendance_local, 'date', year, month_index)
+    df_att_filtered = _apply_week_filter_local(df_att_filtered, 'date', week_str)
+    df_att_filtered = _apply_day_filter_local(df_att_filtered, 'date', day_str)
+    return _apply_dialer_filter_local(df_att_filtered, DIALER_COLUMN, dialer)
+
+
+def has_attendance(df_attendance, year, month_index, dialer, week_str, day_str):
+    """
+    Whether the selection has attendance rows. Without them the Others page cannot
+    compute Average checks per agent (Total Leads / total attendance) and raises
+    ZeroDivisionError.
+    """
+    df_attendance_local = _standardize_df(df_attendance, 'date', DIALER_COLUMN)
+    return not _filter_attendance(df_attendance_local, year, month_index, dialer, week_str, day_str).empty
+
+
+def process_and_calculate_data(year, month_index, dialer, week_str, day_str, df_sales, df_oplans, df_attendance): 
+    """
+    Core function for Sales Performance page data processing and KPI calculation.
+    """
+    
+    # Standardize column names
+    with perf.stage("process.standardize"):
+        df_sales = _standardize_df(df_sales, DATE_COLUMN_SALES, DIALER_COLUMN)
+        df_oplans = _standardize_df(df_oplans, DATE_COLUMN_SALES, DIALER_COLUMN)
+        df_attendance = _standardize_df(df_attendance, 'date', DIALER_COLUMN)
+
+    # 1. FILTER BY MONTH/YEAR
+    with perf.stage("process.filter_month"):
+        df_sales_filtered = _filter_by_date_local(df_sales, DATE_COLUMN_SALES, year, month_index)
+        df_oplans_filtered = _filter_by_date_local(df_oplans, DATE_COLUMN_SALES, year, month_index)
+        df_att_filtered = _filter_by_date_local(df_attendance, 'date', year, month_index)
+
+    # 2. WEEK FILTERING
+    with perf.stage("process.filter_week"):
+        df_sales_filtered = _apply_week_filter_local(df_sales_filtered, DATE_COLUMN_SALES, week_str)
+        df_oplans_filtered = _apply_week_filter_local(df_oplans_filtered, DATE_COLUMN_SALES, week_str)
+        df_att_filtered = _apply_week_filter_local(df_att_filtered, 'date', week_str)
+    
+    # 2b. DAY FILTERING 
+    with perf.stage("process.filter_day"):
+        df_sales_filtered = _apply_day_filter_local(df_sales_filtered, DATE_COLUMN_SALES, day_str)
+        df_oplans_filtered = _apply_day_filter_local(df_oplans_filtered, DATE_COLUMN_SALES, day_str)
+        df_att_filtered = _apply_day_filter_local(df_att_filtered, 'date', day_str)
+
+    # 3. DIALER FILTERING
+    with perf.stage("process.filter_dialer"):
+        df_sales_filtered = _apply_dialer_filter_local(df_sales_filtered, DIALER_COLUMN, dialer)
+        df_oplans_filtered = _apply_dialer_filter_local(df_oplans_filtered, DIALER_COLUMN, dialer)
+        df_att_filtered = _apply_dialer_filter_local(df_att_filtered, DIALER_COLUMN, dialer)
+
+
+    # --- 3a. EXCLUDE UNWANTED SALES ROWS (CLIENT / CLOSING STATUS) ---
+    with perf.stage("process.sales_exclusions"):
+        if not df_sales_filtered.empty:
+            df_sales_filtered = _exclude_sales_rows(df_sales_filtered)
+    
+
+    # 4. KPI CALCULATION
+    with perf.stage("process.kpis"):
+        total_sales_count = df_sales_filtered.shape[0]
+        total_transfers_count = df_oplans_filtered.shape[0]
+    
+        # Sales Percentage (Kept for calculation, even if not displayed)
+        sales_percentage = round((total_sales_count / total_transfers_count) * 100) if total_transfers_count > 0 else 0
+    
+        # Check if sales data is available and has date column
+        if not df_sales_filtered.empty and DATE_COLUMN_SALES in df_sales_filtered.columns:
+            # NOTE: Date column was converted to datetime inside filter_by_date (Line 315)
+            days_with_sales = df_sales_filtered[DATE_COLUMN_SALES].dt.date.nunique()
+            avg_sales_per_day = round(total_sales_count / days_with_sales) if days_with_sales > 0 else 0
+        else:
+            days_with_sales = 0
+            avg_sales_per_day = 0
+    
+        # Attendance KPIs
+        dialers_present = df_att_filtered[DIALER_COLUMN].nunique() if DIALER_COLUMN in df_att_filtered.columns else 0
+        # Average attendance per dialer (mean of the 'attendance' column)
+        avg_att_per_dialer = round(df_att_filtered['attendance'].mean()) if dialers_present > 0 and 'attendance' in df_att_filtered.columns else 0
+    
+        # Total attendance for the period
+        total_att_count = df_att_filtered['attendance'].sum() if 'attendance' in df_att_filtered.columns else 0
+        # Days with attendance
+        days_with_att = df_att_filtered['date'].dt.date.nunique() if 'date' in df_att_filtered.columns else 0
+        # Average attendance per day
+        avg_att_per_day = round(total_att_count / days_with_att) if days_with_att > 0 else 0
+
+    
+    # 5. LINE CHART DATA PREPARATION
+    with perf.stage("process.trend_groupby"):
+        if not df_sales_filtered.empty and DATE_COLUMN_SALES in df_sales_filtered.columns and DIALER_COLUMN in df_sales_filtered.columns:
+            # Group by a normalized datetime Date (no time) and keep as datetime dtype for proper chronological plotting
+            df_sales_trend = df_sales_filtered.groupby([
+                df_sales_filtered[DATE_COLUMN_SALES].dt.normalize().rename('Date'), 
+                DIALER_COLUMN 
+            ]).size().reset_index(name='Sales_Count')
+            # Ensure the Date column is datetime and sort chronologically to avoid zig-zag lines when Plotly connects points
+            df_sales_trend['Date'] = pd.to_datetime(df_sales_trend['Date'])
+            df_sales_trend = df_sales_trend.sort_values(['Date', DIALER_COLUMN])
+        else:
+            df_sales_trend = pd.DataFrame(columns=['Date', DIALER_COLUMN, 'Sales_Count'])
+    
+    
+    return df_sales_trend, sales_percentage, avg_sales_per_day, avg_att_per_dialer, avg_att_per_day, total_sales_count
+
+
+def calculate_oplans_data(year, month_index, dialer, week_str, day_str, df_oplans, df_attendance):
+    """
+    Core function for Oplans Performance page data processing and KPI calculation.
+    """
+
+    # --- Normalize column names and CLEAN data ---
+    with perf.stage("oplans.standardize"):
+        df_oplans_local = _standardize_df(df_oplans, DATE_COLUMN_SALES, DIALER_COLUMN)
+        df_attendance_local = _standardize_df(df_attendance, 'date', DIALER_COLUMN)
+
+    # Filter oplans by selected year/month(s)
+    with perf.stage("oplans.filter"):
+        df_oplans_filtered = _filter_by_date_local(df_oplans_local, DATE_COLUMN_SALES, year, month_index)
+        # Apply week filter
+        df_oplans_filtered = _apply_week_filter_local(df_oplans_filtered, DATE_COLUMN_SALES, week_str)
+        # Apply day filter (NEW)
+        df_oplans_filtered = _apply_day_filter_local(df_oplans_filtered, DATE_COLUMN_SALES, day_str)
+        # Apply dialer filter from the Oplans sidebar selector
+        df_oplans_filtered = _apply_dialer_filter_local(df_oplans_filtered, DIALER_COLUMN, dialer)
+    
+    # KPI calculations for Oplans
+    with perf.stage("oplans.kpis"):
+        total_oplans_count = df_oplans_filtered.shape[0]
+
+        days_with_oplans_df = df_oplans_filtered[pd.to_datetime(df_oplans_filtered[DATE_COLUMN_SALES], errors='coerce').notna()]
+        if not days_with_oplans_df.empty:
+            unique_days = pd.to_datetime(days_with_oplans_df[DATE_COLUMN_SALES], errors='coerce').dt.date.nunique()
+        else:
+            unique_days = 0
+        avg_oplans_per_day = round(total_oplans_count / unique_days) if unique_days > 0 else 0
+
+        # Opener status ratio: try to find a sensible status column
+        status_col = _find_status_col(df_oplans_filtered)
+
+
+        # MODIFIED LOGIC HERE: Calculate Transfer Ratio based on explicit status list
+        transfer_ratio_pct = 0
+        if not df_oplans_filtered.empty and status_col in df_oplans_filtered.columns:
+            df_oplans_filtered['_status_clean'] = df_oplans_filtered[status_col].astype(str).str.strip().str.upper()
+        
+            # Count only the desired statuses
+            transfer_count = df_oplans_filtered[
+                df_oplans_filtered['_status_clean'].isin(TRANSFER_STATUSES)
+            ].shape[0]
+        
+            # Denominator is total Oplans count (already calculated)
+            transfer_ratio_pct = round((transfer_count / total_oplans_count) * 100) if total_oplans_count > 0 else 0
+    
+    # Attendance KPIs for Oplans page
+    with perf.stage("oplans.attendance"):
+        df_att_local_filtered = _filter_attendance(df_attendance_local, year, month_index, dialer, week_str, day_str)
+        total_att_count_op = df_att_local_filtered['attendance'].sum() if 'attendance' in df_att_local_filtered.columns and not df_att_local_filtered.empty else 0
+        days_with_att_op = df_att_local_filtered['date'].dt.date.nunique() if 'date' in df_att_local_filtered.columns and not df_att_local_filtered.empty else 0
+        avg_att_per_day_op = round(total_att_count_op / days_with_att_op) if days_with_att_op > 0 else 0
+    
+    # --- Oplans Trend Calculation Block ---
+    with perf.stage("oplans.trend_groupby"):
+        df_oplans_trend = pd.DataFrame(columns=['Date', DIALER_COLUMN, 'Oplan_Count'])
+        if not df_oplans_filtered.empty and DATE_COLUMN_SALES in df_oplans_filtered.columns:
+            df_temp = df_oplans_filtered.copy()
+        
+            # Use a temporary column for cleaned dialer names to handle multi-index reset later
+            if DIALER_COLUMN in df_temp.columns:
+                df_temp['_DialerClean'] = df_temp[DIALER_COLUMN]
+            else:
+                df_temp['_DialerClean'] = 'UNKNOWN'
+
+            df_temp['Date'] = pd.to_datetime(df_temp[DATE_COLUMN_SALES], errors='coerce').dt.normalize()
+            df_temp = df_temp.dropna(subset=['Date'])
+        
+            if DIALER_COLUMN in df_oplans_filtered.columns:
+                df_oplans_trend = (
+                    df_temp
+                    .groupby(['Date', '_DialerClean'])
+                    .size()
+                    .reset_index(name='Oplan_Count')
+                    .rename(columns={'_DialerClean': DIALER_COLUMN})
+                )
+            else:
+                df_oplans_trend = (
+                    df_temp
+                    .groupby('Date')
+                    .size()
+                    .reset_index(name='Oplan_Count')
+                )
+                df_oplans_trend[DIALER_COLUMN] = 'TOTAL' # Use a single label when no dialer column is found
+
+            df_oplans_trend['Date'] = pd.to_datetime(df_oplans_trend['Date'])
+            df_oplans_trend = df_oplans_trend.sort_values(['Date', DIALER_COLUMN])
+        
+            # Remove the 'UNKNOWN' group if a specific dialer was selected
+            if isinstance(dialer, (list, tuple, set)):
+                if 'All Dialers' not in dialer:
+                    df_oplans_trend = df_oplans_trend[df_oplans_trend[DIALER_COLUMN] != 'UNKNOWN']
+            elif dialer != 'All Dialers':
+                df_oplans_trend = df_oplans_trend[df_oplans_trend[DIALER_COLUMN] != 'UNKNOWN']
+            
+    # --- END Oplans Trend Block ---
+
+    return df_oplans_trend, avg_oplans_per_day, transfer_ratio_pct, total_oplans_count, avg_att_per_day_op
+
+
+def calculate_others_data(year, month_index, dialer, week_str, day_str, df_others, df_oplans, df_attendance, df_sheet2):
+    """
+    Core function for Others Performance page data processing and KPI calculation.
+    """
+    # dialer_core.leads imports aggregates, which imports this module
+    from dialer_core import leads
+
+    # --- Normalize column names and CLEAN data ---
+    with perf.stage("others.standardize"):
+        df_others_local = _standardize_df(df_others, DATE_COLUMN_SALES, DIALER_COLUMN)
+        df_oplans_local = _standardize_df(df_oplans, DATE_COLUMN_SALES, DIALER_COLUMN)
+        df_attendance_local = _standardize_df(df_attendance, 'date', DIALER_COLUMN)
+        df_sheet2_local = _standardize_df(df_sheet2, DATE_COLUMN_SALES, DIALER_COLUMN) # STANDARDIZE df_sheet2
+
+
+    # Filter dataframes by selected year/month(s)/week/dialer
+    # NUMERATOR: Total Leads (distinct Others + Oplans leads)
+    with perf.stage("others.filter"):
+        df_others_filtered = _filter_by_date_local(df_others_local, DATE_COLUMN_SALES, year, month_index)
+        df_others_filtered = _apply_week_filter_local(df_others_filtered, DATE_COLUMN_SALES, week_str)
+        df_others_filtered = _apply_day_filter_local(df_others_filtered, DATE_COLUMN_SALES, day_str) # Apply day filter
+        df_others_filtered = _apply_dialer_filter_local(df_others_filtered, DIALER_COLUMN, dialer)
+
+        df_oplans_filtered = _filter_by_date_local(df_oplans_local, DATE_COLUMN_SALES, year, month_index)
+        df_oplans_filtered = _apply_week_filter_local(df_oplans_filtered, DATE_COLUMN_SALES, week_str)
+        df_oplans_filtered = _apply_day_filter_local(df_oplans_filtered, DATE_COLUMN_SALES, day_str) # Apply day filter
+        df_oplans_filtered = _apply_dialer_filter_local(df_oplans_filtered, DIALER_COLUMN, dialer)
+    
+    # KPI calculations for Others page
+    with perf.stage("others.kpis"):
+        total_others_count = df_others_filtered.shape[0]
+        # Each lead counts once in the selection, across both files (dialer_core.leads)
+        others_keys = leads.frame_keys(df_others_filtered)
+        distinct_others_count = leads.distinct_leads(others_keys)
+        total_combined_count = leads.distinct_leads(others_keys, leads.frame_keys(df_oplans_filtered)) # This is the NUMERATOR
+
+        # KPI 1: Others % (distinct Others leads / Total Leads)
+        others_percentage = round((distinct_others_count / total_combined_count) * 100, 1) if total_combined_count > 0 else 0
+
+        # KPI 2: Average Others per day
+        days_with_others_df = df_others_filtered[pd.to_datetime(df_others_filtered[DATE_COLUMN_SALES], errors='coerce').notna()]
+        if not days_with_others_df.empty:
+            unique_days = pd.to_datetime(days_with_others_df[DATE_COLUMN_SALES], errors='coerce').dt.date.nunique()
+        else:
+            unique_days = 0
+        avg_others_per_day = round(total_others_count / unique_days) if unique_days > 0 else 0
+
+        # KPI 3: Average attendance per day (from attendance sheet)
+        df_att_local_filtered = _filter_attendance(df_attendance_local, year, month_index, dialer, week_str, day_str)
+        total_att_count = df_att_local_filtered['attendance'].sum() if 'attendance' in df_att_local_filtered.columns and not df_att_local_filtered.empty else 0
+        days_with_att = df_att_local_filtered['date'].dt.date.nunique() if 'date' in df_att_local_filtered.columns and not df_att_local_filtered.empty else 0
+        avg_att_per_day_oth = round(total_att_count / days_with_att) if days_with_att > 0 else 0
+
+        # KPI 4: Average checks per agent (MUST BE DECIMAL)
+        df_sheet2_filtered = _filter_by_date_local(df_sheet2_local, DATE_COLUMN_SALES, year, month_index)
+        df_sheet2_filtered = _apply_week_filter_local(df_sheet2_filtered, DATE_COLUMN_SALES, week_str)
+        df_sheet2_filtered = _apply_day_filter_local(df_sheet2_filtered, DATE_COLUMN_SALES, day_str) # Apply day filter
+        df_sheet2_filtered = _apply_dialer_filter_local(df_sheet2_filtered, DIALER_COLUMN, dialer)
+    
+
+        attendance_sum_sheet2 = 0
+        att_col = _find_att_col(df_sheet2_filtered)
+        
+        if att_col is not None:
+            try:
+                numeric_vals = pd.to_numeric(df_sheet2_filtered[att_col], errors='coerce').dropna()
+                attendance_sum_sheet2 = numeric_vals.sum()
+            except Exception:
+                pass
+        
+        if attendance_sum_sheet2 > 0:
+            avg_checks_per_agent = total_combined_count / total_att_count
+            # Use f-string formatting to enforce two decimal places
+            avg_checks_per_agent_display = f"{avg_checks_per_agent:.2f}" 
+        else:
+            avg_checks_per_agent = 0 
+            avg_checks_per_agent_display = "0.00"
+    
+    # --- Others Trend Calculation Block (NO CHANGE) ---
+    with perf.stage("others.trend_groupby"):
+        df_others_trend = pd.DataFrame(columns=['Date', DIALER_COLUMN, 'Others_Count'])
+        if not df_others_filtered.empty and DATE_COLUMN_SALES in df_others_filtered.columns:
+            df_temp = df_others_filtered.copy()
+        
+            if DIALER_COLUMN in df_temp.columns:
+                df_temp['_DialerClean'] = df_temp[DIALER_COLUMN]
+            else:
+                df_temp['_DialerClean'] = 'UNKNOWN'
+
+            df_temp['Date'] = pd.to_datetime(df_temp[DATE_COLUMN_SALES], errors='coerce').dt.normalize()
+            df_temp = df_temp.dropna(subset=['Date'])
+        
+            if DIALER_COLUMN in df_others_filtered.columns:
+                df_others_trend = (
+                    df_temp
+                    .groupby(['Date', '_DialerClean'])
+                    .size()
+                    .reset_index(name='Others_Count')
+                    .rename(columns={'_DialerClean': DIALER_COLUMN})
+                )
+            else:
+                df_others_trend = (
+                    df_temp
+                    .groupby('Date')
+                    .size()
+                    .reset_index(name='Others_Count')
+                )
+                df_others_trend[DIALER_COLUMN] = 'TOTAL'
+
+            df_others_trend['Date'] = pd.to_datetime(df_others_trend['Date'])
+            df_others_trend = df_others_trend.sort_values(['Date', DIALER_COLUMN])
+        
+            if isinstance(dialer, (list, tuple, set)):
+                if 'All Dialers' not in dialer:
+                    df_others_trend = df_others_trend[df_others_trend[DIALER_COLUMN] != 'UNKNOWN']
+            elif dialer != 'All Dialers':
+                df_others_trend = df_others_trend[df_others_trend[DIALER_COLUMN] != 'UNKNOWN']
+
+    return df_others_trend, others_percentage, avg_others_per_day, avg_checks_per_agent_display, avg_att_per_day_oth
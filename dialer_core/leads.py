@@ -0,0 +1,242 @@
+"""
+Lead identity across the exports: distinct lead counts for the Others KPIs, and the
+O-Plan -> sale conversion funnel.
+
+The lead key comes from identity columns the exports may carry
+(config.LEAD_KEY_COLUMN_VARIATIONS). `DIALERS_LEAD_KEY` selects one of three keys:
+
+- 'phone': the digits only, keeping the last PHONE_DIGITS, so "+44 7700 900123" and
+  "07700 900123" are one lead
+- 'lead_id': trimmed and upper-cased
+- 'name_date': the case-folded name with whitespace collapsed, plus the day of `created time`
+
+Each normalized key becomes a 64-bit integer. A phone key is its own digits read as a
+number, which is exact. The other keys are hashed with pandas' `hash_array`. Rows
+without a key belong to no lead. The string steps use pyarrow-backed strings when
+pyarrow is installed, which makes them about four times faster on a million rows.
+
+The Others page's Total Leads, Others % and checks per agent count distinct leads
+across Other_Leads and O_Plan_Leads. `distinct_leads` counts the unique keys of the
+rows in the selection; rows without a key count as one lead each. Distinct counts do
+not add up over days or dialers, so the aggregate path keeps one
+(Date, dialer, source, key) row per lead row (`lead_rows`, built once in
+aggregates.prepare_tables) and counts the unique keys inside each selection's days
+and dialer. The key stays out of the loaded and prepared frames.
+
+`ConversionIndex` is built once per data version. Each lead's first O-Plan (its day
+and dialer) is matched to the lead's first sale at or after it. The match is one sort
+and one `numpy.searchsorted`: every (lead, minute) pair is packed into an int64, a
+dense lead code in the high 32 bits and the minute in the low 32 bits. A selection
+then counts leads by the day of their first O-Plan.
+"""
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+from dialer_core import aggregates
+from dialer_core.aggregates import NO_DIALER
+from dialer_core.config import (
+    DATE_COLUMN_SALES,
+    DATE_COLUMN_SALES_VARIATIONS,
+    DIALER_COLUMN,
+    LEAD_KEY_COLUMN_VARIATIONS,
+)
+
+LEAD_KEYS = ('phone', 'lead_id', 'name_date')
+LEAD_KEY = os.environ.get("DIALERS_LEAD_KEY", "phone")
+PHONE_DIGITS = 10
+MIN_PHONE_DIGITS = 7
+# A sale later than this after the lead's first O-Plan does not count as its conversion
+CONVERSION_DAYS = int(os.environ.get("DIALERS_CONVERSION_DAYS", "30"))
+
+STRING_DTYPE = 'string[pyarrow]' if importlib.util.find_spec('pyarrow') else 'string'
+
+FUNNEL_COLUMNS = ['Dialer', 'O-Plan Leads', 'Converted', 'Conversion %', 'Median Days to Close', 'Mean Days to Close']
+
+
+def find_column(df, field):
+    """The first column of `df` named like a LEAD_KEY_COLUMN_VARIATIONS[field] entry, or None."""
+    variations = [v.lower() for v in LEAD_KEY_COLUMN_VARIATIONS[field]]
+    return next((c for c in df.columns if str(c).strip().lower() in variations), None)
+
+
+def _date_column(df):
+    """The created-time column of a raw or prepared table (same variations as _standardize_df), or None."""
+    variations = [v.lower() for v in DATE_COLUMN_SALES_VARIATIONS]
+    return next((c for c in df.columns if str(c).lower() in variations), None)
+
+
+def _text(series):
+    """Stripped strings, NA kept; whole floats (phone numbers read as numbers) lose their '.0'."""
+    if pd.api.types.is_float_dtype(series):
+        series = series.round().astype('Int64')
+    return series.astype(STRING_DTYPE).str.strip()
+
+
+def normalized_keys(df, key=LEAD_KEY):
+    """The rows' normalized lead keys (NA where a row has none), or None when `df` lacks the key's columns."""
+    if key not in LEAD_KEYS:
+        raise ValueError(F"Unknown lead key: {key} (expected one of {', '.join(LEAD_KEYS)})")
+    column = find_column(df, 'name' if key == 'name_date' else key)
+    date_column = _date_column(df)
+    if column is None or (key == 'name_date' and date_column is None):
+        return None
+    text = _text(df[column])
+    if key == 'phone':
+        digits = text.str.replace(r'\D', '', regex=True)
+        text = digits.str[-PHONE_DIGITS:].where(digits.str.len() >= MIN_PHONE_DIGITS)
+    elif key == 'lead_id':
+        text = text.str.upper()
+    else:
+        name = text.str.casefold().str.replace(r'\s+', ' ', regex=True)
+        day = pd.to_datetime(df[date_column], errors='coerce', dayfirst=True).dt.strftime('%Y-%m-%d')
+        text = name.mask(name == '') + '|' + day.astype('string')
+    return text.mask(text == '')
+
+
+def lead_hashes(df, key=LEAD_KEY):
+    """(uint64 key hashes, has-key mask) of `df`'s rows, or (None, None) when `df` lacks the key's columns."""
+    text = normalized_keys(df, key)
+    if text is None:
+        return None, None
+    valid = text.notna().to_numpy()
+    hashes = np.zeros(len(text), dtype=np.uint64)
+    if key == 'phone':
+        hashes[valid] = text[valid].astype('Int64').to_numpy(dtype=np.uint64)
+    else:
+        hashes[valid] = pd.util.hash_array(text[valid].to_numpy(dtype=object))
+    return hashes, valid
+
+
+def distinct_leads(*keyed):
+    """
+    Distinct leads among (hashes, has-key mask) pairs of selected rows: the unique
+    keys over all pairs, plus one per row without a key. A pair of None hashes (a
+    table without the key's columns) counts every row as its own lead.
+    """
+    keys, keyless = [], 0
+    for hashes, valid in keyed:
+        keys.append(hashes[valid])
+        keyless += int((~valid).sum())
+    return len(np.unique(np.concatenate(keys))) + keyless if keys else keyless
+
+
+def frame_keys(df, key=LEAD_KEY):
+    """(hashes, has-key mask) of `df`'s rows; every row is keyless when `df` lacks the key's columns."""
+    hashes, valid = lead_hashes(df, key)
+    if hashes is None:
+        return np.zeros(len(df), dtype=np.uint64), np.zeros(len(df), dtype=bool)
+    return hashes, valid
+
+
+def lead_rows(df_oplans, df_others, key=LEAD_KEY):
+    """
+    One row per row of the two prepared lead tables: created time, dialer, source
+    (0 O-Plan, 1 Others), the 64-bit key and whether the row has one. Shaped like a
+    prepared table, so it is partitioned by month with the others.
+    """
+    parts = []
+    for source, df in enumerate((df_oplans, df_others)):
+        hashes, valid = frame_keys(df, key)
+        parts.append(pd.DataFrame({
+            DATE_COLUMN_SALES: df[DATE_COLUMN_SALES].to_numpy() if DATE_COLUMN_SALES in df.columns else pd.NaT,
+            DIALER_COLUMN: df[DIALER_COLUMN].to_numpy() if DIALER_COLUMN in df.columns else np.nan,
+            'source': np.int8(source),
+            'key': hashes,
+            'has_key': valid,
+        }))
+    return pd.concat(parts, ignore_index=True)
+
+
+def _minutes(df):
+    """`created time` as int64 minutes since the epoch, and the mask of rows that have one."""
+    minutes = df[DATE_COLUMN_SALES].to_numpy(dtype='datetime64[m]')
+    return minutes.astype(np.int64), ~np.isnat(minutes)
+
+
+class ConversionIndex:
+    """
+    Every lead's first O-Plan (day, dialer), matched to its first sale at or after
+    it within `window_days`. `available` is False when either prepared table lacks
+    the key's columns.
+    """
+
+    def __init__(self, oplans, sales, key=LEAD_KEY, window_days=CONVERSION_DAYS):
+        self.key = key
+        self.window_days = window_days
+        o_hash, o_valid = lead_hashes(oplans, key)
+        s_hash, s_valid = lead_hashes(sales, key)
+        self.available = o_hash is not None and s_hash is not None
+        if not self.available:
+            oplans, sales = oplans.iloc[:0], sales.iloc[:0]
+            o_hash = s_hash = np.zeros(0, dtype=np.uint64)
+            o_valid = s_valid = np.zeros(0, dtype=bool)
+
+        o_time, o_dated = _minutes(oplans)
+        keep = o_valid & o_dated
+        o_hash, o_time = o_hash[keep], o_time[keep]
+        o_codes, o_names = aggregates.dialer_codes(oplans)
+        o_dialer = o_codes[keep]
+        s_time, s_dated = _minutes(sales)
+        s_hash, s_time = s_hash[s_valid & s_dated], s_time[s_valid & s_dated]
+
+        # First O-Plan of each lead: sort by (key, time) and keep the first row per key
+        order = np.lexsort((o_time, o_hash))
+        o_hash, o_time, o_dialer = o_hash[order], o_time[order], o_dialer[order]
+        first = np.r_[True, o_hash[1:] != o_hash[:-1]] if len(o_hash) else np.zeros(0, dtype=bool)
+        lead_hash, lead_time = o_hash[first], o_time[first]
+        self.leads = len(lead_hash)
+
+        # (dense lead code, minutes since 1970) packed into one sortable int64; the minutes fit 32 bits until year 10136
+        codes, _ = pd.factorize(np.concatenate([lead_hash, s_hash]))
+        codes = codes.astype(np.int64)
+        packed_leads = (codes[:self.leads] << 32) | lead_time
+        packed_sales = np.sort((codes[self.leads:] << 32) | s_time)
+
+        at = np.searchsorted(packed_sales, packed_leads, side='left')
+        found = at < len(packed_sales)
+        found[found] = (packed_sales[at[found]] >> 32) == codes[:self.leads][found]
+        minutes_to_close = np.full(self.leads, np.nan)
+        minutes_to_close[found] = (packed_sales[at[found]] & 0xFFFFFFFF) - lead_time[found]
+
+        self.converted = found & (minutes_to_close <= window_days * 24 * 60)
+        self.days_to_close = np.where(self.converted, minutes_to_close / (24 * 60), np.nan)
+        self.date = pd.DatetimeIndex((lead_time // (24 * 60)).astype('datetime64[D]'))
+        # Dense codes over the leads' dialers; o_names is sorted, so they stay in name order
+        used, self.code = np.unique(o_dialer[first], return_inverse=True)
+        self.code = self.code.astype(np.int64)
+        self.dialers = [o_names[i] for i in used]
+
+    def summary(self, year, months, week_str="All Weeks", day_str="All Days", dialer="All Dialers"):
+        """
+        FUNNEL_COLUMNS per dialer for the leads whose first O-Plan falls in the
+        selection, then an "All Dialers" row (which also counts leads without a dialer).
+        """
+        mask = (self.date.year == int(year)) & np.isin(self.date.month, list(months))
+        mask &= aggregates.period_mask(self.date, week_str, day_str)
+        frame = pd.DataFrame({
+            'Dialer': np.asarray(self.dialers, dtype=object)[self.code[mask]] if self.dialers else np.array([], dtype=object),
+            'converted': self.converted[mask],
+            'days': self.days_to_close[mask],
+        })
+        if dialer != "All Dialers":
+            frame = frame[frame['Dialer'] == dialer.strip().upper()]
+
+        per_dialer = frame[frame['Dialer'] != NO_DIALER].groupby('Dialer', sort=True).agg(
+            leads=('converted', 'size'), converted=('converted', 'sum'),
+            median=('days', 'median'), mean=('days', 'mean')).reset_index()
+        total = pd.DataFrame([{'Dialer': "All Dialers", 'leads': len(frame), 'converted': int(frame['converted'].sum()),
+                               'median': frame['days'].median(), 'mean': frame['days'].mean()}])
+        out = pd.concat([per_dialer, total], ignore_index=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.where(out['leads'] > 0, out['converted'] / out['leads'] * 100, 0.0)
+        return pd.DataFrame({
+            'Dialer': out['Dialer'],
+            'O-Plan Leads': out['leads'].astype(np.int64),
+            'Converted': out['converted'].astype(np.int64),
+            'Conversion %': np.round(rate, 2),
+            'Median Days to Close': out['median'].astype(float).round(1),
+            'Mean Days to Close': out['mean'].astype(float).round(1),
+        }, columns=FUNNEL_COLUMNS)
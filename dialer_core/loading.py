@@ -0,0 +1,59 @@
+"""
+Reads the five source files (attendance and sheet2 xlsx, sales / O_Plan / Other leads csv).
+"""
+import hashlib
+import os
+
+import pandas as pd
+
+from dialer_core import perf
+
+
+# File names load_raw_data reads, in the order of the tuple it returns
+SOURCE_FILES = ("Dialers Attendance.xlsx", "sales.csv", "O_Plan_Leads.csv", "Other_Leads.csv", "sheet2.xlsx")
+
+
+class DataLoadError(Exception):
+    """Raised when a source file is missing or cannot be parsed; the message is user-facing."""
+
+
+def load_raw_data(base_path="./"):
+    """
+    Loads all files from `base_path` (the current directory by default) and returns
+    (df_attendance, df_sales, df_oplans, df_others, df_sheet2).
+    """
+    try:
+        # XLSX Files (Attendance is the source for all dialer names)
+        with perf.stage("load.attendance_xlsx"):
+            df_attendance = pd.read_excel(os.path.join(base_path, "Dialers Attendance.xlsx"))
+        with perf.stage("load.sheet2_xlsx"):
+            df_sheet2 = pd.read_excel(os.path.join(base_path, "sheet2.xlsx"))
+        # CSV Files
+        with perf.stage("load.sales_csv"):
+            df_sales = pd.read_csv(os.path.join(base_path, "sales.csv"))
+        with perf.stage("load.oplans_csv"):
+            df_oplans = pd.read_csv(os.path.join(base_path, "O_Plan_Leads.csv"))
+        with perf.stage("load.others_csv"):
+            df_others = pd.read_csv(os.path.join(base_path, "Other_Leads.csv")) # Load the Others file
+
+        return df_attendance, df_sales, df_oplans, df_others, df_sheet2
+
+    except FileNotFoundError as E:
+        raise DataLoadError(F"Error loading file: {E}. Please ensure all data files (xlsx/csv) are uploaded to the root directory of your repository.") from E
+    except Exception as E:
+        raise DataLoadError(F"An error occurred during file loading: {E}. If reading Excel files, ensure you have 'openpyxl' installed in requirements.txt.") from E
+
+
+def data_version(base_path="./"):
+    """
+    Short fingerprint of the source files (name, size, mtime). Changes whenever any
+    file is replaced, so stores derived from the data can tell they are stale.
+    """
+    digest = hashlib.sha1()
+    for name in SOURCE_FILES:
+        try:
+            st = os.stat(os.path.join(base_path, name))
+            digest.update(F"{name}:{st.st_size}:{st.st_mtime_ns};".encode())
+        except OSError:
+            digest.update(F"{name}:missing;".encode())
+    return digest.hexdigest()[:16]
@@ -0,0 +1,78 @@
+"""
+Process-pool aggregation for selections that span several months.
+
+A multi-month selection is split into month partitions. Each worker process reduces
+its partition to daily aggregates (daily counts, attendance sums and counts, the
+days that had activity), the parent merges the partials and derives the page's KPIs
+and trend from them with `aggregates.combination_kpis`. Long ranges therefore scale
+with the number of cores instead of running one pandas pass over the whole range.
+
+The pool is created lazily, once per process, with the "spawn" start method so it
+is safe to use from the dashboard's script threads. `DIALERS_WORKERS` caps its size
+(default: one worker per CPU). Selections smaller than `DIALERS_PARALLEL_MIN_ROWS`
+rows are aggregated inline, where shipping partitions to workers would cost more
+than it saves.
+
+`selection_kpis` returns all three pages from the same pass. The dashboard and the
+engine run it once per filter state and share it between the pages.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from dialer_core import aggregates
+
+WORKERS = int(os.environ.get("DIALERS_WORKERS", "0")) or None
+PARALLEL_MIN_ROWS = int(os.environ.get("DIALERS_PARALLEL_MIN_ROWS", "200000"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The process-wide worker pool (created on first use)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def aggregate_months(tables, year, months, pool=None):
+    """
+    Daily aggregates for `months` of `year` from prepare_tables output, one partition
+    per month; partitions go to `pool` when given and large enough, otherwise run inline.
+    """
+    parts = [aggregates.month_partition(tables, int(year), int(m)) for m in sorted(set(months))]
+    rows = sum(len(df) for part in parts for df in part.values())
+    if pool is None or len(parts) < 2 or rows < PARALLEL_MIN_ROWS:
+        partials = [aggregates.daily_aggregates(p) for p in parts]
+    else:
+        partials = list(pool.map(aggregates.daily_aggregates, parts))
+    return aggregates.merge_daily(partials)
+
+
+def selection_kpis(tables, year, months, dialer, week_str="All Weeks", day_str="All Days", pool=None):
+    """
+    {page: KPI tuple} of all three pages for one filter state (any number of months),
+    from one aggregation pass, in the shape the live functions return. A page maps to
+    None where the live page would fail (so the caller runs it instead).
+    """
+    months = list(months) if isinstance(months, (list, tuple, set)) else [months]
+    daily = aggregate_months(tables, year, months, pool)
+    dialer_options = ["All Dialers"] if dialer == "All Dialers" else ["All Dialers", dialer.strip().upper()]
+    combos = aggregates.combination_kpis(daily, [(week_str, day_str)], dialer_options)
+    result = {}
+    for page in aggregates.PAGES:
+        rows = combos[page][combos[page]['dialer'] == dialer_options[-1]]
+        if rows.empty:
+            result[page] = None
+            continue
+        values = list(rows[aggregates.KPI_COLUMNS[page]].to_dict('records')[0].values())
+        trend = aggregates.slice_trend(aggregates.trend_points(daily, page), page, dialer, week_str, day_str)
+        result[page] = aggregates.kpi_tuple(page, values, trend)
+    return result
+
@@ -0,0 +1,259 @@
+"""
+Lightweight per-rerun instrumentation for the Dialers dashboard.
+
+Every Streamlit rerun opens a trace with `begin_rerun()`, named blocks of work are
+timed with `with stage("name"):`, cached functions report hits and misses through
+`track_cache` / `record_cache_miss`, and `end_rerun()` closes the trace and emits a
+single structured (JSON) log line that can be aggregated across sessions.
+
+This module has no Streamlit dependency so the same stages are recorded when the
+data functions are called from scripts or benchmarks (outside a rerun the timers
+are simply no-ops).
+
+`note_startup` / `log_startup` record per-process startup timings (script import time,
+first complete run, lazily imported modules) once.
+
+`profile_call` wraps one call in cProfile for on-demand profiling of a live rerun, and
+`frame_memory` reports the deep memory footprint of the DataFrames a rerun touched.
+"""
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+logger = logging.getLogger("dialers.perf")
+
+# Structured log lines go to stderr unless DIALERS_PERF_LOG=0 is set
+if os.environ.get("DIALERS_PERF_LOG", "1") != "0" and not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Streamlit runs each session's script in its own thread, so traces are thread-local
+_local = threading.local()
+
+
+class RerunTrace:
+    """Timings and cache events collected during one rerun."""
+
+    def __init__(self, session_id=None):
+        self.session_id = session_id
+        self.page = None
+        self.started = time.perf_counter()
+        self.total = None
+        self.stages = []        # (stage name, seconds)
+        self.cache_events = []  # (function name, 'hit' | 'miss', seconds)
+        self.misses = {}        # function name -> number of cache-miss bodies executed
+        self.frames = {}        # name -> DataFrame, for memory accounting when profiling
+
+    def add_stage(self, name, seconds):
+        self.stages.append((name, seconds))
+
+    def stage_totals(self):
+        """Sums repeated stages, keeping the order in which they first ran."""
+        totals = {}
+        for name, seconds in self.stages:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+    def as_record(self):
+        hits = sum(1 for _, outcome, _ in self.cache_events if outcome == 'hit')
+        return {
+            'event': 'rerun',
+            'ts': round(time.time(), 3),
+            'session': self.session_id,
+            'page': self.page,
+            'total_ms': round((self.total or 0.0) * 1000, 2),
+            'stages_ms': {k: round(v * 1000, 2) for k, v in self.stage_totals().items()},
+            'cache': {
+                'hits': hits,
+                'misses': len(self.cache_events) - hits,
+                'calls': [
+                    {'fn': fn, 'outcome': outcome, 'ms': round(seconds * 1000, 2)}
+                    for fn, outcome, seconds in self.cache_events
+                ],
+            },
+        }
+
+
+def current_trace():
+    return getattr(_local, 'trace', None)
+
+
+def begin_rerun(session_id=None):
+    """Starts a new trace for the rerun running on this thread."""
+    _local.trace = RerunTrace(session_id)
+    return _local.trace
+
+
+def set_page(page):
+    trace = current_trace()
+    if trace is not None:
+        trace.page = page
+
+
+def end_rerun():
+    """Closes the current trace, logs it as one JSON line and returns it."""
+    trace = current_trace()
+    if trace is None:
+        return None
+    trace.total = time.perf_counter() - trace.started
+    logger.info(json.dumps(trace.as_record()))
+    _local.trace = None
+    return trace
+
+
+@contextmanager
+def stage(name):
+    """Times the enclosed block and records it under `name` in the current trace."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace = current_trace()
+        if trace is not None:
+            trace.add_stage(name, time.perf_counter() - started)
+
+
+def note_frame(name, df):
+    """Keeps a reference to a DataFrame used in this rerun so its footprint can be reported."""
+    trace = current_trace()
+    if trace is not None and df is not None:
+        trace.frames[name] = df
+
+
+def record_cache_miss(name):
+    """Called at the top of a cached function body (the body only runs on a miss)."""
+    trace = current_trace()
+    if trace is not None:
+        trace.misses[name] = trace.misses.get(name, 0) + 1
+
+
+def track_cache(name):
+    """
+    Decorator placed OUTSIDE a cache decorator. A call is a miss when the wrapped body
+    reported itself through `record_cache_miss(name)` during the call, a hit otherwise.
+    """
+    def decorator(cached_fn):
+        @functools.wraps(cached_fn)
+        def wrapper(*args, **kwargs):
+            trace = current_trace()
+            if trace is None:
+                return cached_fn(*args, **kwargs)
+            misses_before = trace.misses.get(name, 0)
+            started = time.perf_counter()
+            try:
+                return cached_fn(*args, **kwargs)
+            finally:
+                outcome = 'miss' if trace.misses.get(name, 0) > misses_before else 'hit'
+                trace.cache_events.append((name, outcome, time.perf_counter() - started))
+        # Keep st.cache_data's .clear() reachable through the wrapper
+        if hasattr(cached_fn, 'clear'):
+            wrapper.clear = cached_fn.clear
+        return wrapper
+    return decorator
+
+
+# --- STARTUP TIMINGS ---
+
+# One-off, per-process timings (import time, first paint, lazy plotly import), in seconds
+_startup = {}
+_startup_lock = threading.Lock()
+
+
+def note_startup(name, seconds):
+    """Records a startup timing the first time `name` is seen; returns True if it was new."""
+    with _startup_lock:
+        if name in _startup:
+            return False
+        _startup[name] = seconds
+        return True
+
+
+def startup_timings():
+    """{name: ms} of the startup timings recorded so far in this process."""
+    with _startup_lock:
+        return {name: round(seconds * 1000, 2) for name, seconds in _startup.items()}
+
+
+def log_startup():
+    """Emits the startup timings as one structured log line."""
+    logger.info(json.dumps({'event': 'startup', 'ts': round(time.time(), 3), 'pid': os.getpid(), 'ms': startup_timings()}))
+
+
+# --- ON-DEMAND PROFILING ---
+
+PROFILE_DIR = os.environ.get("DIALERS_PROFILE_DIR", "profiles")
+
+
+def profile_call(label, fn, *args, top=25, **kwargs):
+    """
+    Runs fn(*args, **kwargs) under cProfile, writes `<label>-<timestamp>.prof` plus a
+    text summary next to it in PROFILE_DIR and returns (result, report).
+    The report holds the file paths and the `top` functions by cumulative time.
+    """
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+    elapsed = time.perf_counter() - started
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', str(label)).strip('-').lower() or 'rerun'
+    base = os.path.join(PROFILE_DIR, F"{slug}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}")
+    prof_path = base + '.prof'
+    txt_path = base + '.txt'
+    profiler.dump_stats(prof_path)
+
+    summary = io.StringIO()
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats('cumulative').print_stats(top)
+    with open(txt_path, 'w') as f:
+        f.write(summary.getvalue())
+
+    rows = []
+    for (filename, line, func), (cc, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': F"{os.path.basename(filename)}:{line}({func})",
+            'calls': ncalls,
+            'tottime_ms': round(tottime * 1000, 2),
+            'cumtime_ms': round(cumtime * 1000, 2),
+        })
+    rows.sort(key=lambda r: r['cumtime_ms'], reverse=True)
+
+    report = {
+        'label': label,
+        'elapsed_ms': round(elapsed * 1000, 2),
+        'prof_path': prof_path,
+        'txt_path': txt_path,
+        'top': rows[:top],
+    }
+    logger.info(json.dumps({'event': 'profile', **{k: v for k, v in report.items() if k != 'top'}}))
+    return result, report
+
+
+def frame_memory(frames):
+    """Deep memory footprint (memory_usage(deep=True)) of each named DataFrame, largest first."""
+    rows = []
+    for name, df in frames.items():
+        try:
+            nbytes = int(df.memory_usage(deep=True).sum())
+        except AttributeError:
+            continue
+        rows.append({'object': name, 'rows': len(df), 'columns': df.shape[1], 'MB': round(nbytes / 1024 ** 2, 3)})
+    rows.sort(key=lambda r: r['MB'], reverse=True)
+    return rows
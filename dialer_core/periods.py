@@ -0,0 +1,79 @@
+"""
+Week and day option lists for the period selectors.
+"""
+import calendar
+from datetime import datetime, timedelta
+
+from dialer_core.config import MONTH_NAMES
+
+
+# Helper function to find the weeks (Mon-Fri) in a selected month/year
+def get_weeks_in_month(year, month_name):
+    """Calculates weeks (Mon-Fri) for a given month/year, excluding Sat/Sun."""
+    try:
+        month_index = MONTH_NAMES.index(month_name) + 1
+    except ValueError:
+        return ["All Weeks"] 
+
+    num_days = calendar.monthrange(year, month_index)[1]
+    
+    weeks = []
+    week_counter = 1
+    week_start_date = None
+    
+    for day in range(1, num_days + 1):
+        date = datetime(year, month_index, day).date()
+        day_of_week = date.weekday() # Monday is 0, Sunday is 6
+        
+        if day_of_week == 0:
+            week_start_date = date
+        
+        if day_of_week == 4 and week_start_date:
+            week_end_date = date
+            weeks.append(F"Week {week_counter} ({week_start_date.strftime('%Y-%m-%d')} to {week_end_date.strftime('%Y-%m-%d')})")
+            week_counter += 1
+            week_start_date = None
+            
+        elif day == num_days and week_start_date and day_of_week in [0, 1, 2, 3]: 
+            weeks.append(F"Week {week_counter} ({week_start_date.strftime('%Y-%m-%d')} to {date.strftime('%Y-%m-%d')})")
+            
+    return ["All Weeks"] + weeks
+
+# NEW HELPER: Get all working days in a selected month or week
+def get_days_in_period(year, month_name, week_str):
+    """Calculates all working days (Mon-Fri) for a given month or selected week."""
+    try:
+        month_index = MONTH_NAMES.index(month_name) + 1
+    except ValueError:
+        return ["All Days"] 
+        
+    days = []
+    
+    if week_str != "All Weeks":
+        # Specific Week selected: derive days from the week string
+        try:
+            start_date_str = week_str.split('(')[1].split(' to ')[0]
+            end_date_str = week_str.split(' to ')[1].replace(')', '')
+            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
+            
+            current_date = start_date
+            while current_date <= end_date:
+                # Check if it's a working day (Monday=0 to Friday=4)
+                if current_date.weekday() < 5:
+                    days.append(current_date.strftime('%Y-%m-%d'))
+                current_date += timedelta(days=1)
+        except Exception:
+            # Fallback if parsing fails
+            return ["All Days"] 
+
+    else:
+        # All Weeks selected: derive all working days for the whole month
+        num_days = calendar.monthrange(year, month_index)[1]
+        for day in range(1, num_days + 1):
+            date = datetime(year, month_index, day).date()
+            # Check if it's a working day (Monday=0 to Friday=4)
+            if date.weekday() < 5:
+                days.append(date.strftime('%Y-%m-%d'))
+                
+    return ["All Days"] + days
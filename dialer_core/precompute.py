@@ -0,0 +1,196 @@
+"""
+Batch precompute of every single-month filter combination.
+
+For each page, year, month, week, day and attended dialer the KPI tuple the page
+would compute is materialized into a small Parquet store, together with the
+(Date, dialer) trend points. The work is vectorized across combinations: each
+month is reduced once to per-day aggregate matrices (`dialer_core.aggregates`),
+and a 0/1 period-membership matrix turns them into the totals and distinct-day
+counts for every (week, day) choice and every dialer in one matrix product. Months
+are independent and run in a process pool.
+
+    python -m dialer_core.precompute --data-dir . --out precomputed --workers 4
+
+The dashboard opens the store through `PrecomputedStore.open`, which only accepts
+it while `loading.data_version()` still matches; any selection the store does not
+cover (several months, stale data, an unexpected table shape) is computed live.
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from dialer_core import aggregates, loading
+from dialer_core.config import MONTH_NAMES, YEARS
+from dialer_core.kpis import get_attended_dialers
+from dialer_core.periods import get_days_in_period, get_weeks_in_month
+
+PRECOMPUTED_DIR = os.environ.get("DIALERS_PRECOMPUTED_DIR", "precomputed")
+
+KEY_COLUMNS = ['year', 'month', 'week', 'day', 'dialer']
+# Bumped when a stored KPI changes meaning (2: Others counts distinct leads, 3: distinct
+# within each selection), so older stores are not used
+STORE_FORMAT = 3
+
+
+def period_choices(year, month):
+    """Every (week, day) pair the sidebar can produce for one month."""
+    month_name = MONTH_NAMES[month - 1]
+    choices = []
+    for week in get_weeks_in_month(year, month_name):
+        choices += [(week, day) for day in get_days_in_period(year, month_name, week)]
+    return choices
+
+
+def month_kpis(year, month, daily, dialer_options):
+    """
+    KPI rows for every (week, day, dialer) of one month, per page, plus the month's
+    trend points. `daily` is the output of aggregates.daily_aggregates.
+    """
+    result = {}
+    for page, df in aggregates.combination_kpis(daily, period_choices(year, month), dialer_options).items():
+        df.insert(0, 'month', month)
+        df.insert(0, 'year', year)
+        result[F"{page}_kpis"] = df
+    for page in aggregates.PAGES:
+        trend = aggregates.trend_points(daily, page)
+        trend.insert(0, 'month', month)
+        trend.insert(0, 'year', year)
+        result[F"{page}_trend"] = trend
+    return result
+
+
+def _compute_month(job):
+    year, month, part, dialer_options = job
+    return month_kpis(year, month, aggregates.daily_aggregates(part), dialer_options)
+
+
+def build_store(data_dir="./", out=PRECOMPUTED_DIR, years=None, workers=None):
+    """
+    Computes every combination for `years` (default: YEARS) from the files in
+    `data_dir` and writes the store to `out`. Returns the meta dict it wrote.
+    """
+    started = time.perf_counter()
+    years = list(years or YEARS)
+    version = loading.data_version(data_dir)
+    df_attendance, df_sales, df_oplans, df_others, df_sheet2 = loading.load_raw_data(data_dir)
+    tables = aggregates.prepare_tables(df_attendance, df_sales, df_oplans, df_others, df_sheet2)
+
+    jobs = [
+        (year, month, aggregates.month_partition(tables, year, month), get_attended_dialers(df_attendance, year, [month]))
+        for year in years for month in range(1, 13)
+    ]
+    if workers == 1:
+        parts = [_compute_month(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_compute_month, jobs))
+
+    # Write next to the target and swap in, so a running dashboard never reads a half-written store
+    tmp = out.rstrip('/\\') + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    rows = {}
+    for name in parts[0]:
+        df = pd.concat([p[name] for p in parts], ignore_index=True)
+        df.to_parquet(os.path.join(tmp, F"{name}.parquet"), index=False)
+        rows[name] = len(df)
+    meta = {
+        'data_version': version,
+        'format': STORE_FORMAT,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'years': years,
+        'rows': rows,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+    with open(os.path.join(tmp, "meta.json"), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    old = out.rstrip('/\\') + ".old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(out):
+        os.replace(out, old)
+    os.replace(tmp, out)
+    shutil.rmtree(old, ignore_errors=True)
+    return meta
+
+
+class PrecomputedStore:
+    """Read side of the store: KPI tuples by (year, month, week, day, dialer) and trend slices."""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+        self._kpis = {}
+        self._trends = {}
+        for page in aggregates.PAGES:
+            df = pd.read_parquet(os.path.join(directory, F"{page}_kpis.parquet"))
+            keys = zip(*(df[c].tolist() for c in KEY_COLUMNS))
+            values = zip(*(df[c].tolist() for c in aggregates.KPI_COLUMNS[page]))
+            self._kpis[page] = dict(zip(keys, values))
+
+            trend = pd.read_parquet(os.path.join(directory, F"{page}_trend.parquet"))
+            trend['Date'] = trend['Date'].astype('datetime64[ns]')
+            self._trends[page] = {
+                (year, month): group.drop(columns=['year', 'month']).reset_index(drop=True)
+                for (year, month), group in trend.groupby(['year', 'month'])
+            }
+
+    @classmethod
+    def open(cls, directory=PRECOMPUTED_DIR, version=None):
+        """The store in `directory`, or None if there is none, it has an older format or it was built from other data."""
+        try:
+            store = cls(directory)
+        except (OSError, ValueError, KeyError):
+            return None
+        if store.meta.get('format') != STORE_FORMAT:
+            return None
+        if version is not None and store.meta.get('data_version') != version:
+            return None
+        return store
+
+    def lookup(self, page, year, month_index, dialer, week_str, day_str):
+        """
+        The page's KPI tuple (trend first, as the live functions return it) for a
+        single-month selection, or None when the store does not cover it.
+        """
+        if isinstance(month_index, (list, tuple, set)):
+            if len(month_index) != 1:
+                return None
+            month_index = next(iter(month_index))
+        if not isinstance(dialer, str):
+            return None
+        try:
+            key = (int(year), int(month_index), week_str, day_str, dialer)
+        except (TypeError, ValueError):
+            return None
+        values = self._kpis[page].get(key)
+        if values is None:
+            return None
+
+        trend = aggregates.slice_trend(self._trends[page].get(key[:2]), page, dialer, week_str, day_str)
+        return aggregates.kpi_tuple(page, values, trend)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute every single-month filter combination's KPIs.")
+    parser.add_argument('--data-dir', default="./", help="folder holding the xlsx/csv source files")
+    parser.add_argument('--out', default=PRECOMPUTED_DIR)
+    parser.add_argument('--years', type=int, nargs='+', default=YEARS)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count, 1 = inline)")
+    args = parser.parse_args(argv)
+
+    meta = build_store(args.data_dir, args.out, args.years, args.workers)
+    size = sum(os.path.getsize(os.path.join(args.out, f)) for f in os.listdir(args.out))
+    print(F"Wrote {args.out}/ ({size / 1024:.0f} KB) in {meta['seconds']} s for data version {meta['data_version']}")
+    for name, n in meta['rows'].items():
+        print(F"  {name:<14} {n:>9} rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Background cache prewarming for the dashboard.
+
+A `Prewarmer` runs one daemon thread per server process. Whenever the data version
+changes (the first check happens right after the thread starts), it computes the
+default view of every page (November, All Weeks, All Dialers) and the most
+visited views through a callback the dashboard supplies, so those selections are
+already in the shared result and figure caches when a manager opens them.
+
+Visits are counted per view in a `VisitLog`, which is saved as JSON
+(`DIALERS_VISITS_FILE`) so the most visited views are still known after a restart.
+`DIALERS_PREWARM=0` switches prewarming off, `DIALERS_PREWARM_TOP` sets how many
+visited views are warmed and `DIALERS_PREWARM_INTERVAL` how often (seconds) the data
+version is checked.
+
+A view is the tuple (page, year, months, dialer, week, day) with `months` a tuple.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+from dialer_core import aggregates, perf
+from dialer_core.config import YEARS
+
+PREWARM_ENABLED = os.environ.get("DIALERS_PREWARM", "1") != "0"
+PREWARM_TOP = int(os.environ.get("DIALERS_PREWARM_TOP", "10"))
+PREWARM_INTERVAL = float(os.environ.get("DIALERS_PREWARM_INTERVAL", "60"))
+VISITS_FILE = os.environ.get("DIALERS_VISITS_FILE", "view_visits.json")
+
+# The selection each page opens with (see the sidebar defaults)
+DEFAULT_YEAR = 2025 if 2025 in YEARS else YEARS[0]
+DEFAULT_MONTH = 11
+
+
+def default_views():
+    return [(page, DEFAULT_YEAR, (DEFAULT_MONTH,), "All Dialers", "All Weeks", "All Days") for page in aggregates.PAGES]
+
+
+class VisitLog:
+    """Thread-safe visit counts per view, persisted to `path`."""
+
+    def __init__(self, path=VISITS_FILE):
+        self.path = path
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            with open(path) as f:
+                for row in json.load(f):
+                    page, year, months, dialer, week, day, count = row
+                    self._counts[(page, year, tuple(months), dialer, week, day)] = count
+        except (OSError, ValueError, TypeError):
+            pass
+
+    def record(self, page, year, months, dialer, week, day):
+        view = (page, int(year), tuple(int(m) for m in months), dialer, week, day)
+        with self._lock:
+            self._counts[view] += 1
+            self._dirty = True
+
+    def top(self, n):
+        with self._lock:
+            return [view for view, _ in self._counts.most_common(n)]
+
+    def save(self):
+        """Writes the counts if they changed since the last save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            rows = [[*view[:2], list(view[2]), *view[3:], count] for view, count in self._counts.most_common()]
+            self._dirty = False
+        tmp = F"{self.path}.tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(rows, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+class Prewarmer:
+    """
+    Daemon thread calling `warm_view(view)` for the default and top visited views
+    each time `version_fn()` returns a new data version.
+    """
+
+    def __init__(self, warm_view, version_fn, visits, top=PREWARM_TOP, interval=PREWARM_INTERVAL):
+        self.warm_view = warm_view
+        self.version_fn = version_fn
+        self.visits = visits
+        self.top = top
+        self.interval = interval
+        self.warmed_version = None
+        self.last_run = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="dialers-prewarm", daemon=True)
+            self._thread.start()
+            atexit.register(self.visits.save)
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def views(self):
+        views = default_views()
+        return views + [v for v in self.visits.top(self.top) if v not in views]
+
+    def warm(self, version):
+        """Warms every view once; returns the record it logs."""
+        started = time.perf_counter()
+        views = self.views()
+        errors = []
+        for view in views:
+            try:
+                self.warm_view(view)
+            except Exception as E:  # one bad view must not stop the others
+                errors.append(F"{view}: {E}")
+        self.warmed_version = version
+        self.last_run = {
+            'event': 'prewarm',
+            'ts': round(time.time(), 3),
+            'pid': os.getpid(),
+            'data_version': version,
+            'views': len(views),
+            'errors': errors,
+            'ms': round((time.perf_counter() - started) * 1000, 2),
+        }
+        perf.logger.info(json.dumps(self.last_run))
+        return self.last_run
+
+    def _run(self):
+        while not self._stop.is_set():
+            version = self.version_fn()
+            if version != self.warmed_version:
+                self.warm(version)
+            self.visits.save()
+            self._stop.wait(self.interval)
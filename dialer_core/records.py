@@ -0,0 +1,135 @@
+"""
+Raw-record drill-down: the rows behind a point of a trend chart, a page at a time.
+
+Each prepared lead table (`aggregates.prepare_tables`) is indexed once per data
+version by day and dialer (`RecordIndex`). The row positions are sorted by
+(day, dialer, created time), and each position's day number * dialers + dialer
+code is kept as a sorted int64 key. The rows of one day, or of one day and dialer,
+are then one contiguous run of positions, found with `numpy.searchsorted`. A
+selection (its day numbers and an optional dialer) becomes a position array without
+scanning the table.
+
+Only position arrays are built for a selection. Search and sort read just the
+columns they need at those positions. A page of rows is `iloc` on at most
+`DIALERS_DRILLDOWN_ROWS` positions, so opening "All Dialers" over a full year
+neither copies the table nor sends more than one page to the browser.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from dialer_core import aggregates
+from dialer_core.aggregates import NO_DIALER
+from dialer_core.config import DATE_COLUMN_SALES, DIALER_COLUMN
+
+# page -> prepared table whose rows its trend counts
+DRILLDOWN_TABLES = {'sales': 'sales', 'oplans': 'oplans', 'others': 'others'}
+PAGE_ROWS = int(os.environ.get("DIALERS_DRILLDOWN_ROWS", "50"))
+
+
+class RecordIndex:
+    """Row positions of one prepared table sorted by (day, dialer, created time), with their day/dialer keys."""
+
+    def __init__(self, df, date_col=DATE_COLUMN_SALES):
+        self.df = df
+        self.date_col = date_col
+        if date_col in df.columns:
+            minutes = df[date_col].to_numpy(dtype='datetime64[m]').astype(np.int64)
+        else:
+            minutes = np.zeros(len(df), dtype=np.int64)
+        day = minutes // (24 * 60)
+        if DIALER_COLUMN in df.columns and len(df):
+            codes, names = aggregates.dialer_codes(df)
+        else:
+            codes, names = np.zeros(len(df), dtype=np.int64), [NO_DIALER]
+        self.dialers = list(names)
+        self.order = np.lexsort((minutes, codes, day))
+        self.key = day[self.order] * len(self.dialers) + codes[self.order]
+        self._codes = {}
+
+    def positions(self, days, dialer="All Dialers"):
+        """Row positions on the day numbers `days` (all rows, or one dialer's), in (day, dialer, time) order."""
+        days = np.unique(np.asarray(days, dtype=np.int64))
+        n = len(self.dialers)
+        if dialer == "All Dialers":
+            lo, hi = days * n, (days + 1) * n
+        else:
+            name = dialer.strip().upper()
+            if name not in self.dialers:
+                return np.zeros(0, dtype=np.int64)
+            lo = days * n + self.dialers.index(name)
+            hi = lo + 1
+        starts = np.searchsorted(self.key, lo, side='left')
+        lengths = np.searchsorted(self.key, hi, side='left') - starts
+        # Expand the runs [start, start + length) into one index array
+        run = np.repeat(np.arange(len(starts)), lengths)
+        within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return self.order[starts[run] + within]
+
+    def codes(self, column):
+        """(codes, sorted distinct values) of `column`, factorized on first use; code -1 is an empty value."""
+        if column not in self._codes:
+            values = self.df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                self._codes[column] = aggregates.sorted_codes(values)
+                return self._codes[column]
+            try:
+                self._codes[column] = pd.factorize(values, sort=True)
+            except TypeError:  # mixed types in an object column
+                self._codes[column] = pd.factorize(values.astype(str).where(values.notna()), sort=True)
+        return self._codes[column]
+
+    def search(self, positions, term):
+        """The `positions` whose text columns contain `term` (case-insensitive)."""
+        term = term.strip()
+        if not term or not len(positions):
+            return positions
+        found = np.zeros(len(positions), dtype=bool)
+        for column in self.df.columns:
+            dtype = self.df[column].dtype
+            if not (pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype)):
+                continue
+            codes, uniques = self.codes(column)
+            # Match the distinct values once, then look the rows' codes up
+            matches = pd.Series(uniques).astype(str).str.contains(term, case=False, regex=False).to_numpy()
+            if matches.any():
+                row_codes = codes[positions]
+                found |= (row_codes >= 0) & matches[row_codes]
+        return positions[found]
+
+    def sort(self, positions, column, ascending=True):
+        """`positions` ordered by `column` (stable, empty values last)."""
+        if column is None or not len(positions):
+            return positions
+        codes = self.codes(column)[0][positions]
+        # Sorted codes order the values; ties keep their index order either way
+        order = np.argsort(codes if ascending else -codes, kind='stable')
+        missing = codes[order] < 0
+        return positions[np.concatenate([order[~missing], order[missing]])]
+
+    def page(self, positions, number, rows=PAGE_ROWS):
+        """Rows of page `number` (from 1) of `positions`."""
+        start = (max(int(number), 1) - 1) * rows
+        return self.df.iloc[positions[start:start + rows]]
+
+
+def page_count(positions, rows=PAGE_ROWS):
+    """Pages needed for `positions` (at least 1)."""
+    return max(1, -(-len(positions) // rows))
+
+
+def bucket_days(days, resolution):
+    """
+    {bucket start day: day numbers} of `days`, in order: one bucket per day, per
+    week (Monday start) or per calendar month, like charts.rollup_trend.
+    """
+    days = np.asarray(days, dtype=np.int64)
+    if resolution == "Weekly":
+        # 1970-01-01 was a Thursday: (days + 3) % 7 is 0 on Mondays
+        starts = days - (days + 3) % 7
+    elif resolution == "Monthly":
+        starts = days.astype('datetime64[D]').astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+    else:
+        starts = days
+    return {int(s): days[starts == s] for s in dict.fromkeys(starts.tolist())}
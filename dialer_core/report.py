@@ -0,0 +1,261 @@
+"""
+Batch HTML snapshots of the Sales, Oplans and Others pages, for the weekly
+leadership pack, rendered without the live dashboard.
+
+    python -m dialer_core.report --data-dir . --out reports --year 2025 --periods 10 11 10,11 --dialers all
+
+One snapshot per (period, dialer) holds the three pages' KPI cards and trend charts
+at their automatic resolution. The data is loaded once (through a `KpiEngine`, so
+the shared Arrow dataset is used when present) and every period is aggregated in a
+single pass: `aggregates.combination_kpis` gives all pages' KPIs for all the
+period's dialers at once, exactly as for the precomputed store. The figures are
+then built and the files written in a process pool.
+
+Plotly's JavaScript is written once as `plotly.min.js` next to the snapshots, which
+reference it, so the output folder is self-contained and can be zipped and sent
+as is; `--inline-plotly` embeds it in every file instead, for single-file
+attachments. An `index.html` links every snapshot.
+"""
+import argparse
+import html
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from dialer_core import aggregates
+from dialer_core.config import MONTH_NAMES
+from dialer_core.engine import KpiEngine, kpi_values
+from dialer_core.prewarm import DEFAULT_MONTH, DEFAULT_YEAR
+from dialer_core.service import BadRequest, _parse_months
+
+REPORT_DIR = os.environ.get("DIALERS_REPORT_DIR", "reports")
+PLOTLY_JS_NAME = "plotly.min.js"
+
+# page -> (heading, trend chart title, trend_figure options, [(KPI column, card label, suffix)])
+# The cards are the ones each page shows, in the page's order
+PAGE_LAYOUT = {
+    'sales': ("Sales Performance", "Sales Count", {}, [
+        ('total_sales_count', "Total Sales Count", ""),
+        ('avg_sales_per_day', "Average Sales per day", ""),
+        ('avg_att_per_dialer', "Avg Attendance per Dialer", ""),
+        ('avg_att_per_day', "Avg Attendance per day", ""),
+    ]),
+    'oplans': ("Oplans Performance", "Oplans Count", {'label_colors': True}, [
+        ('avg_oplans_per_day', "Average Oplans per day", ""),
+        ('transfer_ratio_pct', "Transfer Ratio", "%"),
+        ('total_oplans_count', "Total Oplans Count", ""),
+        ('avg_att_per_day', "Average Attendance per day", ""),
+    ]),
+    'others': ("Others Performance", "Others Count", {}, [
+        ('others_percentage', "Others %", "%"),
+        ('avg_others_per_day', "Average Others per day", ""),
+        ('avg_checks_per_agent_display', "Average checks per agent", ""),
+        ('avg_att_per_day', "Average Attendance per day", ""),
+    ]),
+}
+
+REPORT_CSS = """
+body { background: #000000; color: #ffffff; font-family: "Source Sans Pro", Arial, sans-serif; margin: 24px; }
+h1 { margin: 0 0 4px 0; }
+.meta { color: #bfb7b3; margin-bottom: 18px; }
+.dashboard-container { background: #2b2a2a; padding: 18px; border-radius: 18px; margin-bottom: 24px;
+                       box-shadow: 0 6px 18px rgba(0,0,0,0.6); display: flex; gap: 18px; }
+.chart { flex: 5; min-width: 0; }
+.cards { flex: 1; min-width: 190px; }
+.chart-title-p { font-size: 22px; font-weight: 700; margin: 0 0 12px 0; text-align: center; }
+.kpi-card-red { background: #ff6a3d; padding: 18px; border-radius: 18px; text-align: center; margin: 12px auto;
+                font-weight: bold; box-shadow: 0 8px 18px rgba(0,0,0,0.55); }
+.kpi-card-red h3 { font-size: 18px; margin: 0 0 8px 0; }
+.kpi-card-red p { font-size: 30px; margin: 0; font-weight: 800; text-decoration: underline; text-underline-offset: 6px; }
+a { color: #ff6a3d; }
+"""
+
+
+def period_label(months):
+    return ", ".join(MONTH_NAMES[m - 1] for m in sorted(set(months)))
+
+
+def snapshot_filename(year, months, dialer):
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', dialer).strip('-').lower() or "dialer"
+    return F"{year}_{'-'.join(F'{m:02d}' for m in sorted(set(months)))}_{slug}.html"
+
+
+# --- DATA ---
+
+def period_snapshots(engine, year, months, dialers=None):
+    """
+    [(dialer, {page: KPI tuple or None})] for one period: "All Dialers" and each
+    attended dialer (or only those in `dialers`), from one aggregation pass over the
+    period. None marks a page the dashboard cannot compute for that selection.
+    """
+    months = sorted(set(months))
+    options = list(engine.dialers(year, months))
+    if dialers is not None:
+        wanted = {d.strip().upper() for d in dialers} | {"ALL DIALERS"}
+        options = [d for d in options if d.upper() in wanted]
+    names = [d for d in options if d != "All Dialers"]
+
+    tables = engine.tables()
+    if tables is None:
+        combos = trends = None
+    else:
+        daily = aggregates.merge_daily([aggregates.daily_aggregates(aggregates.month_partition(tables, year, m)) for m in months])
+        combos = aggregates.combination_kpis(daily, [("All Weeks", "All Days")], ["All Dialers"] + names)
+        trends = {page: aggregates.trend_points(daily, page) for page in aggregates.PAGES}
+
+    snapshots = []
+    for dialer in options:
+        pages = {}
+        for page in aggregates.PAGES:
+            rows = None if combos is None else combos[page][combos[page]['dialer'] == dialer]
+            if rows is None or rows.empty:
+                # Selections the combined pass leaves to the live page (see combination_kpis);
+                # None when the live page fails on them too (no attendance to divide by)
+                try:
+                    pages[page] = engine.page_kpis(page, year, months, dialer)
+                except ZeroDivisionError:
+                    pages[page] = None
+                continue
+            values = list(rows[aggregates.KPI_COLUMNS[page]].iloc[0])
+            trend = aggregates.slice_trend(trends[page], page, dialer, "All Weeks", "All Days")
+            pages[page] = aggregates.kpi_tuple(page, values, trend)
+        snapshots.append((dialer, pages))
+    return snapshots
+
+
+# --- RENDERING ---
+
+def _page_section(charts, page, result, label, year):
+    heading, y_title, options, cards = PAGE_LAYOUT[page]
+    if result is None:
+        return F'<h2>{heading}</h2><div class="dashboard-container"><p class="meta">No attendance recorded for this selection.</p></div>'
+    df_trend = result[0]
+    values = kpi_values(page, result)
+    if df_trend.empty:
+        resolution = "Daily"
+        chart = F'<p class="meta">No {page} data found for the selected period ({html.escape(label)}).</p>'
+    else:
+        resolution = charts.resolve_granularity(df_trend, "Auto")
+        y_col = aggregates.TREND_SOURCES[page][1]
+        fig = charts.trend_figure(df_trend, y_col, y_title, granularity=resolution, **options)
+        chart = fig.to_html(full_html=False, include_plotlyjs=False, config={'displayModeBar': False})
+    card_html = "".join(
+        F'<div class="kpi-card-red"><h3>{html.escape(name)}</h3><p>{html.escape(str(values.get(col, "")))}{suffix}</p></div>'
+        for col, name, suffix in cards
+    )
+    return (
+        F'<h2>{heading}</h2><div class="dashboard-container">'
+        F'<div class="chart"><p class="chart-title-p">{resolution} {y_title} Trend in {html.escape(label)} {year}</p>{chart}</div>'
+        F'<div class="cards"><p class="chart-title-p">KPI calculations in {html.escape(label)} {year}</p>{card_html}</div>'
+        F'</div>'
+    )
+
+
+def render_snapshot(job):
+    """Builds and writes one snapshot file; returns (file name, bytes written). Runs in the worker processes."""
+    out, filename, year, months, dialer, pages, plotly_script, generated = job
+    from dialer_core import charts
+
+    label = period_label(months)
+    sections = "".join(_page_section(charts, page, pages[page], label, year) for page in aggregates.PAGES)
+    if plotly_script is None:
+        from plotly.offline import get_plotlyjs
+        plotly_script = F'<script type="text/javascript">{get_plotlyjs()}</script>'
+    document = (
+        F'<!DOCTYPE html><html><head><meta charset="utf-8">'
+        F'<title>{html.escape(dialer)} - {html.escape(label)} {year}</title><style>{REPORT_CSS}</style>{plotly_script}</head>'
+        F'<body><h1>Dialers Performance: {html.escape(dialer)}</h1>'
+        F'<p class="meta">{html.escape(label)} {year} &middot; generated {generated}</p>{sections}</body></html>'
+    ).encode()
+    path = os.path.join(out, filename)
+    tmp = F"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(document)
+    os.replace(tmp, path)
+    return filename, len(document)
+
+
+def _write_index(out, entries, generated):
+    rows = "".join(
+        F'<li><a href="{html.escape(filename)}">{html.escape(period_label(months))} {year} &middot; {html.escape(dialer)}</a></li>'
+        for filename, year, months, dialer in entries
+    )
+    with open(os.path.join(out, "index.html"), 'w', encoding='utf-8') as f:
+        f.write(F'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Dialers Performance snapshots</title>'
+                F'<style>{REPORT_CSS}</style></head><body><h1>Dialers Performance snapshots</h1>'
+                F'<p class="meta">generated {generated}</p><ul>{rows}</ul></body></html>')
+
+
+def build_reports(data_dir="./", out=REPORT_DIR, year=DEFAULT_YEAR, periods=None, dialers=None, workers=None, inline_plotly=False):
+    """
+    Writes the snapshots of every period in `periods` (lists of months; default:
+    the dashboard's default month) for "All Dialers" and every attended dialer
+    (or only `dialers`) to `out`. Returns a summary dict.
+    """
+    started = time.perf_counter()
+    periods = periods or [[DEFAULT_MONTH]]
+    engine = KpiEngine(data_dir)
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M')
+    os.makedirs(out, exist_ok=True)
+
+    if inline_plotly:
+        plotly_script = None
+    else:
+        from plotly.offline import get_plotlyjs
+        with open(os.path.join(out, PLOTLY_JS_NAME), 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+        plotly_script = F'<script src="{PLOTLY_JS_NAME}"></script>'
+
+    jobs, entries = [], []
+    for months in periods:
+        months = sorted(set(months))
+        for dialer, pages in period_snapshots(engine, year, months, dialers):
+            filename = snapshot_filename(year, months, dialer)
+            jobs.append((out, filename, year, months, dialer, pages, plotly_script, generated))
+            entries.append((filename, year, months, dialer))
+    compute_seconds = time.perf_counter() - started
+
+    if workers == 1 or len(jobs) < 2:
+        written = [render_snapshot(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            written = list(pool.map(render_snapshot, jobs))
+    _write_index(out, entries, generated)
+    return {
+        'data_version': engine.version(),
+        'snapshots': len(written),
+        'bytes': sum(size for _, size in written),
+        'compute_seconds': round(compute_seconds, 2),
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+
+def _period(value):
+    try:
+        return _parse_months(value)
+    except BadRequest as E:
+        raise argparse.ArgumentTypeError(str(E))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render static HTML snapshots of the three pages per period and dialer.")
+    parser.add_argument('--data-dir', default="./", help="folder holding the xlsx/csv source files")
+    parser.add_argument('--out', default=REPORT_DIR)
+    parser.add_argument('--year', type=int, default=DEFAULT_YEAR)
+    parser.add_argument('--periods', type=_period, nargs='+', default=None,
+                        help="one period per argument: a month (11, nov) or several months together (10,11)")
+    parser.add_argument('--dialers', nargs='+', default=['all'], help="dialer names, or 'all' for every attended dialer")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes for rendering (default: CPU count, 1 = inline)")
+    parser.add_argument('--inline-plotly', action='store_true', help="embed plotly.js in every file instead of one shared copy")
+    args = parser.parse_args(argv)
+
+    dialers = None if [d.lower() for d in args.dialers] == ['all'] else args.dialers
+    meta = build_reports(args.data_dir, args.out, args.year, args.periods, dialers, args.workers, args.inline_plotly)
+    print(F"Wrote {meta['snapshots']} snapshots ({meta['bytes'] / 1024:.0f} KB) to {args.out}/ in {meta['seconds']} s "
+          F"({meta['compute_seconds']} s computing) for data version {meta['data_version']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,425 @@
+"""
+Local HTTP/JSON service for the dashboard's KPIs, for wallboards and reporting
+scripts that would otherwise scrape the Streamlit app.
+
+    python -m dialer_core.service --port 8601 --data-dir .
+
+Routes (GET only):
+
+    /health                      {"status": "ok", "data_version": ...}
+    /dialers?year=&months=       the dialer options of a month selection
+    /kpis/<page>?year=&months=&week=&day=&dialer=
+                                 one page's KPIs and trend ('sales', 'oplans' or 'others')
+    /kpis?...                    the three pages at once
+    /export/<table>?format=&...  the filtered rows behind a page ('sales', 'oplans',
+                                 'others' or 'attendance') as a file download
+    /export/kpis/<page>?format=&...
+                                 the page's KPIs for every dialer of the selection
+
+`months` takes month numbers or names (or their first three letters) separated by commas (default: November of
+the dashboard's default year); `week`, `day` and `dialer` take the sidebar's labels
+and default to "All Weeks", "All Days" and "All Dialers". As in the sidebar, week
+and day are ignored when several months are selected. `format` is 'csv' (default),
+'parquet' or 'xlsx'; exports are streamed with chunked transfer encoding as
+`dialer_core.export` produces them and are never cached.
+
+The server is a single asyncio event loop; the pandas work runs in a thread pool so
+slow selections do not hold up other clients. Responses carry the data version as
+their ETag, and a valid request whose If-None-Match still matches gets a 304
+(without any computation when its response is cached). Response bodies are kept in a small LRU per data version, so
+wallboards polling the same URL share one computation.
+
+Run standalone, the service computes through a `KpiEngine` (shared Arrow dataset,
+precomputed store, its own result cache). The dashboard can also run it in a
+background thread (`DIALERS_API_PORT`) on top of its own cached functions, so the
+service and the pages share one result cache. Only one process serves a port: the
+first to take its lock file (`DIALERS_API_LOCK_DIR`), the others leave the port alone.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import MAXYEAR, MINYEAR
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from dialer_core import aggregates, cache, export, parallel, perf
+from dialer_core.config import DIALER_COLUMN, MONTH_NAMES
+from dialer_core.engine import KpiEngine, kpi_values
+from dialer_core.periods import get_days_in_period, get_weeks_in_month
+from dialer_core.precompute import PRECOMPUTED_DIR
+from dialer_core.prewarm import DEFAULT_MONTH, DEFAULT_YEAR
+
+API_HOST = os.environ.get("DIALERS_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("DIALERS_API_PORT", "0"))
+API_THREADS = int(os.environ.get("DIALERS_API_THREADS", "8"))
+# Lock files deciding which process owns a port (one per host and port)
+API_LOCK_DIR = os.environ.get("DIALERS_API_LOCK_DIR", tempfile.gettempdir())
+RESPONSE_CACHE_SIZE = 256
+KEEP_ALIVE_SECONDS = 15
+MAX_HEADER_LINES = 100
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class BadRequest(Exception):
+    """Invalid query parameters; the message is returned to the client."""
+
+
+# --- QUERY PARSING ---
+
+def _parse_months(value):
+    months = []
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if part.isdigit() and 1 <= int(part) <= 12:
+            months.append(int(part))
+        else:
+            # Full names or unambiguous prefixes ("Nov", "november")
+            matches = [i for i, name in enumerate(MONTH_NAMES, 1) if len(part) >= 3 and name.lower().startswith(part.lower())]
+            if len(matches) != 1:
+                raise BadRequest(F"Unknown month: {part}")
+            months.append(matches[0])
+    if not months:
+        raise BadRequest("No month selected")
+    return sorted(set(months))
+
+
+def parse_selection(query, source=None):
+    """
+    (year, months, dialer, week, day) from a parsed query string, with the sidebar's
+    defaults. Week and day must be options of the month's sidebar, and the dialer one
+    of `source.dialers(year, months)` when a source is given.
+    """
+    def one(name, default):
+        values = query.get(name)
+        return values[-1] if values else default
+
+    try:
+        year = int(one('year', DEFAULT_YEAR))
+    except ValueError:
+        raise BadRequest("year must be a number")
+    if not MINYEAR <= year <= MAXYEAR:
+        raise BadRequest(F"year out of range: {year}")
+    months = _parse_months(one('months', str(DEFAULT_MONTH)))
+    dialer = one('dialer', "All Dialers")
+    week, day = one('week', "All Weeks"), one('day', "All Days")
+    if len(months) > 1:
+        week, day = "All Weeks", "All Days"
+    else:
+        month_name = MONTH_NAMES[months[0] - 1]
+        if week not in get_weeks_in_month(year, month_name):
+            raise BadRequest(F"Unknown week for {month_name} {year}: {week}")
+        if day not in get_days_in_period(year, month_name, week):
+            raise BadRequest(F"Unknown day for {week}: {day}")
+    if source is not None and dialer not in source.dialers(year, months):
+        raise BadRequest(F"Unknown dialer for the selected months: {dialer}")
+    return year, months, dialer, week, day
+
+
+# --- JSON ---
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d')
+    raise TypeError(F"Not JSON serializable: {type(value).__name__}")
+
+
+def trend_records(df_trend):
+    """The trend frame as [{"date": "YYYY-MM-DD", "dialer": ..., "<count column>": n}]."""
+    if df_trend is None or df_trend.empty:
+        return []
+    df = df_trend.rename(columns={'Date': 'date', DIALER_COLUMN: 'dialer'})
+    df = df.assign(date=pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d'))
+    return df.to_dict('records')
+
+
+def page_payload(page, result):
+    return {'kpis': kpi_values(page, result), 'trend': trend_records(result[0])}
+
+
+# --- SERVER ---
+
+class KpiService:
+    """
+    Answers the routes above from `source`, any object with `version()`,
+    `dialers(year, months)`, `page_kpis(page, year, months, dialer, week, day)` and,
+    for exports, `tables()` (a KpiEngine, or the dashboard's cached functions).
+    """
+
+    def __init__(self, source, threads=API_THREADS):
+        self.source = source
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="dialers-api")
+        self.responses = cache.LRUCache(max_entries=RESPONSE_CACHE_SIZE)
+
+    def build(self, path, query, version):
+        """(status, payload) for one request, computed on a worker thread."""
+        parts = [p for p in path.split('/') if p]
+        if parts == ['health']:
+            return 200, {'status': 'ok', 'data_version': version}
+        if parts != ['dialers'] and not (parts and parts[0] == 'kpis' and len(parts) <= 2):
+            return 404, {'error': F"Unknown path: {path}"}
+        pages = parts[1:] or list(aggregates.PAGES)
+        if parts[0] == 'kpis' and pages[0] not in aggregates.PAGES:
+            return 404, {'error': F"Unknown page: {pages[0]}"}
+        try:
+            # The dialer options are what /dialers answers, so only the KPI routes check the dialer
+            year, months, dialer, week, day = parse_selection(query, self.source if parts[0] == 'kpis' else None)
+        except BadRequest as E:
+            return 400, {'error': str(E)}
+        selection = {'year': year, 'months': months, 'dialer': dialer, 'week': week, 'day': day}
+
+        if parts == ['dialers']:
+            return 200, {**selection, 'data_version': version, 'dialers': list(self.source.dialers(year, months))}
+        payload = {**selection, 'data_version': version}
+        for page in pages:
+            try:
+                payload[page] = page_payload(page, self.source.page_kpis(page, year, months, dialer, week, day))
+            except ZeroDivisionError:
+                # As on the dashboard: no attendance in the selection to divide by
+                payload[page] = {'kpis': None, 'trend': [], 'error': "No attendance for this selection"}
+        return 200, payload
+
+    def respond(self, path, query, if_none_match=None):
+        """
+        (status, body bytes, etag) for a GET, from the response cache when possible.
+        A valid request whose `if_none_match` is the current ETag gets a 304; only
+        200 responses are cached, so a cached entry is a validated one.
+        """
+        version = self.source.version()
+        etag = F'"{version}"'
+        key = (version, path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+        response = self.responses.get(key)
+        if response is None:
+            try:
+                status, payload = self.build(path, query, version)
+            except Exception as E:
+                perf.logger.exception("KPI service request failed: %s", path)
+                return 500, json.dumps({'error': str(E)}).encode(), None
+            body = json.dumps(payload, default=_json_default).encode()
+            if status != 200:
+                return status, body, None
+            response = (status, body, etag)
+            self.responses.put(key, response)
+        if if_none_match == etag:
+            return 304, b"", etag
+        return response
+
+    def open_export(self, path, query):
+        """(format, file name, byte block iterator) for an /export request; raises BadRequest or LookupError."""
+        parts = [p for p in path.split('/') if p][1:]
+        year, months, dialer, week, day = parse_selection(query, self.source)
+        fmt = (query.get('format') or ['csv'])[-1].lower()
+        if fmt not in export.FORMATS:
+            raise BadRequest(F"Unknown format: {fmt}")
+        if len(parts) == 2 and parts[0] == 'kpis':
+            page = parts[1]
+            if page not in aggregates.PAGES:
+                raise LookupError(F"Unknown page: {page}")
+            chunks = iter([export.kpi_table(self.source, page, year, months, week, day)])
+            name = F"{page}_kpis"
+        elif len(parts) == 1 and parts[0] in export.EXPORT_TABLES:
+            tables = self.source.tables()
+            if tables is None:
+                raise LookupError("The data has no dated tables to export")
+            chunks = export.filtered_rows(tables, parts[0], year, months, dialer, week, day)
+            name = parts[0]
+        else:
+            raise LookupError(F"Unknown export: {path}")
+        return fmt, export.export_filename(name, year, months, fmt), export.iter_export(fmt, chunks, name)
+
+    async def stream_export(self, writer, method, path, query, keep_alive):
+        """
+        Sends an export with chunked transfer encoding, one worker-thread step per
+        block. Returns False when the export failed mid-stream and the connection
+        has to be closed.
+        """
+        loop = asyncio.get_running_loop()
+
+        def first_block():
+            fmt, filename, blocks = self.open_export(path, query)
+            return fmt, filename, blocks, next(blocks, b"")
+
+        try:
+            fmt, filename, blocks, block = await loop.run_in_executor(self.executor, first_block)
+        except BadRequest as E:
+            await self._send(writer, 400, json.dumps({'error': str(E)}).encode(), None, keep_alive)
+            return True
+        except LookupError as E:
+            await self._send(writer, 404, json.dumps({'error': str(E)}).encode(), None, keep_alive)
+            return True
+        except Exception as E:
+            perf.logger.exception("KPI service export failed: %s", path)
+            await self._send(writer, 500, json.dumps({'error': str(E)}).encode(), None, keep_alive)
+            return True
+
+        head = [
+            "HTTP/1.1 200 OK",
+            F"Content-Type: {export.FORMATS[fmt][0]}",
+            F'Content-Disposition: attachment; filename="{filename}"',
+            "Transfer-Encoding: chunked",
+            "Cache-Control: no-cache",
+            F"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1'))
+        if method == "HEAD":
+            await writer.drain()
+            return True
+        while block is not None:
+            if block:
+                writer.write(F"{len(block):X}\r\n".encode('latin-1') + block + b"\r\n")
+                await writer.drain()
+            try:
+                block = await loop.run_in_executor(self.executor, next, blocks, None)
+            except Exception:
+                # The status line is out already: cut the response short
+                perf.logger.exception("KPI service export failed: %s", path)
+                return False
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return True
+
+    async def handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._send(writer, 400, b'{"error": "Malformed request line"}', None, False)
+                    break
+                keep_alive = version == "HTTP/1.1" and headers.get('connection', '').lower() != 'close'
+                url = urlsplit(target)
+                if method not in ("GET", "HEAD"):
+                    await self._send(writer, 405, b'{"error": "Only GET is supported"}', None, keep_alive)
+                elif url.path.strip('/').split('/')[0] == 'export':
+                    query = parse_qs(url.query, keep_blank_values=False)
+                    if not await self.stream_export(writer, method, url.path, query, keep_alive):
+                        break
+                else:
+                    status, body, etag = await loop.run_in_executor(
+                        self.executor, self.respond, url.path, parse_qs(url.query, keep_blank_values=False),
+                        headers.get('if-none-match'))
+                    await self._send(writer, status, b"" if method == "HEAD" else body, etag, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send(self, writer, status, body, etag, keep_alive):
+        head = [
+            F"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            F"Content-Length: {len(body)}",
+            "Cache-Control: no-cache",
+            F"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if etag:
+            head.append(F"ETag: {etag}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host=API_HOST, port=API_PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        perf.logger.info(json.dumps({'event': 'api_start', 'pid': os.getpid(), 'host': host, 'port': port}))
+        async with server:
+            await server.serve_forever()
+
+
+# --- PORT OWNERSHIP ---
+
+_owned_ports = {}
+
+
+def claim_port(host, port, directory=API_LOCK_DIR):
+    """
+    Takes the lock file of (host, port) without waiting; True when it was free, False
+    when this or another process holds it. Dashboard processes sharing
+    DIALERS_API_PORT call this first, so only one of them binds the port. The lock is
+    held until the process exits.
+    """
+    if (host, port) in _owned_ports:
+        return False
+    path = os.path.join(directory, F"dialers-api-{host.replace(':', '_')}-{port}.lock")
+    handle = open(path, 'a+')
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    _owned_ports[(host, port)] = handle
+    return True
+
+
+def _run(service, host, port):
+    try:
+        asyncio.run(service.serve(host, port))
+    except OSError:
+        perf.logger.exception("KPI service could not listen on %s:%s", host, port)
+
+
+def start_in_thread(source, host=API_HOST, port=API_PORT):
+    """
+    Runs a KpiService for `source` on its own event loop in a daemon thread and
+    returns it, or returns None when another process owns the port.
+    """
+    if not claim_port(host, port):
+        perf.logger.info(json.dumps({'event': 'api_skipped', 'pid': os.getpid(), 'host': host, 'port': port}))
+        return None
+    service = KpiService(source)
+    thread = threading.Thread(target=_run, args=(service, host, port), name="dialers-api", daemon=True)
+    thread.start()
+    return service
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the dashboard's KPIs as JSON over HTTP.")
+    parser.add_argument('--data-dir', default="./", help="folder holding the xlsx/csv source files")
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--port', type=int, default=API_PORT or 8601)
+    parser.add_argument('--precomputed', default=PRECOMPUTED_DIR, help="precomputed KPI store to use when it matches the data")
+    parser.add_argument('--threads', type=int, default=API_THREADS, help="worker threads for the KPI computations")
+    args = parser.parse_args(argv)
+    if not claim_port(args.host, args.port):
+        parser.error(F"another process already serves {args.host}:{args.port}")
+
+    service = KpiService(KpiEngine(args.data_dir, args.precomputed, pool=parallel.get_pool()), args.threads)
+    print(F"Serving KPIs on http://{args.host}:{args.port}/kpis")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()